@@ -2,6 +2,7 @@
 import os
 import re
 import time
+import tempfile
 from threading import Timer
 from datetime import timedelta
 from mathutils import Vector, Matrix
@@ -56,7 +57,7 @@ bl_info = {
     "tracker_url": ""
 }
 from .utils.nodal import Nodal, register_modal, unregister_modal
-from .modules.dirio import Dirio
+from .modules.dirio import Dirio, prewarm, release_spares
 from .modules.Tarag import tarag
 from .modules.webrepl import Webrepl, WR_CMD, WR_KEY
 from .modules.rapor import blender_plug
@@ -113,7 +114,7 @@ class NESP_PR_Connection(PropertyGroup):
     )
 
     def get_inwork(self):
-        return self.isconnected and (dev.dr_bind_count() > 0)
+        return self.isconnected and (dev.dr_pending() > 0)
 
     inwork: BoolProperty(
         name="Is in work?",
@@ -442,9 +443,9 @@ class NESP_PR_Communication(PropertyGroup):
 
         #self.send(context, self.messaging)
 
-        # Mesajı gönderilenler kuyruğuna ekle
+        # Mesajı gönderilenler kuyruğuna ekle. Kullanıcının yazdıkları normal REPL'e gider
         message = self.messaging
-        self.queue_list.append(message)
+        self.queue_list.append((WR_KEY._SEND, message))
 
         pr_com = context.scene.nesp_pr_communication
 
@@ -501,6 +502,14 @@ class NESP_OT_Communication(Operator, Nodal):
 
     def n_invoke(self, context, event):
         dev.listen()
+
+        # Gelen satırlar, sunucu tarafından gönderilir; 'receives' her turda okunup temizlenmez
+        self.received = []
+        self.unread = 0
+        self.writing = None
+        dev.dr_unsubscribe("receives")
+        dev.dr_subscribe("receives", self.on_receives)
+
         self.pr_con = context.scene.nesp_pr_connection
         self.pr_com = context.scene.nesp_pr_communication
         self.pr_dev = context.scene.nesp_pr_device
@@ -525,41 +534,120 @@ class NESP_OT_Communication(Operator, Nodal):
     mode = ""
     file = ""
     wait = 0
+    # Sunucudaki 'receives'in kopyası ve sonundaki henüz işlenmemiş satır sayısı. Bkz. on_receives
+    received = []
+    unread = 0
+    # Cihaza yazan son çağrının Future'ı. Bkz. n_modal
+    writing = None
+
+    def on_receives(self, op, value):
+        received = self.received
+        if op == "append":
+            received.extend(value)
+            self.unread += len(value)
+        elif op == "trim":
+            del received[:value]
+            self.unread = min(self.unread, len(received))
+        elif op in ("clear", "delete"):
+            received.clear()
+            self.unread = 0
+        elif op == "set":
+            # Liste tümüyle değişti; abone olunca ilk gelen de budur. İşlenmiş satırların kalanıyla başlıyorsa,
+            # sadece sonrası yenidir. Hiç örtüşmüyorsa hepsi yenidir
+            read = received[:len(received) - self.unread]
+            start = next((len(read) - i for i in range(len(read))
+                          if read[i] == value[0] and value[:len(read) - i] == read[i:]), 0) if value else 0
+            self.received = list(value)
+            self.unread = len(value) - start
+
+    @staticmethod
+    def open_text(context, file_name, data):
+        if file_name in bpy.data.texts:
+            file = bpy.data.texts[file_name]
+            file.clear()
+        else:
+            file = bpy.data.texts.new(file_name)
+
+        file.write(data)
+
+        for area in context.screen.areas:
+            if area.type == "TEXT_EDITOR":
+                area.spaces[0].text = file
 
     def n_modal(self, context, event):
         if not self.pr_con.isconnected:
+            if dev:
+                dev.dr_unsubscribe("receives", self.on_receives)
             unregister_modal(self)
             return self.timer_remove(context)
 
         if not self.pr_con.isconnected:
             return {"CANCELLED"}
 
-        if self.pr_com.queue_list:
-            val = self.pr_com.queue_list.pop(0)
-            if type(val) in (tuple, list):
-                if val[0] == WR_KEY._FILE_WRITE:
-                    dev.put_file_content(val[1], val[2])
-                elif val[0] == WR_KEY._FILE_READ:
-                    dev.get_file_content(val[1])
-            else:
-                dev.send(val)
-
-            self.pr_com.queue_hist.append(val)
+        queue_list = self.pr_com.queue_list
+        controls = (WR_CMD.CONTROL_A, WR_CMD.CONTROL_B, WR_CMD.CONTROL_C, WR_CMD.CONTROL_D)
+
+        # Cihaza yazma bitmeden, kuyrukta arkasından gelenler gönderilmez; onlar yeni dosyayı görmeli
+        if self.writing is not None and self.writing.done():
+            self.writing = None
+
+        if queue_list and self.writing is None:
+            # Kuyruktakiler, sırayla ve tek mesajla sunucuya gönderilir. Yazmadan sonrakiler, yazma bitince gider
+            with dev.dr_batch():
+                while queue_list:
+                    val = queue_list.pop(0)
+                    if type(val) in (tuple, list):
+                        if val[0] == WR_KEY._FILE_WRITE:
+                            # Ardışık yazmalar tek seferde; sadece cihazdakinden farklı olanlar gönderilir
+                            files = {val[2]: val[1]}
+                            while queue_list and type(queue_list[0]) in (tuple, list) and \
+                                    queue_list[0][0] == WR_KEY._FILE_WRITE:
+                                nxt = queue_list.pop(0)
+                                files[nxt[2]] = nxt[1]
+                            # Dosya aktarımları bitene kadar 'inwork' açık kalır
+                            self.writing = dev.sync_files(files, dr_future=True)
+                            break
+                        elif val[0] == WR_KEY._SYNC:
+                            self.writing = dev.sync(val[1], val[2], dr_future=True)
+                            break
+                        elif val[0] == WR_KEY._FILE_PUT:
+                            self.writing = dev.put_file(val[1], val[2], dr_future=True)
+                            break
+                        elif val[0] == WR_KEY._FILE_READ:
+                            dev.get_file_content(val[1])
+                        elif val[0] == WR_KEY._FILE_GET:
+                            dev.download(val[1], val[2], dr_future=True)
+                        elif val[0] == WR_KEY._PASTE:
+                            dev.paste(val[1])
+                        elif val[0] == WR_KEY._SEND:
+                            dev.send(val[1])
+
+                            # Son gönderilenler yankı olarak geldiğinde boşuna ekrana eklemeleyim diye
+                            self.pr_com.queue_hist.append(val[1])
+                            if len(self.pr_com.queue_hist) > 20:
+                                self.pr_com.queue_hist = self.pr_com.queue_hist[10:]
+
+                    elif val in controls:
+                        dev.send(val)
 
-            # Son gönderilenler yankı olarak geldiğinde boşuna ekrana eklemeleyim diye
-            if len(self.pr_com.queue_hist) > 20:
-                self.pr_com.queue_hist = self.pr_com.queue_hist[10:]
+                    else:
+                        # Komutlar raw REPL'de çalışır; yankı gelmez, çıktılar karışmadan sırayla gelir.
+                        # Kuyruktaki ardışık komutları beklemeden, tek seferde gönderiyoruz
+                        codes = [val]
+                        while queue_list and type(queue_list[0]) is str and queue_list[0] not in controls:
+                            codes.append(queue_list.pop(0))
+                        dev.send_raw(codes)
 
             return {'PASS_THROUGH'}
 
-        # a = dev.receives
-        a = dev.receives.copy()
-        dev.receives.clear()
+        # Gelen satırlar, on_receives'e verilir
+        dev.dr_binds_check()
+        a = self.received[len(self.received) - self.unread:]
+        self.unread = 0
 
         if a and len(a):
-            cmds = WR_CMD.all()
             for i in a:
-                if i in cmds or i in self.pr_com.queue_hist:
+                if i in self.pr_com.queue_hist:
                     continue
 
                 pr_dev = self.pr_dev
@@ -706,18 +794,32 @@ class NESP_OT_Communication(Operator, Nodal):
                     # FRD: filename.py
                     ans, data = i.split("\n", 1)
                     file_name = ans.replace(WR_KEY._FILE_READ, "", 1).strip()
+                    self.open_text(context, file_name, data)
+
+                elif i.startswith(WR_KEY._FILE_SAVE):
+                    # FSV: /remote/file.bin
+                    # /staging/remote/file.bin
+                    ans, local_file = i.split("\n", 1)
+                    file_name = ans.replace(WR_KEY._FILE_SAVE, "", 1).strip()
+                    if not local_file:
+                        self.pr_com.append_incoming(f"Download failed: {file_name}")
+                        continue
 
-                    if file_name in bpy.data.texts:
-                        file = bpy.data.texts[file_name]
-                        file.clear()
-                    else:
-                        file = bpy.data.texts.new(file_name)
+                    with open(local_file, "rb") as f:
+                        data = f.read()
 
-                    file.write(data)
+                    # Metin dosyaları text bloğunda açılır, diğerleri yerel klasörde kalır
+                    text = None
+                    if b"\0" not in data:
+                        try:
+                            text = data.decode("utf-8")
+                        except UnicodeDecodeError:
+                            pass
 
-                    for area in context.screen.areas:
-                        if area.type == "TEXT_EDITOR":
-                            area.spaces[0].text = file
+                    if text is None:
+                        self.pr_com.append_incoming(f"Saved: {file_name} -> {local_file}")
+                    else:
+                        self.open_text(context, file_name, text)
 
                 elif self.mode == "module":
                     if i.startswith("Plus any mod"):
@@ -1008,7 +1110,7 @@ class NESP_UL_FileSystems(UIList):
             if md == "os.dir" and not item.isdir:
                 row.operator("nesp.filesystem", text="", emboss=False, icon="IMPORT").action = "download"
 
-                if item.path in bpy.data.texts:
+                if item.path in bpy.data.texts or os.path.isfile(pr.staged_path(item.path)):
                     row.operator("nesp.filesystem", text="", emboss=False, icon="EXPORT").action = "upload"
 
                 if item.name.endswith(".py"):
@@ -1090,6 +1192,25 @@ class NESP_PR_FileSystem(PropertyGroup):
 
     path: StringProperty(name="Active Path", default=os.sep)    # , update=reload
 
+    # Text olmayan dosyalar indirilirken buraya, cihazdaki yolları korunarak kaydedilir
+    staging: StringProperty(
+        name="Staging Directory",
+        description="Local directory for downloaded and uploaded binary files",
+        subtype="DIR_PATH",
+        default=os.path.join(tempfile.gettempdir(), "nesp")
+    )
+
+    # Cihazla senkronlanacak yerel proje klasörü
+    project: StringProperty(
+        name="Project Directory",
+        description="Local project directory. Only changed files are uploaded when synced",
+        subtype="DIR_PATH",
+        default=""
+    )
+
+    def staged_path(self, remote_file):
+        return os.path.join(bpy.path.abspath(self.staging), remote_file.lstrip("/\\"))
+
     @classmethod
     def register(cls):
         Scene.nesp_pr_filesystem = PointerProperty(
@@ -1119,6 +1240,7 @@ class NESP_OT_FileSystem(Operator):
             ("new_file", "", ""),
             ("download", "", ""),
             ("upload", "", ""),
+            ("sync", "", ""),
             ("go", "", ""),
             ("run", "", ""),
             ("remove", "", ""),
@@ -1146,9 +1268,14 @@ class NESP_OT_FileSystem(Operator):
         elif self.action == "run":
             # TODO !!! Modül olarak içe aktarmadan önce, eskisini silen kısmı da ekle
             item = pr_fsy.items[pr_fsy.active_item_index]
-            path = os.path.join(pr_fsy.path, item.name)
-            code = path.strip(os.sep).replace('/', '.').rsplit('.', 1)[0]
-            pr_com.queue_list.append(WR_CMD.RUN.format(code))
+
+            # Blender'da açık text bloğu varsa, cihaza yüklemeden raw-paste ile çalıştırılır
+            if mode == "os.dir" and item.path in bpy.data.texts:
+                pr_com.queue_list.append((WR_KEY._PASTE, bpy.data.texts[item.path].as_string()))
+            else:
+                path = os.path.join(pr_fsy.path, item.name)
+                code = path.strip(os.sep).replace('/', '.').rsplit('.', 1)[0]
+                pr_com.queue_list.append(WR_CMD.RUN.format(code))
 
         elif self.action == "remove":
             item = pr_fsy.items[pr_fsy.active_item_index]
@@ -1163,13 +1290,20 @@ class NESP_OT_FileSystem(Operator):
 
         elif self.action == "download":
             item = pr_fsy.items[pr_fsy.active_item_index]
-            pr_com.queue_list.append((WR_KEY._FILE_READ, item.path))
+            pr_com.queue_list.append((WR_KEY._FILE_GET, item.path, pr_fsy.staged_path(item.path)))
 
         elif self.action == "upload":
             item = pr_fsy.items[pr_fsy.active_item_index]
             if item.path in bpy.data.texts:
                 data = bpy.data.texts[item.path].as_string()
                 pr_com.queue_list.append((WR_KEY._FILE_WRITE, data, item.path))
+            elif os.path.isfile(pr_fsy.staged_path(item.path)):
+                pr_com.queue_list.append((WR_KEY._FILE_PUT, pr_fsy.staged_path(item.path), item.path))
+
+        elif self.action == "sync" and pr_fsy.mode == "os.dir":
+            project = bpy.path.abspath(pr_fsy.project)
+            if os.path.isdir(project):
+                pr_com.queue_list.append((WR_KEY._SYNC, project, pr_fsy.path))
 
         elif self.action == "new_dir" and pr_fsy.mode == "os.dir":
             names = [i.name for i in pr_fsy.items]
@@ -1192,7 +1326,7 @@ class NESP_OT_FileSystem(Operator):
                 no += 1
 
             path = os.path.join(pr_fsy.path, name)
-            pr_com.queue_list.append(WR_CMD.FILE_WRITE.format(path, b"\n"))
+            pr_com.queue_list.append((WR_KEY._FILE_WRITE, "\n", path))
 
         # Reload : Her seferinde yenile
         path = pr_fsy.path
@@ -1246,6 +1380,12 @@ class NESP_PT_FileSystem(Panel):
         row2.operator("nesp.filesystem", text="", icon="NEWFOLDER").action = "new_dir"
         row2.operator("nesp.filesystem", text="", icon="FILE_NEW").action = "new_file"
 
+        if pr.mode == "os.dir":
+            layout.prop(pr, "staging", text="")
+            row3 = layout.row(align=True)
+            row3.prop(pr, "project", text="")
+            row3.operator("nesp.filesystem", text="", icon="UV_SYNC_SELECT").action = "sync"
+
         # row2 = layout.row(align=True)
         # row2.separator()
         # row2.operator("ncnc.objects", icon="NEWFOLDER", text="")#.action = "newdir"
@@ -1798,8 +1938,13 @@ def register():
     for i in classes:
         bpy.utils.register_class(i)
 
+    # Bağlan'a basıldığında Python'un açılmasını beklememek için, sunucu önceden başlatılır
+    prewarm(Webrepl)
+
 
 def unregister():
+    release_spares()
+
     for i in classes[::-1]:
         bpy.utils.unregister_class(i)
 
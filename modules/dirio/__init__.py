@@ -1,18 +1,56 @@
 import subprocess
+import threading
+import traceback
 import tempfile
 import inspect
 import random
 import shutil
+import io
+import struct
+import select
+import pickle
+import queue
+import mmap
 import time
 import json
 import sys
 import os
+from collections import deque
+from functools import partial
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
+from multiprocessing.connection import Listener, Client
 
 KWARGS = "k"
 RESULT = "r"
 VALUE = "v"
 ARGS = "a"
 
+# İstemcinin, sunucu soketi açılana kadar bekleyeceği süre
+CONNECT_TIMEOUT = 10
+# Sunucuya, istemcinin soket için doğrulama anahtarı bu ortam değişkeniyle verilir
+AUTHKEY_ENV = "DIRIO_AUTHKEY"
+# Dosya ile cevap beklerken kontrol aralığı; en kısadan başlar, her kontrolde iki katına çıkar. FIFO olmayan
+# sistemlerde kullanılır. Bkz. Wakeup
+WAIT_MIN_DELAY = .0005
+WAIT_MAX_DELAY = .02
+# FIFO ile beklerken de, en fazla bu kadar sonra dosyalara ve sunucunun kapanıp kapanmadığına bakılır
+WAKE_MAX_DELAY = 1
+# Çağrı günlüğü bu boyutu geçince, istemci yeni bir parçaya geçer
+JOURNAL_MAX = 1 << 20
+
+# bytes codec'inde, JSON'un içinde ayrı gönderilen verinin yerini tutan anahtar. {BLOB: sıra}
+BLOB = "__dirio_blob__"
+BINARY_TYPES = (bytes, bytearray, memoryview)
+
+# Sunucuda metodların eşzamanlılık politikaları
+SERIAL = "serial"
+PARALLEL = "parallel"
+EXCLUSIVE = "exclusive"
+
+# Yazma biriktiricide, değeri olmayan değişken
+MISSING = object()
+
 # !!! Dekoratörde, fonksiyon okunduktan sonra dosyalarını silebilirsin aslında
 # Ya da aradan belli bir süre geçtiyse, dosyayı sil gitsin, loop'tan silebilirisn
 """
@@ -22,6 +60,9 @@ Dosyalama Şekli;
           |---> +/12345
           |---> -/67891
                 |-----> __main__.py     -> Sadece ilk çalıştırılırken vardır.
+                |-----> journal-0       -> Çağrı günlüğü. Her satır; ["func2", 13, ["Func args"], {"Func kwargs"}]
+                |-----> wake-worker     -> FIFO. İstemci, günlüğe yazınca sunucuyu uyandırır
+                |-----> wake-client     -> FIFO. Sunucu, dönüş ya da değişken yazınca istemciyi uyandırır
                 |-----> +/func1
                 |-----> -/func2
                 |       |-------> 11
@@ -55,8 +96,11 @@ Dosyalama Şekli;
 # # ##############################################################
 
 
-def new_dir(tempdir, module, class_name, args, kwargs):
-    """/Tempdir/353464325"""
+def new_dir(tempdir, module, class_name, authkey=b""):
+    """
+    /Tempdir/353464325 dizinini oluşturur ve sunucuyu başlatır. (dizin, process) döndürür.
+    Sunucu, hedef modülü içe aktarır ve ayarlarını stdin'den bekler. Bkz. send_config
+    """
 
     # Dizini oluşturuyoruz
     dir_path = os.path.join(tempdir or tempfile.gettempdir(), "dirio")
@@ -95,8 +139,11 @@ from {module_name} import {class_name}
     # script_footer = f"new = Dirio(target={class_name}, args={args}, kwargs={kwargs}, worker=True)\nnew._dr_loop()"
     script_footer = f"""
 try:
-    new = Dirio(target={class_name}, args={args}, kwargs={kwargs}, worker=True)
-    new._dr_loop()
+    # Ayarlar tek satır JSON olarak gelir. İstemci kapanırsa boş gelir
+    config = sys.stdin.readline()
+    if config:
+        new = Dirio(target={class_name}, **json.loads(config), worker=True)
+        new._dr_loop()
 except:
     pass
 
@@ -104,7 +151,7 @@ except:
 
 dirname = os.path.dirname(__file__)
 if os.path.exists(dirname):
-    shutil.rmtree(dirname)
+    shutil.rmtree(dirname, ignore_errors=True)
 
 sys.exit()
 """
@@ -116,40 +163,129 @@ sys.exit()
 
     # Burada da Process olarak başlatsan iyi olur
 
-    subprocess.Popen([
+    process = subprocess.Popen([
         sys.executable,
         new_path
     ],
+        stdin=subprocess.PIPE,
+        env=dict(os.environ, **{AUTHKEY_ENV: authkey.hex()})
         # close_fds=True
     )
 
     print("Dirio -> New Path ->", new_path)
-    return new_path
+    return new_path, process
+
+
+def send_config(process, config):
+    """Ayarları (Dirio parametreleri), stdin'i bekleyen sunucuya gönderir. Sunucu kapanmışsa False döndürür"""
+    if process.poll() is not None:
+        return False
+    try:
+        process.stdin.write(json.dumps(config).encode() + b"\n")
+        process.stdin.close()
+    except OSError:
+        return False
+    return True
+
+
+# Önceden başlatılmış, ayarlarını bekleyen sunucular; {(modül, sınıf adı, tempdir): [(dizin, process, authkey)]}
+spares = {}
+spares_lock = threading.Lock()
+
+
+def prewarm(target, count=1, tempdir=""):
+    """
+    'target' sınıfı için 'count' tane sunucuyu önceden başlatır. Python'un açılışı ve modüllerin içe aktarılması
+    beklenmeden önce yapılmış olur. Dirio oluşturulurken bunlardan biri kullanılır ve yerine yenisi başlatılır.
+    """
+    fill_spares((inspect.getfile(target), target.__name__, tempdir), count)
+
+
+def fill_spares(key, count):
+    with spares_lock:
+        pool = spares.setdefault(key, [])
+        while len(pool) < count:
+            authkey = os.urandom(32)
+            pool.append(new_dir(key[2], key[0], key[1], authkey) + (authkey,))
+
+
+def release_spares():
+    """Kullanılmamış sunucuları kapatır. stdin'i kapanan sunucu, dizinini silip çıkar"""
+    with spares_lock:
+        for pool in spares.values():
+            for dr_dir, process, authkey in pool:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+        spares.clear()
+
+
+def start_thread(target, config):
+    """Sunucuyu bu işlemde, ayrı bir thread'de başlatır. Sunucunun adını döndürür. Bkz. ThreadTransport"""
+    name = f"thread-{os.urandom(6).hex()}"
+
+    def run():
+        try:
+            Dirio(target=target, tempdir=name, **config, worker=True)._dr_loop()
+        except Exception:
+            traceback.print_exc()
+        ThreadTransport.servers.pop(name, None)
+
+    threading.Thread(target=run, daemon=True, name=f"dirio-{name}").start()
+    return name
+
+
+def start_worker(tempdir, module, class_name, config):
+    """Sunucuyu başlatır; varsa önceden başlatılmış olanı kullanır. (dizin, authkey) döndürür"""
+    key = (module, class_name, tempdir)
+    with spares_lock:
+        pool = spares.get(key, [])
+        count = len(pool)
+        spare = pool.pop(0) if pool else None
+
+    while spare:
+        dr_dir, process, authkey = spare
+        if send_config(process, config):
+            # Kullanılanın yerine yenisi, bağlantıyı geciktirmeden arka planda başlatılır
+            threading.Thread(target=fill_spares, args=(key, count), daemon=True).start()
+            return dr_dir, authkey
 
+        shutil.rmtree(dr_dir, ignore_errors=True)
+        with spares_lock:
+            spare = pool.pop(0) if pool else None
 
-def check_type(value):
-    tipi = str(type(value))
-    if "DrDict" in tipi:
-        value = dict(value)
-        print("Var doğru")
-    elif "DrList" in tipi:
-        value = list(value)
+    authkey = os.urandom(32)
+    dr_dir, process = new_dir(tempdir, module, class_name, authkey)
+    send_config(process, config)
+    return dr_dir, authkey
 
+
+# JSON'a doğrudan yazılan tipler
+SCALAR_TYPES = frozenset((int, str, float, bool, type(None)))
+
+
+def check_type(value, extra=()):
+    """JSON'a uygun mu. 'extra'daki tipler de kabul edilir. DrDict ve DrList, dict ve list sayılır"""
     tip = type(value)
-    check = True
-
-    if tip in (dict, list, tuple, int, str, float, bool, type(None)):
-        if tip is dict:
-            for k, v in value.items():
-                if not (check_type(k) and check_type(v)):
-                    return False
-        elif tip in (list, tuple):
-            for i in value:
-                if not check_type(i):
-                    return False
-    else:
-        return False
-    return check
+    if tip in SCALAR_TYPES or tip in extra:
+        return True
+
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if type(k) not in SCALAR_TYPES:
+                return False
+            if type(v) not in SCALAR_TYPES and not check_type(v, extra):
+                return False
+        return True
+
+    if isinstance(value, (list, tuple)):
+        for i in value:
+            if type(i) not in SCALAR_TYPES and not check_type(i, extra):
+                return False
+        return True
+
+    return False
 
 
 def set_decorator(self):
@@ -169,12 +305,12 @@ def set_decorator(self):
             setattr(self, attr, get_decorator(self, attribute))
 
 
-def get_result(path_code, dr_wait):
+def get_result(path_code, dr_wait, wake=None):
     start_time = time.time()
-    wait_time = 1
+    delay = WAIT_MIN_DELAY
 
     # Cevabı okurken bekle
-    while wait_time:
+    while True:
         if os.path.exists(path_code):
             try:
                 with open(path_code) as f:
@@ -187,13 +323,1432 @@ def get_result(path_code, dr_wait):
         # -1 ise cevap gelene kadar bekle
         # 0 ise sadece bir kere kontrol et
         # 5 gibi değer ise, 5 sn kadar bekle
+        timeout = WAKE_MAX_DELAY
         if dr_wait >= 0:
-            wait_time = time.time() - start_time < dr_wait
+            remaining = dr_wait - (time.time() - start_time)
+            if remaining <= 0:
+                return None
+            delay = min(delay, remaining)
+            timeout = min(timeout, remaining)
+
+        # Sunucu, dönüşü yazınca uyandırır. Uyandıramıyorsa işlemciyi meşgul etmemek için bekle; cevap geç
+        # kaldıkça aralık uzar
+        if not (wake and wake.wait(timeout)):
+            time.sleep(delay)
+            delay = min(delay * 2, WAIT_MAX_DELAY)
+
+
+class Wakeup:
+    """
+    Dosya taşımasında bekleyeni uyandırır. Her taraf dizinde kendi FIFO'sunu açar ve okunabilir olmasını bekler;
+    beklerken işlemci harcamaz. Diğer taraf, dosyayı yazdıktan sonra o FIFO'ya bir bayt yazar.
+    Uyandırma kaybolmaz; bekleyen FIFO'yu açtıktan sonra dosyalara bakar, beklerken gelen bayt da FIFO'da kalır.
+    FIFO'nun olmadığı sistemlerde (Windows) 'wait' False döndürür; bekleyen, aralığı uzatarak dosyaya bakar.
+    """
+
+    def __init__(self, path, peer_path):
+        self.path = path
+        self.peer_path = peer_path
+        # Okuma ucu, ve yazan kimse yokken FIFO hep okunabilir (dosya sonu) görünmesin diye açık tutulan yazma ucu
+        self.fd = self.keep = None
+        # Karşı tarafın FIFO'sunun yazma ucu, ve karşı taraf kapanınca yazma SIGPIPE vermesin diye açık tutulan
+        # okuma ucu. Bu uçtan okunmaz; yazılan baytlar karşı tarafta kalır
+        self.peer = self.peer_keep = None
+        self.lock = threading.Lock()
+        # Aynı işlemde birden fazla thread bekleyebilir. FIFO'yu biri bekler; diğerleri onun uyanmasını bekler
+        self.cond = threading.Condition()
+        self.reading = False
+
+        if not hasattr(os, "mkfifo"):
+            return
+        try:
+            for fifo in (path, peer_path):
+                try:
+                    os.mkfifo(fifo)
+                except FileExistsError:
+                    pass
+            self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            self.keep = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            # Dizin silinmiş; taşıma zaten kapanıyor
+            self.close()
+
+    def wait(self, timeout):
+        """Uyandırılana ya da 'timeout' geçene kadar bekler. FIFO yoksa beklemeden False döndürür"""
+        fd = self.fd
+        if fd is None:
+            return False
+
+        with self.cond:
+            if self.reading:
+                self.cond.wait(timeout)
+                return True
+            self.reading = True
+        try:
+            if select.select([fd], [], [], timeout)[0]:
+                # Biriken uyandırmalar tek seferde boşaltılır
+                while os.read(fd, 512):
+                    pass
+        except (OSError, ValueError):
+            # Boş FIFO (BlockingIOError) ya da kapatıldı
+            pass
+        finally:
+            with self.cond:
+                self.reading = False
+                self.cond.notify_all()
+        return True
+
+    def notify(self):
+        """Karşı tarafı uyandırır"""
+        with self.lock:
+            if self.peer is None:
+                if self.fd is None:
+                    return
+                try:
+                    keep = os.open(self.peer_path, os.O_RDONLY | os.O_NONBLOCK)
+                except OSError:
+                    return
+                self.peer_keep, self.peer = keep, os.open(self.peer_path, os.O_WRONLY | os.O_NONBLOCK)
+            try:
+                os.write(self.peer, b"\0")
+            except OSError:
+                # FIFO dolu; karşı taraf zaten uyanacak ya da kapandı
+                pass
+
+    def close(self):
+        # Bekleyen thread, kapatılmadan önce uyandırılır
+        if self.keep is not None:
+            try:
+                os.write(self.keep, b"\0")
+            except OSError:
+                pass
+        with self.lock:
+            for fd in (self.fd, self.keep, self.peer, self.peer_keep):
+                if fd is not None:
+                    os.close(fd)
+            self.fd = self.keep = self.peer = self.peer_keep = None
+
+
+class JsonCodec:
+    """Mesaj, JSON olarak tek çerçevede gönderilir. Sadece JSON tipleri taşınabilir"""
+
+    def accepts(self, value):
+        return check_type(value)
+
+    def send(self, conn, msg):
+        conn.send_bytes(json.dumps(msg).encode())
+
+    def recv(self, conn):
+        return json.loads(conn.recv_bytes())
+
+
+class BytesCodec(JsonCodec):
+    """
+    JSON tiplerine ek olarak bytes, bytearray ve memoryview taşır. Bunlar JSON'a gömülmez; yerlerine {BLOB: sıra}
+    yazılır, kendileri kopyalanmadan, ayrı çerçeveler olarak arkadan gönderilir. İlk çerçevenin başındaki 4 bayt,
+    arkadan gelen çerçeve sayısıdır. Karşı tarafa hepsi bytes olarak ulaşır.
+    """
+
+    def accepts(self, value):
+        return check_type(value, BINARY_TYPES)
+
+    def send(self, conn, msg):
+        blobs = []
+
+        def blob(value):
+            if isinstance(value, BINARY_TYPES):
+                blobs.append(value)
+                return {BLOB: len(blobs) - 1}
+            raise TypeError(f"{type(value).__name__} is not serializable")
+
+        head = json.dumps(msg, default=blob).encode()
+        conn.send_bytes(struct.pack("<I", len(blobs)) + head)
+        for i in blobs:
+            conn.send_bytes(i)
+
+    def recv(self, conn):
+        data = conn.recv_bytes()
+        count = struct.unpack_from("<I", data)[0]
+        if not count:
+            return json.loads(data[4:])
+
+        blobs = [conn.recv_bytes() for _ in range(count)]
+        return json.loads(data[4:], object_hook=lambda d: blobs[d[BLOB]] if len(d) == 1 and BLOB in d else d)
+
+
+class BlobPickler(pickle.Pickler):
+    """Büyük bytes ve bytearray'leri, protokol 5'te ayrı tampon olarak verir (Python 3.8+)"""
+    out_of_band = 1 << 16
+
+    def reducer_override(self, value):
+        if type(value) in (bytes, bytearray) and len(value) >= self.out_of_band:
+            return type(value), (pickle.PickleBuffer(value),)
+        return NotImplemented
+
+
+class PickleCodec(JsonCodec):
+    """
+    Pickle edilebilen her şeyi taşır; numpy dizileri dahil. Python 3.8+'da protokol 5 ile büyük tamponlar
+    kopyalanmadan, ayrı çerçevelerde gönderilir; alan taraf onları, pickle istedikçe okur.
+    Bağlantı authkey ile doğrulandığından, gelen pickle sadece kendi istemcimizden/sunucumuzdan olabilir.
+    """
+    protocol = pickle.HIGHEST_PROTOCOL
+
+    def dumps(self, value, buffers):
+        if self.protocol < 5:
+            return pickle.dumps(value, self.protocol)
+
+        f = io.BytesIO()
+        BlobPickler(f, self.protocol, buffer_callback=buffers.append).dump(value)
+        return f.getbuffer()
+
+    def accepts(self, value):
+        if check_type(value, (bytes, bytearray)):
+            return True
+        try:
+            self.dumps(value, [])
+        except Exception:
+            return False
+        return True
+
+    def send(self, conn, msg):
+        buffers = []
+        conn.send_bytes(self.dumps(msg, buffers))
+        for i in buffers:
+            conn.send_bytes(i.raw())
+
+    def recv(self, conn):
+        data = conn.recv_bytes()
+        if self.protocol >= 5:
+            return pickle.loads(data, buffers=(conn.recv_bytes() for _ in iter(int, 1)))
+        return pickle.loads(data)
+
+
+CODECS = {
+    "json": JsonCodec,
+    "bytes": BytesCodec,
+    "pickle": PickleCodec,
+}
+
+
+class FileTransport:
+    """
+    Değişkenler ve dönüşler, dizindeki JSON dosyalarıyla taşınır.
+    Çağrılar, istemcinin sonuna eklediği günlük dosyasına satır satır yazılır. Sunucu günlüğü kaldığı yerden okur;
+    her turda sadece yeni çağrıları, geliş sırasıyla işler. Günlük 'JOURNAL_MAX'ı geçince yeni parçaya geçilir.
+    İstemcinin okuduğu dönüşün dosyası silinir. Okunmayanları sunucu, 'keeperiod' geçince siler.
+    Abone olunan değişkenlerin dosyalarına istemci bakar; değişiklik, öncekiyle karşılaştırılarak bulunur.
+    Beklerken dosyalara aralıklarla bakılmaz; yazan taraf, bekleyeni dizindeki FIFO ile uyandırır. Bkz. Wakeup
+    """
+
+    # Sunucu, değişikliklerin kaydını göndermez. Bkz. WriteBehind.record
+    pushes = False
+
+    def __init__(self, dr_dir, worker=False, looperiod=.05, keeperiod=10):
+        self.dr_dir = dr_dir
+        self.worker = worker
+        self.looperiod = looperiod
+        self.keeperiod = keeperiod
+
+        # Günlüğün şu anki parçası. İstemcide yazma, sunucuda okuma dosyası
+        self.segment = 0
+        self.journal = None
+
+        # İstemci; çağrıların fonksiyonları, {kod: (fonksiyon adı, zaman)}
+        self.funcs = {}
+        self.lock = threading.Lock()
+        # İstemci; abone olunan değişkenlerin son görülen dosyaları; {ad: ((değişme zamanı, boyut), değer)}
+        self.subscribed = {}
+
+        # Sunucu; okunmuş ama satırı henüz bitmemiş kısım, işlenecek çağrıların parametreleri ve
+        # yazılan dönüş dosyaları, {kod: (dosya, zaman)}
+        self.tail = b""
+        self.pending = {}
+        self.records = {}
+        self.func_dirs = set()
+
+        # Sunucuyu istemci, istemciyi sunucu uyandırır
+        wake_worker, wake_client = os.path.join(dr_dir, "wake-worker"), os.path.join(dr_dir, "wake-client")
+        self.wake = Wakeup(wake_worker, wake_client) if worker else Wakeup(wake_client, wake_worker)
+
+        if not worker:
+            self.journal = open(self.journal_path(0), "ab")
+
+    def start(self):
+        pass
+
+    def accepts(self, value):
+        """Taşınabilir mi. Dosyalar JSON'dur"""
+        return check_type(value)
+
+    def journal_path(self, segment):
+        return os.path.join(self.dr_dir, f"journal-{segment}")
+
+    # ################################ Değişkenler
+    def get(self, key):
+        """(değer var mı, değer) döndürür"""
+        file = os.path.join(self.dr_dir, key)
+        if os.path.exists(file):
+            try:
+                with open(file) as f:
+                    return True, json.load(f).get(VALUE)
+            except:
+                pass
+        return False, None
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def delete(self, key):
+        self.update({}, [key])
+
+    def update(self, values, deleted=(), ops=None):
+        """Değişkenleri birlikte yazar ve 'deleted'dakileri siler. 'ops' kullanılmaz"""
+        # Aynı anda birden fazla thread yazabilir. Okuyan, yarım dosya görmesin. Önce hepsi yazılır, sonra
+        # hepsi birden yerine konur; okuyanın eski ve yeni değerleri karışık gördüğü süre kısa olur
+        temps = []
+        for key, value in values.items():
+            file = os.path.join(self.dr_dir, key)
+            temp = f"{file}.{threading.get_ident()}.tmp"
+            with open(temp, "w") as f:
+                json.dump({VALUE: value}, f)
+            temps.append((temp, file))
+        for temp, file in temps:
+            os.replace(temp, file)
+
+        # Eğer kaydedilemeyen bir tip ise, dosyada var olanı da sil ki, çağırırken sorun yaşanmasın
+        for key in deleted:
+            try:
+                os.remove(os.path.join(self.dr_dir, key))
+            except OSError:
+                pass
+
+        # Abone olan istemci, değişikliği beklemeden görsün
+        if self.worker:
+            self.wake.notify()
+
+    # ################################ İstemci
+    def call(self, func_name, code, args, kwargs):
+        """Çağrıyı günlüğe ekler. Kullanılan kodu döndürür"""
+        self.call_many([[func_name, code, args, kwargs]])
+        return code
+
+    def call_many(self, calls):
+        """Çağrıları tek yazmayla günlüğe ekler; [[fonksiyon adı, kod, args, kwargs], ...]"""
+        data = b"".join(json.dumps(call).encode() + b"\n" for call in calls)
+
+        with self.lock:
+            # Kapatıldı
+            if self.journal is None:
+                return
+
+            self.journal.write(data)
+            self.journal.flush()
+
+            # Parça doldu. Önce yenisi oluşturulur, sonra eskisinin sonuna bittiğini yazarız
+            if self.journal.tell() > JOURNAL_MAX:
+                self.segment += 1
+                journal = open(self.journal_path(self.segment), "ab")
+                self.journal.write(b"null\n")
+                self.journal.close()
+                self.journal = journal
+
+        self.wake.notify()
+
+        # Süresi geçenler unutulur; sunucu onların dönüşlerini zaten silmiştir
+        now = time.time()
+        funcs = self.funcs
+        while funcs:
+            first = next(iter(funcs))
+            if now - funcs[first][1] < self.keeperiod:
+                break
+            funcs.pop(first)
+        for func_name, code, args, kwargs in calls:
+            funcs[code] = (func_name, now)
+
+    def result(self, code, wait=0, func_name=None):
+        """Koddaki çağrının dönüşü. 'func_name' verilmezse, tüm fonksiyon klasörlerinde aranır"""
+        code = int(code)
+        if func_name is None:
+            func_name = self.funcs.get(code, (None,))[0]
+
+        if func_name is None:
+            for name in [j for j in os.listdir(self.dr_dir) if os.path.isdir(os.path.join(self.dr_dir, j))]:
+                if str(code) in os.listdir(os.path.join(self.dr_dir, name)):
+                    func_name = name
+                    break
+            else:
+                return None
+
+        path_code = os.path.join(self.dr_dir, func_name, str(code))
+        result = get_result(path_code, wait, self.wake)
+
+        # Dönüş alındı, kaydı tutmaya gerek yok
+        if result is not None:
+            self.funcs.pop(code, None)
+            try:
+                os.remove(path_code)
+            except OSError:
+                pass
+        return result
+
+    def result_many(self, codes, wait=0):
+        """Kodlardaki çağrıların dönüşleri, sırayla. 'wait' hepsi için toplam bekleme süresidir"""
+        deadline = time.time() + wait
+        return [self.result(code, wait if wait < 0 else max(0, deadline - time.time())) for code in codes]
+
+    def watch(self, code):
+        pass
+
+    def subscribe(self, key):
+        # İlk bakışta şimdiki değer gönderilir
+        self.subscribed[key] = None
+
+    def unsubscribe(self, key):
+        self.subscribed.pop(key, None)
+
+    def poll(self):
+        """Abone olunan değişkenlerin son bakıştan beri değişiklikleri; [[ad, işlem, değer], ...]"""
+        deltas = []
+        for key, last in list(self.subscribed.items()):
+            try:
+                stat = os.stat(os.path.join(self.dr_dir, key))
+                stamp = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamp = None
+            if last is not None and last[0] == stamp:
+                continue
+
+            found, value = self.get(key) if stamp else (False, None)
+            old = last[1] if last else MISSING
+            if not found:
+                if old is not MISSING or last is None:
+                    deltas.append([key, "delete", None])
+                value = MISSING
+            elif type(old) is list and type(value) is list and value != old:
+                # Baştan silinip sona eklendiyse, sadece onlar gönderilir. Eskinin kalanıyla başladığı ilk yer aranır
+                size = len(old)
+                trim = next((i for i in range(size) if old[i] == value[0] and value[:size - i] == old[i:]), size) \
+                    if value else size
+                if trim == size and old:
+                    deltas.append([key, "set", value])
+                    trim = None
+                elif trim:
+                    deltas.append([key, "trim", trim])
+                if trim is not None and len(value) > size - trim:
+                    deltas.append([key, "append", value[size - trim:]])
+            elif value != old:
+                deltas.append([key, "set", value])
+            if key in self.subscribed:
+                self.subscribed[key] = (stamp, value)
+        return deltas
+
+    def completions(self, codes, wait=0):
+        """
+        'codes'tan bitenler ve abone olunan değişkenlerin değişiklikleri;
+        ([[kod, dönüş], ...], [[ad, işlem, değer], ...]). codes: {kod: fonksiyon adı}
+        Klasörler taranmaz; her çağrı için kendi dosyasına bakılır. Biten yoksa, sunucu uyandırana kadar bekler
+        """
+        deadline = time.time() + wait
+        delay = WAIT_MIN_DELAY
+        while True:
+            deltas = self.poll() if self.subscribed else []
+            completed = []
+            for code, func_name in codes.items():
+                func_name = func_name or self.funcs.get(code, (None,))[0]
+                if func_name is None:
+                    result = self.result(code)
+                    if result is not None:
+                        completed.append([code, result])
+                    continue
+
+                path_code = os.path.join(self.dr_dir, func_name, str(code))
+                if not os.path.exists(path_code):
+                    continue
+                try:
+                    with open(path_code) as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if RESULT in data:
+                    # Dönüş alındı, kaydı tutmaya gerek yok
+                    self.funcs.pop(code, None)
+                    try:
+                        os.remove(path_code)
+                    except OSError:
+                        pass
+                    completed.append([code, data[RESULT]])
+
+            if completed or deltas or not self.isactive() or (0 <= wait and deadline <= time.time()):
+                return completed, deltas
+
+            timeout = WAKE_MAX_DELAY if wait < 0 else min(WAKE_MAX_DELAY, deadline - time.time())
+            if not self.wake.wait(timeout):
+                time.sleep(delay)
+                delay = min(delay * 2, WAIT_MAX_DELAY)
+
+    # ################################ Sunucu
+    def calls(self):
+        """
+        Günlükteki yeni çağrıları (fonksiyon adı, kod) olarak verir. Yeni çağrı yoksa, istemci uyandırana kadar
+        en fazla 'looperiod' kadar bekler
+        """
+        self.collect()
+
+        items = self.read_journal()
+        for func_name, code, args, kwargs in items:
+            code = str(code)
+            self.pending[code] = {ARGS: args, KWARGS: kwargs}
+            yield func_name, code
+
+        if not items and not self.wake.wait(self.looperiod):
+            time.sleep(self.looperiod)
+
+    def read_journal(self):
+        """Günlükte, en son okunan yerden sonra eklenmiş tam satırlar"""
+        if self.journal is None:
+            try:
+                self.journal = open(self.journal_path(self.segment), "rb")
+            except OSError:
+                return []
+
+        data = self.journal.read()
+        if not data:
+            return []
+
+        *lines, self.tail = (self.tail + data).split(b"\n")
+        items = []
+        for line in lines:
+            item = json.loads(line)
+
+            # Parça bitti, sonrakine geç
+            if item is None:
+                self.journal.close()
+                self.journal = None
+                self.tail = b""
+                try:
+                    os.remove(self.journal_path(self.segment))
+                except OSError:
+                    pass
+                self.segment += 1
+                return items + self.read_journal()
+
+            items.append(item)
+        return items
+
+    def request(self, func_name, code):
+        """Çağrının parametreleri; {ARGS: [], KWARGS: {}}"""
+        return self.pending.pop(code, None)
+
+    def respond(self, func_name, code, data, result):
+        path = os.path.join(self.dr_dir, func_name)
+        file = os.path.join(path, code)
+        data[RESULT] = result
+
+        try:
+            if func_name not in self.func_dirs:
+                os.makedirs(path, exist_ok=True)
+                self.func_dirs.add(func_name)
+
+            # İstemci yarım dosya okumasın diye, önce başka isimle yazılır
+            with open(file + ".tmp", "w") as f:
+                json.dump(data, f)
+            os.replace(file + ".tmp", file)
+        except OSError:
+            # İstemci, çağrı sürerken kapandı ve dizini sildi; dönüşü okuyacak kimse yok
+            if self.isactive():
+                raise
+            return
+        self.wake.notify()
+
+        with self.lock:
+            self.records[code] = (file, time.time())
+
+    def collect(self):
+        """Okunmadan 'keeperiod' süresi geçen dönüşleri siler"""
+        records = self.records
+        limit = time.time() - self.keeperiod
+        while records:
+            with self.lock:
+                code = next(iter(records))
+                file, written = records[code]
+                if written > limit:
+                    break
+                records.pop(code)
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+
+    def isactive(self):
+        return os.path.exists(self.dr_dir)
+
+    def terminate(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self.wake.close()
+        if os.path.exists(self.dr_dir):
+            shutil.rmtree(self.dr_dir, ignore_errors=True)
 
-    return None
+
+class SocketTransport:
+    """
+    Çağrılar, dönüşler ve değişkenler sunucunun belleğinde tutulur, multiprocessing.connection ile taşınır.
+    Unix'te Unix domain socket, Windows'ta named pipe kullanılır.
+
+    Değişkenlerin asıl değeri sunucudadır. Her değişiklikte sunucu, nesil sayacını artırır. Sayaç, dizindeki
+    'generation' dosyası üzerinden iki tarafa da map edilir. İstemci okumaları kendi kopyasından yapar; sayaç
+    değiştiyse önce sadece değişenleri sunucudan alır. Böylece sık okumalar, sistem çağrısı yapmaz.
+    İstemci yazmada cevap beklemez.
+    Sunucuda bağlantıyı ayrı bir thread dinler; değişken okuma/yazma, çalışan fonksiyonu beklemeden cevaplanır.
+    Çağrılar kuyruğa alınır ve sunucunun ana döngüsünde sırayla işlenir.
+    Cevap bekleyen istemci, sunucu cevabı kaydedene kadar okumada uyur; bekleme işlemci harcamaz.
+    İstemci bağlantıyı kapatınca sunucu da kapanır.
+    Okunan dönüş silinir. Okunmayanlar 'keeperiod' geçince silinir.
+    Abone olunan değişkenlerin değişiklikleri, sunucu tarafından bitenlerle birlikte gönderilir. Listeye eklenenler
+    ve baştan silinenler, tüm liste yerine gönderilir. İstemcinin kopyası da bunlarla güncellenir.
+    """
+
+    def __init__(self, dr_dir, worker=False, looperiod=.05, keeperiod=10, authkey=b"", codec="bytes"):
+        self.dr_dir = dr_dir
+        self.worker = worker
+        self.looperiod = looperiod
+        self.keeperiod = keeperiod
+        self.authkey = authkey or None
+        self.active = True
+        # Sunucu, değişikliklerin kaydını abonelere gönderir. Bkz. WriteBehind.record
+        self.pushes = worker
+
+        # Mesajların çerçevelere çevrilmesi. Bkz. CODECS
+        self.codec = CODECS[codec]()
+        self.accepts = self.codec.accepts
+
+        if sys.platform == "win32":
+            self.family = "AF_PIPE"
+            self.address = r"\\.\pipe\dirio-" + os.path.basename(dr_dir)
+        else:
+            self.family = "AF_UNIX"
+            self.address = os.path.join(dr_dir, "dirio.sock")
+
+        # Nesil sayacının dosyası ve map'i. Sunucuda son değişikliğin, istemcide son alınan değişikliğin nesli
+        self.gen_path = os.path.join(dr_dir, "generation")
+        self.gen_map = None
+        self.generation = 0
+
+        # İstemci
+        self.conn = None
+        self.lock = threading.Lock()
+        # Bitenlerin beklendiği ayrı bağlantı
+        self.events = None
+        self.events_lock = threading.Lock()
+        # Sunucudaki değişkenlerin kopyası
+        self.mirror = {}
+
+        # Sunucu
+        self.listener = None
+        self.values = {}
+        # Değişkenin son değiştiği nesil; {ad: nesil}. Silinenler de tutulur
+        self.changed = {}
+        self.store = threading.Lock()
+        # Çağrıların parametreleri ve dönüşleri; {kod: {ARGS: [], KWARGS: {}}}, {kod: [fonksiyon adı, dönüş, zaman]}
+        self.pending = {}
+        self.results = {}
+        # Süresi geçen dönüşlerin en son ne zaman temizlendiği
+        self.collected = time.time()
+        self.queue = queue.Queue()
+        # Cevap kaydedildiğinde, bekleyen okumayı uyandırır
+        self.done = threading.Condition()
+        # Dönüşü bitince gönderilecek çağrılar ve gönderilmeyi bekleyen dönüşleri; [[kod, dönüş], ...]
+        self.watched = set()
+        self.completed = []
+        # Abone olunan değişkenler ve gönderilmeyi bekleyen değişiklikleri; [[ad, işlem, değer], ...]
+        self.subscribed = set()
+        self.deltas = []
+
+    def start(self):
+        with open(self.gen_path, "wb+") as f:
+            f.write(bytes(8))
+            f.flush()
+            self.gen_map = mmap.mmap(f.fileno(), 8)
+        self.listener = Listener(self.address, self.family, authkey=self.authkey)
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        conn = self.accept()
+        if conn is None:
+            self.stop()
+            return
+
+        # Sonraki bağlantılar; istemcinin bitenleri beklediği bağlantı gibi. Bkz. completions
+        threading.Thread(target=self.serve_more, daemon=True).start()
+
+        # İlk bağlantı kapanınca sunucu da kapanır
+        self.talk(conn)
+        self.stop()
+
+    def serve_more(self):
+        while self.active:
+            conn = self.accept()
+            if conn is None:
+                return
+            threading.Thread(target=self.talk, args=(conn,), daemon=True).start()
+
+    def accept(self):
+        """Doğrulanan ilk bağlantı. Soket kapandıysa None"""
+        while True:
+            try:
+                return self.listener.accept()
+            except OSError:
+                return None
+            except Exception:
+                # Doğrulanamayan bağlantı
+                continue
+
+    def talk(self, conn):
+        try:
+            while self.active:
+                reply = self.handle(self.codec.recv(conn))
+                if reply is not None:
+                    self.codec.send(conn, reply)
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def handle(self, msg):
+        """İstemciden gelen mesajı işler. Cevap verilecekse liste döndürür"""
+        op = msg[0]
+        if op == "m":
+            # İstemci kendi yazdığını zaten bilir
+            self.publish(msg[1], msg[2], push=False)
+        elif op == "v":
+            return self.changes(msg[1])
+        elif op == "c":
+            _, func_name, code, args, kwargs = msg
+            self.pending[code] = {ARGS: args, KWARGS: kwargs}
+            self.queue.put((func_name, str(code)))
+        elif op == "b":
+            for func_name, code, args, kwargs in msg[1]:
+                self.pending[code] = {ARGS: args, KWARGS: kwargs}
+                self.queue.put((func_name, str(code)))
+        elif op == "r":
+            _, code, func_name, wait = msg
+            with self.done:
+                self.done.wait_for(lambda: code in self.results or not self.active, None if wait < 0 else wait)
+            with self.done:
+                result = self.results.get(code)
+                if result and func_name in (None, result[0]):
+                    # Dönüş alındı, kaydı tutmaya gerek yok
+                    self.results.pop(code)
+                    return [True, result[1]]
+            return [False, None]
+        elif op == "R":
+            _, codes, wait = msg
+            with self.done:
+                self.done.wait_for(lambda: all(code in self.results for code in codes) or not self.active,
+                                   None if wait < 0 else wait)
+                # Alınan dönüşlerin kaydı silinir
+                return [self.results.pop(code)[1] if code in self.results else None for code in codes]
+        elif op == "w":
+            # Dönüşü, bitince 'f' ile bekleyene gönderilir
+            with self.done:
+                code = msg[1]
+                if code in self.results:
+                    self.completed.append([code, self.results.pop(code)[1]])
+                    self.done.notify_all()
+                else:
+                    self.watched.add(code)
+        elif op == "u":
+            # Değişikliklerin 'f' ile gönderilmesi; önce şimdiki değeri gider
+            with self.store:
+                key = msg[1]
+                self.subscribed.add(key)
+                self.push([[key, "set", self.values[key]] if key in self.values else [key, "delete", None]])
+        elif op == "U":
+            with self.store:
+                self.subscribed.discard(msg[1])
+                # İstemci, kopyasını yeniden 'v' ile alır
+                self.generation += 1
+                self.changed[msg[1]] = self.generation
+                struct.pack_into("<Q", self.gen_map, 0, self.generation)
+        elif op == "f":
+            with self.done:
+                self.done.wait_for(lambda: self.completed or self.deltas or not self.active,
+                                   None if msg[1] < 0 else msg[1])
+                completed, self.completed = self.completed, []
+                deltas, self.deltas = self.deltas, []
+                return [completed, deltas]
+        elif op == "x":
+            self.stop()
+
+    def publish(self, values, deleted=(), ops=None, push=True):
+        """
+        Sunucu; değişkenleri kaydeder ve nesil sayacını bir kez artırır. Okuyan, hepsini birlikte görür.
+        Abone olunanların değişiklikleri gönderilir; 'ops'ta kaydı olanların tüm değeri yerine kaydı.
+        ops: {ad: [[işlem, değer], ...]}. Bkz. WriteBehind.record
+        """
+        with self.store:
+            deleted = [key for key in deleted if key in self.values]
+            if not values and not deleted:
+                return
+
+            self.generation += 1
+            for key in deleted:
+                self.values.pop(key)
+                self.changed[key] = self.generation
+            for key, value in values.items():
+                self.values[key] = value
+                self.changed[key] = self.generation
+            struct.pack_into("<Q", self.gen_map, 0, self.generation)
+
+            if push and self.subscribed:
+                ops = ops or {}
+                deltas = [[key, "delete", None] for key in deleted if key in self.subscribed]
+                for key, value in values.items():
+                    if key not in self.subscribed:
+                        continue
+                    if key in ops:
+                        deltas.extend([key, op, arg] for op, arg in ops[key])
+                    else:
+                        deltas.append([key, "set", value])
+                self.push(deltas)
+
+    def push(self, deltas):
+        """Sunucu; değişiklikleri, 'f' ile bekleyene gönderilmek üzere sıraya ekler"""
+        if deltas:
+            with self.done:
+                self.deltas.extend(deltas)
+                self.done.notify_all()
+
+    def changes(self, since):
+        """
+        Sunucu; 'since' neslinden sonra değişenler -> [nesil, {ad: değer}, [silinenler]]
+        Abone olunanlar gönderilmez; onların değişiklikleri 'f' ile gider
+        """
+        with self.store:
+            keys = [key for key, gen in self.changed.items() if gen > since and key not in self.subscribed]
+            return [self.generation,
+                    {key: self.values[key] for key in keys if key in self.values},
+                    [key for key in keys if key not in self.values]]
+
+    def refresh(self):
+        """İstemci; sunucudaki değişkenler değiştiyse, kopyayı günceller"""
+        gen_map = self.gen_map
+        if gen_map is not None and struct.unpack_from("<Q", gen_map)[0] == self.generation:
+            return
+
+        reply = self.send(["v", self.generation], reply=True)
+        if reply is None:
+            return
+
+        self.generation, values, deleted = reply
+        self.mirror.update(values)
+        for key in deleted:
+            self.mirror.pop(key, None)
+
+        # Bağlantı kurulduysa, sunucu sayacı da oluşturmuştur
+        if gen_map is None and self.active:
+            try:
+                with open(self.gen_path, "rb") as f:
+                    self.gen_map = mmap.mmap(f.fileno(), 8, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                pass
+
+    def stop(self):
+        # Önce soket kapatılır; ana döngü çıkışta onu beklemez
+        if self.listener:
+            try:
+                self.listener.close()
+            except OSError:
+                pass
+        self.active = False
+        self.queue.put(None)
+        with self.done:
+            self.done.notify_all()
+
+    def send(self, msg, reply=False):
+        with self.lock:
+            if not self.active:
+                return None
+            try:
+                if self.conn is None:
+                    self.conn = self.connect()
+                self.codec.send(self.conn, msg)
+                if reply:
+                    return self.codec.recv(self.conn)
+            except (EOFError, OSError):
+                self.active = False
+        return None
+
+    def connect(self):
+        # Sunucu henüz başlamamış olabilir
+        deadline = time.time() + CONNECT_TIMEOUT
+        while True:
+            try:
+                return Client(self.address, self.family, authkey=self.authkey)
+            except OSError:
+                if time.time() > deadline or not os.path.exists(self.dr_dir):
+                    raise
+                time.sleep(.005)
+
+    # ################################ Değişkenler
+    def get(self, key):
+        if self.worker:
+            values = self.values
+        else:
+            self.refresh()
+            values = self.mirror
+        return key in values, values.get(key)
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def delete(self, key):
+        self.update({}, [key])
+
+    def update(self, values, deleted=(), ops=None):
+        """Değişkenleri tek mesajla yazar ve 'deleted'dakileri siler. 'ops', sunucuda abonelere gönderilir"""
+        if self.worker:
+            self.publish(values, deleted, ops)
+        else:
+            self.mirror.update(values)
+            for key in deleted:
+                self.mirror.pop(key, None)
+            self.send(["m", values, list(deleted)])
+
+    # ################################ İstemci
+    def call(self, func_name, code, args, kwargs):
+        self.send(["c", func_name, code, args, kwargs])
+        return code
+
+    def call_many(self, calls):
+        """Çağrıları tek mesajla gönderir; [[fonksiyon adı, kod, args, kwargs], ...]"""
+        self.send(["b", calls])
+
+    def result(self, code, wait=0, func_name=None):
+        # -1 ise cevap gelene kadar bekle, 0 ise sadece bir kere kontrol et, 5 gibi değer ise 5 sn kadar bekle
+        # Bekleme sunucuda yapılır, istemci cevabı okurken uyur
+        done, value = self.send(["r", int(code), func_name, wait], reply=True) or (False, None)
+        return value
+
+    def result_many(self, codes, wait=0):
+        """Kodlardaki çağrıların dönüşleri, sırayla. Hepsi tek mesajla istenir, tek cevapla gelir"""
+        return self.send(["R", [int(code) for code in codes], wait], reply=True) or [None] * len(codes)
+
+    def watch(self, code):
+        """Çağrının dönüşü bitince completions'a gelir; okumak için beklenmez"""
+        self.send(["w", int(code)])
+
+    def subscribe(self, key):
+        """Değişkenin değişiklikleri completions'a gelir. İlk olarak şimdiki değeri gelir"""
+        self.send(["u", key])
+
+    def unsubscribe(self, key):
+        self.send(["U", key])
+
+    def completions(self, codes, wait=0):
+        """
+        İzlenen çağrılardan bitenler ve abone olunan değişkenlerin değişiklikleri;
+        ([[kod, dönüş], ...], [[ad, işlem, değer], ...]). Sunucu, ayrı bağlantıdan bildirene kadar bekler.
+        'codes' kullanılmaz; sunucu izlenenleri bilir. Değişiklikler, okumalar için kopyaya da işlenir
+        """
+        completed, deltas = self.wait_events(wait) or ([], [])
+
+        mirror = self.mirror
+        for key, op, value in deltas:
+            if op == "set":
+                # Aboneye verilen değer, kopyadakiyle paylaşılmaz
+                mirror[key] = snapshot(value)
+            elif op == "delete":
+                mirror.pop(key, None)
+            elif type(mirror.get(key)) is not list:
+                continue
+            elif op == "append":
+                mirror[key].extend(value)
+            elif op == "trim":
+                del mirror[key][:value]
+            elif op == "clear":
+                mirror[key].clear()
+        return completed, deltas
+
+    def wait_events(self, wait):
+        """Sunucudan, ayrı bağlantıyla bitenleri ve değişiklikleri bekler -> [bitenler, değişiklikler]"""
+        with self.events_lock:
+            if not self.active:
+                return None
+            try:
+                if self.events is None:
+                    self.events = self.connect()
+                self.codec.send(self.events, ["f", wait])
+                return self.codec.recv(self.events)
+            except (EOFError, OSError):
+                self.active = False
+                return None
+
+    # ################################ Sunucu
+    def calls(self):
+        if time.time() - self.collected > min(1, self.keeperiod):
+            self.collect()
+
+        try:
+            item = self.queue.get(timeout=self.looperiod)
+        except queue.Empty:
+            return
+
+        while item is not None:
+            yield item
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def request(self, func_name, code):
+        return self.pending.pop(int(code), None)
+
+    def respond(self, func_name, code, data, result):
+        code = int(code)
+        with self.done:
+            if code in self.watched:
+                self.watched.discard(code)
+                self.completed.append([code, result])
+            else:
+                self.results[code] = [func_name, result, time.time()]
+            self.done.notify_all()
+
+    def collect(self):
+        """Okunmadan 'keeperiod' süresi geçen dönüşleri siler"""
+        self.collected = time.time()
+        limit = self.collected - self.keeperiod
+        with self.done:
+            for code in [code for code, result in self.results.items() if result[2] < limit]:
+                self.results.pop(code)
+
+    def isactive(self):
+        # Sunucu kapanınca bağlantı da kopar; dizine bakmaya gerek yok
+        return self.active
+
+    def terminate(self):
+        if not self.worker:
+            self.send(["x"])
+            with self.lock:
+                self.active = False
+                if self.conn:
+                    self.conn.close()
+                    self.conn = None
+            # Bitenleri bekleyen thread, sunucu kapanınca bağlantıyı bırakır; okurken kapatılmaz
+            with self.events_lock:
+                if self.events:
+                    self.events.close()
+                    self.events = None
+        self.stop()
+        if self.gen_map is not None:
+            self.gen_map.close()
+            self.gen_map = None
+        if os.path.exists(self.dr_dir):
+            shutil.rmtree(self.dr_dir, ignore_errors=True)
+
+
+class CallPool:
+    """
+    Sunucuda çağrıları thread havuzunda çalıştırır. Metodların politikası, hedef sınıfın '_dr_policies'
+    sözlüğünde yazılır; {metod adı: politika}. Politikalar;
+        "serial"    : Varsayılan. Diğer serial çağrılarla geliş sırasıyla, tek tek çalışır.
+        "parallel"  : Boş thread varsa hemen çalışır.
+        "exclusive" : Çalışanların bitmesini bekler, tek başına çalışır. Sonra gelenler de onu bekler.
+    """
+
+    def __init__(self, run, workers=4, policies=None):
+        self.run = run
+        self.workers = max(1, workers)
+        self.policies = policies or {}
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="dirio")
+        self.lock = threading.Lock()
+
+        # Sırası gelmemiş çağrılar; (fonksiyon adı, kod, politika)
+        self.waiting = deque()
+        self.running = 0
+        self.serial = False
+        self.exclusive = False
+
+    def submit(self, func_name, code):
+        with self.lock:
+            self.waiting.append((func_name, code, self.policies.get(func_name, SERIAL)))
+            self.dispatch()
+
+    def dispatch(self):
+        """Sırası gelen çağrıları başlatır. Kilit alınmış olarak çağrılmalı"""
+        serial = self.serial
+        for item in list(self.waiting):
+            if self.exclusive or self.running >= self.workers:
+                break
+
+            func_name, code, policy = item
+            if policy == EXCLUSIVE:
+                # Önündekiler başlamadan ve çalışanlar bitmeden başlamaz, arkasındakiler de onu bekler
+                if self.running or item is not self.waiting[0]:
+                    break
+                self.exclusive = True
+            elif policy != PARALLEL:
+                # Sıradaki serial çağrı çalışıyorsa, sonraki serial çağrılar da bekler
+                if serial:
+                    continue
+                serial = self.serial = True
+
+            self.waiting.remove(item)
+            self.running += 1
+            self.executor.submit(self.execute, func_name, code, policy)
+
+    def execute(self, func_name, code, policy):
+        try:
+            self.run(func_name, code)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            with self.lock:
+                self.running -= 1
+                if policy == EXCLUSIVE:
+                    self.exclusive = False
+                elif policy != PARALLEL:
+                    self.serial = False
+                self.dispatch()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+class ThreadTransport(SocketTransport):
+    """
+    Sunucu aynı işlemde, ayrı bir thread'de çalışır. İşlem yalıtımı gerekmiyorsa, Python'un açılışı, soket ve
+    codec yükü olmadan kullanılır. Bkz. start_thread
+    SocketTransport'un sunucu tarafı aynen kullanılır; istemcinin mesajları, bağlantı yerine doğrudan sunucunun
+    'handle'ına verilir. Mesajlar kopyalanır; iki taraf aynı list ve dict'i paylaşmaz, tuple'lar list olur.
+    Taşınabilen tipler, "bytes" codec'indeki gibidir.
+    """
+
+    # Çalışan sunucular; {ad: sunucunun taşıması}
+    servers = {}
+
+    def start(self):
+        # Nesil sayacı paylaşılır; istemci, sunucunun sayacını doğrudan okur
+        self.gen_map = bytearray(8)
+        ThreadTransport.servers[self.dr_dir] = self
+
+    def send(self, msg, reply=False):
+        if not self.active:
+            return None
+        try:
+            if self.conn is None:
+                self.conn = self.connect()
+        except OSError:
+            self.active = False
+            return None
+
+        result = self.conn.handle(snapshot(msg))
+        return snapshot(result) if reply else None
+
+    def connect(self):
+        # Sunucu henüz başlamamış olabilir
+        deadline = time.time() + CONNECT_TIMEOUT
+        while self.dr_dir not in ThreadTransport.servers:
+            if time.time() > deadline:
+                raise OSError(f"Dirio thread {self.dr_dir} did not start")
+            time.sleep(.001)
+
+        server = ThreadTransport.servers[self.dr_dir]
+        self.gen_map = server.gen_map
+        return server
+
+    def wait_events(self, wait):
+        return self.send(["f", wait], reply=True)
+
+    def terminate(self):
+        if not self.worker:
+            self.send(["x"])
+        self.stop()
+        ThreadTransport.servers.pop(self.dr_dir, None)
+
+
+TRANSPORTS = {
+    "file": FileTransport,
+    "socket": SocketTransport,
+    "thread": ThreadTransport,
+}
+
+
+def snapshot(value):
+    """list ve dict'in o anki kopyası. DrList ve DrDict, düz list ve dict olur. tuple, JSON'daki gibi list olur"""
+    if isinstance(value, (list, tuple)):
+        return [snapshot(i) for i in value]
+    if isinstance(value, dict):
+        return {k: snapshot(v) for k, v in value.items()}
+    return value
+
+
+class WriteBehind:
+    """
+    Değişken yazmalarını biriktirir; ilk yazmadan 'period' sn sonra hepsini birlikte taşımaya yazar.
+    Aynı değişkene art arda yazılırsa sadece son değeri gönderilir. Böylece DrVar'a her eklemede tüm değişken
+    yeniden yazılmaz. 'period' 0 ise her yazma hemen gönderilir.
+    Yazan taraf, gönderilmemiş değeri okur. Karşı taraf, bir gönderimdeki değişikliklerin hepsini birlikte görür.
+    İşlem (transaction) açıkken gönderilmez; işlem bitince hepsi birden gönderilir.
+    Sunucuda DrList'e yapılan ekleme ve baştan silmeler de kaydedilir; abonelere tüm liste yerine bunlar gönderilir.
+    """
+
+    def __init__(self, transport, period=.05):
+        self.transport = transport
+        self.period = period
+        # Gönderilmemiş değerler; {ad: değer}
+        self.dirty = {}
+        # Son gönderimden beri listelere yapılanlar; {ad: (liste, [[işlem, değer], ...], kayıttaki uzunluğu)}.
+        # Bilinmeyen işlemde None
+        self.ops = {}
+        self.lock = threading.RLock()
+        # İç içe açık işlem sayısı
+        self.depth = 0
+        self.timer = None
+
+    def get(self, key):
+        """(değer var mı, değer) döndürür"""
+        value = self.dirty.get(key, MISSING)
+        if value is MISSING:
+            return self.transport.get(key)
+        return True, value
+
+    def record(self, key, value, name, args):
+        """
+        DrList'teki değişikliği kaydeder; sona ekleme, baştan silme ve temizleme. Diğerleri, tüm değerin değişmesi
+        sayılır. Kayıt, DrList'in kopyalandığı değere göre yapılır. Bkz. SocketTransport.publish
+        """
+        if not self.transport.pushes:
+            return
+
+        with self.lock:
+            if key in self.dirty:
+                target, log, size = self.ops.get(key, (None, None, -1))
+                # Arada değer tümüyle yazıldıysa, kayıt geçersizdir. DrList, aynı liste üzerinde değişebilir;
+                # değişmeden önceki uzunluk, kayıttakidir
+                if target is not self.dirty[key]:
+                    log = None
+            else:
+                base = self.transport.get(key)[1]
+                log = []
+                size = len(base) if type(base) is list else -1
+
+            if not isinstance(value, list):
+                size = -1
+            op = None
+            if log is None or size < 0:
+                pass
+            elif name in ("append", "extend", "__iadd__") and len(value) >= size:
+                op = ["append", value[size:]]
+            elif name == "clear":
+                op = ["clear", None]
+            elif name in ("pop", "__delitem__") and len(value) < size and args:
+                item = args[0]
+                if (isinstance(item, slice) and item.start in (None, 0) and item.step is None) or \
+                        (type(item) is int and item == 0):
+                    op = ["trim", size - len(value)]
+
+            if op is None:
+                log = None
+            elif log and op[0] == log[-1][0] == "append":
+                log[-1][1].extend(op[1])
+            else:
+                log.append(op)
+            self.ops[key] = (value, log, len(value) if log else -1)
+
+    def set(self, key, value):
+        with self.lock:
+            # Kaydedilen değişikliklerin listesi değilse, değer tümüyle değişmiştir
+            if key in self.ops and self.ops[key][0] is not value:
+                self.ops[key] = (value, None, -1)
+            self.dirty[key] = value
+            if self.depth or self.timer:
+                return
+            if self.period > 0:
+                self.timer = threading.Timer(self.period, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+                return
+        self.flush()
+
+    def flush(self, force=False):
+        """Biriken yazmaları gönderir. İşlem açıksa, 'force' verilmedikçe gönderilmez"""
+        if not self.dirty:
+            return
+
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            if self.depth and not force:
+                return
+
+            values, deleted, ops = {}, [], {}
+            for key, value in self.dirty.items():
+                # Eğer kaydedilemeyen bir tip ise, kayıtlı olanı da sil ki, çağırırken sorun yaşanmasın
+                if self.transport.accepts(value):
+                    values[key] = snapshot(value)
+                    log = self.ops.get(key, (None, None, -1))[1]
+                    if log:
+                        ops[key] = snapshot(log)
+                else:
+                    deleted.append(key)
+
+            # Gönderilene kadar okuyan, biriken değeri görür
+            self.transport.update(values, deleted, ops)
+            self.dirty.clear()
+            self.ops.clear()
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.depth += 1
+        try:
+            yield
+        finally:
+            # Hata olsa da gönderilir; yerel değerler zaten değişmiştir
+            with self.lock:
+                self.depth -= 1
+                if not self.depth:
+                    self.flush()
+
+    def close(self):
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            self.dirty.clear()
+            self.ops.clear()
+
+
+class DrEvents:
+    """
+    İstemci; dönüşü Future ile beklenen çağrılar ve değişikliklerine abone olunan değişkenler. Bitenleri ve
+    değişiklikleri ayrı bir thread, taşımadan alır. Future'lara yazar; abonelerin çağrılmasını 'ready'ye ekler.
+    Bekleyen çağrılar ve değişkenler tek tek sorulmaz; socket ile sunucu, bitince/değişince kendisi bildirir.
+    Sunucu kapanırsa bekleyen Future'lar iptal edilir, abonelikler silinir.
+    """
+
+    def __init__(self, transport, ready):
+        self.transport = transport
+        self.ready = ready
+        # {kod: (fonksiyon adı, Future)}
+        self.pending = {}
+        # {değişken adı: [callback, ...]}
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def __len__(self):
+        return len(self.pending)
+
+    def start(self):
+        # self.lock içinde çağrılır
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True, name="dirio-events")
+            self.thread.start()
+
+    def add(self, code, func_name=None):
+        future = Future()
+        with self.lock:
+            self.pending[int(code)] = (func_name, future)
+            self.start()
+        self.transport.watch(code)
+        return future
+
+    def subscribe(self, key, callback):
+        with self.lock:
+            self.subscribers.setdefault(key, []).append(callback)
+            self.start()
+        # Yeni abone de şimdiki değeri alsın diye her seferinde gönderilir
+        self.transport.subscribe(key)
+
+    def unsubscribe(self, key, callback=None):
+        with self.lock:
+            callbacks = self.subscribers.get(key, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if callback is not None and callbacks:
+                return
+            self.subscribers.pop(key, None)
+        self.transport.unsubscribe(key)
+
+    @staticmethod
+    def notify(callback, op, value):
+        callback(op, value)
+        return True
+
+    def run(self):
+        transport = self.transport
+        while True:
+            with self.lock:
+                if not (self.pending or self.subscribers) or not transport.isactive():
+                    cancelled = [future for func_name, future in self.pending.values()]
+                    self.pending.clear()
+                    self.subscribers.clear()
+                    self.thread = None
+                    break
+                codes = {code: func_name for code, (func_name, future) in self.pending.items()}
+
+            completed, deltas = transport.completions(codes, .5)
+            for code, result in completed:
+                with self.lock:
+                    item = self.pending.pop(code, None)
+                if item:
+                    item[1].set_result(result)
+
+            for key, op, value in deltas:
+                with self.lock:
+                    callbacks = list(self.subscribers.get(key, ()))
+                for callback in callbacks:
+                    self.ready.append(partial(self.notify, callback, op, value))
+
+        for future in cancelled:
+            future.cancel()
+
+
+class DrBatch:
+    """
+    Bloktaki çağrılar gönderilmez, kodları döndürülür. Blok bitince hepsi tek mesajla gönderilir.
+    İç içe bloklarda, içteki blok bitince o ana kadar biriken tüm çağrılar sırayla gönderilir.
+    """
+
+    def __init__(self, dev):
+        self.dev = dev
+        # Bu bloktaki çağrıların kodları, sırayla
+        self.codes = []
+
+    def add(self, func_name, code, args, kwargs):
+        self.dev._dr_queue.append([func_name, code, args, kwargs])
+        self.codes.append(code)
+        return code
+
+    def __enter__(self):
+        self.dev._dr_batches.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.dev._dr_batches.remove(self)
+        queue = self.dev._dr_queue
+        if queue:
+            # Sunucu, çağrılardan önce yazılan değişkenleri görsün
+            self.dev._dr_store.flush()
+            self.dev._dr_transport.call_many(queue[:])
+            queue.clear()
+
+    def results(self, wait=-1):
+        """Bloktaki çağrıların dönüşleri, çağrı sırasıyla. Hata veren çağrının dönüşü None olur"""
+        return self.dev._dr_transport.result_many(self.codes, wait)
 
 
 def get_decorator(self, func):
+    # Her çağrıda bakmamak için, bir kere hesaplanır
+    func_name = func.__name__
+    # self.metod değilse, (@class veya @static ise) baştaki self parametresi fonksiyona verilmez
+    takes_self = "self" in inspect.getfullargspec(func).args
+
     def wrapper(*args, **kwargs):
         # kwargs'ın içinde,
         # dr_code=True varsa; Okuma kodu döndürür.
@@ -203,49 +1758,52 @@ def get_decorator(self, func):
         # Hiçbiri yoksa     ; En son herhangi bir cevabı döndürür
         dr_code = kwargs.pop("dr_code", False)
         dr_wait = kwargs.pop("dr_wait", 0)
+        # dr_future=True ise; İstemcide, dönüşü bekleyen concurrent.futures.Future döndürür.
+        #       asyncio'da asyncio.wrap_future ile beklenebilir
+        dr_future = kwargs.pop("dr_future", False)
 
-        # Fonksiyonun klasörü
-        path = os.path.join(self._dr_dir, func.__name__)
-
-        # Yoksa oluştur
-        if not os.path.exists(path):
-            os.mkdir(path)
+        # Çağrıların taşındığı yol
+        transport = self._dr_transport
 
         # Temel metodlar derhal işletilir.  !!! Burayı kullanmak istiyorsan, set_decorator kısmını da düzenle
         # if func.__name__.startswith("__") and func.__name__.endswith("__"):
         #     return func(*args, **kwargs)
 
         # İstemci ise   veya   self.metod değilse, (@class veya @static ise) baştaki self parametresini sil
-        if not self._dr_active or "self" not in inspect.getfullargspec(func).args:
+        if not self._dr_active or not takes_self:
             args = args[1:]
 
         # ################################
         # İstemci ise ve Parametreler uygunsa, dosyaya kaydeder.
-        if not self._dr_active and check_type(args) and check_type(kwargs):
+        if not self._dr_active and transport.accepts(args) and transport.accepts(kwargs):
 
             # dr_code -> int -> Bu kodla olan veri varsa döndür. Belirtilen süre kadar cevabı bekle
             if type(dr_code) is int and dr_code > 1:
-                return get_result(os.path.join(path, str(dr_code)), dr_wait)
+                return transport.result(dr_code, dr_wait, func_name)
 
-            # Func dizinindeki dosyaların isimlerini int olarak alır ve
-            # ["1", "2", ... ] String listesinde en büyük sayıyı verir. Yoksa 10 değerini verir
+            # Son kullanılan kod. Hiç çağrı yapılmadıysa 10'dur
             son_code = self._dr_last_code
-            new_code = son_code + 1
 
-            full_path = os.path.join(path, str(new_code))
-            while os.path.exists(full_path):
-                new_code += 1
-                full_path = os.path.join(path, str(new_code))
+            # dr_batch bloğundaysa, çağrı biriktirilir ve kodu döndürülür. Blok bitince gönderilir
+            if self._dr_batches:
+                self._dr_last_code = son_code + 1
+                code = self._dr_batches[-1].add(func_name, son_code + 1, args, kwargs)
+                return self._dr_events.add(code, func_name) if dr_future else code
+
+            # Sunucu, çağrıdan önce yazılan değişkenleri görsün
+            self._dr_store.flush()
 
-            # Datayı dosyaya yaz
-            with open(full_path, 'w') as f:
-                json.dump({ARGS: args, KWARGS: kwargs}, f)
+            # Çağrıyı sunucuya ilet
+            new_code = transport.call(func_name, son_code + 1, args, kwargs)
 
             self._dr_last_code = new_code
 
+            if dr_future:
+                return self._dr_events.add(new_code, func_name)
+
             # Cevabı bu süre kadar bekle ve dön
             if dr_wait:
-                return get_result(full_path, dr_wait)
+                return transport.result(new_code, dr_wait, func_name)
 
             # dr_code -> True -> Kodu döndür
             if dr_code is True:
@@ -253,41 +1811,31 @@ def get_decorator(self, func):
 
             # dr_code -> False -> Default, Son dosyada cevap varsa döndür
             if son_code != 10:
-                try:
-                    with open(os.path.join(path, str(son_code))) as f:
-                        return json.load(f).get(RESULT)
-                except:
-                    pass
+                return transport.result(son_code, 0, func_name)
             # Hiçbiri uymuyorsa, boş dön
             return None
 
         # ################################
         # Kod varsa datayı koddaki dosyaya yaz. Tabi tipler uygunsa yaz.
         if type(dr_code) is str:
-            file = os.path.join(path, dr_code)
-            try:
-                with open(file) as f:
-                    data = json.load(f)
-            except:
+            data = transport.request(func_name, dr_code)
+            if data is None:
                 return
 
             # Clas fonksiyonu veya self fonksiyon olmasına göre fazla parametre hatası verebildiğinden böyle yapıldı
-            if "self" not in inspect.getfullargspec(func).args:
-                result = func(*data.get(ARGS, ()), **data.get(KWARGS, {}))
-            else:
-                result = func(args[0], *data.get(ARGS, ()), **data.get(KWARGS, {}))
-
-            data[RESULT] = result if check_type(result) else None
-
-            with open(file, "w") as f:
-                json.dump(data, f)
-
-            # Zaman kaydedicide, fonksiyonun ismi yoksa, oluştur
-            if func.__name__ not in self._dr_last_times:
-                self._dr_last_times[func.__name__] = {}
-
-            # Func dosyasını değiştirdiğimiz için, değişim zamanını kaydediyoruz ki, sonradan başkası değişti sanılmasın
-            self._dr_last_times[func.__name__][dr_code] = os.stat(file).st_mtime
+            # Hata olursa dönüş None olur; diğer çağrılar çalışmaya devam eder
+            try:
+                if not takes_self:
+                    result = func(*data.get(ARGS, ()), **data.get(KWARGS, {}))
+                else:
+                    result = func(args[0], *data.get(ARGS, ()), **data.get(KWARGS, {}))
+            except Exception:
+                traceback.print_exc()
+                result = None
+
+            # İstemci dönüşü aldığında, çağrının değiştirdiği değişkenleri de görsün
+            self._dr_store.flush()
+            transport.respond(func_name, dr_code, data, result if transport.accepts(result) else None)
         else:
             # Sunucuysa, direkt fonksiyonu işle
             result = func(*args, **kwargs)
@@ -300,33 +1848,73 @@ def get_decorator(self, func):
 class Dirio:
     _dr_inwork = False
     _dr_binds = {}
+    _dr_methods = frozenset()
 
-    def __init__(self, target=None, args=(), kwargs={}, tempdir="", keeperiod=10, looperiod=.05, worker=False):
+    def __init__(self, target=None, args=(), kwargs={}, tempdir="", keeperiod=10, looperiod=.05, transport="socket",
+                 workers=4, codec="bytes", flushperiod=.05, worker=False):
         """
         :param target: class: Hedef Class
         :param args: tuple: Class'ın argümanları
         :param kwargs: dict: Class'ın keyword'lü argümanları
         :param tempdir: str: Temporary klasörü. Girilmediyse, standart sistemdeki klasör kullanılır.
-        :param keeperiod: int: Geçmişi tutma süresi. Default: 10 sn boyunca geçmişi saklar.
+        :param keeperiod: int: Geçmişi tutma süresi. Default: 10 sn boyunca, okunmayan dönüşleri saklar.
         :param looperiod: int: Sunucu için, döngüde bekleme süresi. Küçük olursa işlemciden, büyük olursa işlemden zarar
+        :param transport: str: Çağrıların taşınma yolu. "socket": Unix socket / named pipe, "file": JSON dosyaları,
+                               "thread": Sunucu ayrı işlem yerine, bu işlemde bir thread. Bkz. ThreadTransport
+        :param workers: int: Sunucuda, çağrıları çalıştıran thread sayısı. Bkz. CallPool
+        :param codec: str: "socket" ile taşınan verinin biçimi. "json", "bytes": JSON ve ayrı taşınan bytes,
+                           "pickle": pickle edilebilen her şey. "file" ile her zaman JSON kullanılır. Bkz. CODECS
+        :param flushperiod: float: Değişken yazmalarını biriktirme süresi. 0 ise her yazma hemen gönderilir.
+                                   Bkz. WriteBehind, dr_transaction
         :param worker: bool: Read Only. Değiştirme. Sınıfın kendine has kullanımına dahildir.
         """
         self._dr_bind = {}
         self._dr_active = worker
         self._dr_last_code = 10
-        self._dr_last_times = {}
         self._dr_keep_period = keeperiod
         self._dr_loop_period = looperiod
+        self._dr_workers = workers
+        # Açık dr_batch blokları ve gönderilmeyi bekleyen çağrıları
+        self._dr_batches = []
+        self._dr_queue = []
         # Önce kopyalıyoruz, Çünkü üstünde değişiklik yaptığımızda kalıcı olmasın
+        original = target
         target = type(target.__name__, target.__bases__, dict(target.__dict__))
         set_decorator(target)
 
-        if worker:
+        if worker and transport == "thread":
+            # Aynı işlemdeki sunucu. Adı, 'tempdir' ile verilir. Bkz. start_thread
+            self._dr_dir = tempdir
+            authkey = b""
+        elif worker:
             # Sunucu kısmıdır. Bu kısım sadece temp klasöründen başlatıldığında çalışır
             self._dr_dir = os.path.dirname(__file__)
+            authkey = bytes.fromhex(os.environ.pop(AUTHKEY_ENV, ""))
         else:
             # İstemci kısmıdır.Sunucu oluşturulur ve başlatılır
-            self._dr_dir = new_dir(tempdir, inspect.getfile(target), target.__name__, args, kwargs)
+            config = {"args": args, "kwargs": kwargs, "keeperiod": keeperiod, "looperiod": looperiod,
+                      "transport": transport, "workers": workers, "codec": codec, "flushperiod": flushperiod}
+            if transport == "thread":
+                self._dr_dir, authkey = start_thread(original, config), b""
+            else:
+                self._dr_dir, authkey = start_worker(tempdir, inspect.getfile(target), target.__name__, config)
+
+        if transport == "socket":
+            self._dr_transport = SocketTransport(self._dr_dir, worker, looperiod, keeperiod, authkey, codec)
+        else:
+            self._dr_transport = TRANSPORTS[transport](self._dr_dir, worker, looperiod, keeperiod)
+
+        # Değişken yazmaları biriktirilerek gönderilir
+        self._dr_store = WriteBehind(self._dr_transport, flushperiod)
+
+        # Dönüşü gelmiş bind'ler ve değişiklik bildirimleri; dr_binds_check'te çalıştırılır
+        self._dr_ready = deque()
+        # Dönüşü beklenen çağrılar ve abone olunan değişkenler
+        self._dr_events = DrEvents(self._dr_transport, self._dr_ready)
+
+        # Sunucu, istemciyi dinlemeye başlar
+        if worker:
+            self._dr_transport.start()
 
         # target = type(f'gecis.{target.__name__}', tuple(target.__bases__), dict(target.__dict__))
 
@@ -338,6 +1926,11 @@ class Dirio:
         # Kendimizi, Clasın kopyasına çeviriyoruz
         self.__class__ = type(f'dirio.{target.__name__}', tuple([Dirio, target]), dict(self.__dict__))
 
+        # Metodların adları; __getattribute__, bunları her seferinde aramadan döndürür
+        cls = type(self)
+        self._dr_methods = frozenset(name for name in dir(cls)
+                                     if not name.startswith("_dr_") and callable(getattr(cls, name, None)))
+
         self._dr_inwork = True
 
         super().__init__(*args, **kwargs)
@@ -347,7 +1940,10 @@ class Dirio:
         if name.startswith("_dr_") or (name.startswith("__") and name.endswith("__")):
             return super().__getattribute__(name)
 
-        in_class = name in dir(self)
+        if name in super().__getattribute__("_dr_methods"):
+            return super().__getattribute__(name)
+
+        in_class = name in super().__getattribute__("__dict__") or hasattr(type(self), name)
 
         # print("__getattribute__\t<--\t\t\t", name)
 
@@ -358,28 +1954,23 @@ class Dirio:
             if callable(value):
                 return value
 
-        _dr_dir = self._dr_dir
-
         # Değişken ise;
         ###############
-        # Değer dosyada varsa, oradan okunur
-        # if name in os.listdir(_dr_dir):
-        if os.path.exists(os.path.join(_dr_dir, name)):
-            try:
-                with open(os.path.join(_dr_dir, name)) as f:
-                    value = json.load(f).get(VALUE)
-                    if type(value) in (dict, list):
-                        return DrVar(self, name, value)
-                    else:
-                        return value
-            except:
-                pass
+        # Değer kayıtlıysa, oradan okunur
+        found, value = self._dr_store.get(name)
+        if found:
+            if type(value) in (dict, list):
+                return DrVar(self, name, value)
+            else:
+                return value
 
         if in_class:
             value = super().__getattribute__(name)
 
-            # Demekki dosyada yok ki buraya kadar geldik, dosyaya da kaydedelim.
-            self.__setattr__(name, value)
+            # Demekki kayıtlı değil ki buraya kadar geldik, kaydedelim.
+            # İstemci kaydetmez; sunucu henüz yayınlamadıysa, gönderilen varsayılan değer sunucunun yenisini ezer
+            if self._dr_active:
+                self.__setattr__(name, value)
 
             if type(value) in (dict, list):
                 return DrVar(self, name, value)
@@ -398,19 +1989,18 @@ class Dirio:
         # if self._dr_inwork:
         # if self._dr_inwork and os.path.exists(self._dr_dir):
         if self._dr_inwork:
-            if not os.path.exists(self._dr_dir):
+            if not self._dr_transport.isactive():
                 self.dr_terminate()
-                sys.exit(0)
-
-            file = os.path.join(self._dr_dir, key)
+                # Sadece sunucu işleminin ana thread'i işlemi kapatır. Diğer thread'lerde (asyncio, thread havuzu)
+                # SystemExit yakalanmadan kalır. İstemcide ve aynı işlemdeki thread sunucuda da işlem kapatılmaz.
+                # Yazma bırakılır
+                if self._dr_active and not isinstance(self._dr_transport, ThreadTransport) and \
+                        threading.current_thread() is threading.main_thread():
+                    sys.exit(0)
+                return
 
-            if check_type(value):
-                with open(file, "w") as f:
-                    json.dump({VALUE: value}, f)
-            else:
-                # Eğer kaydedilemeyen bir tip ise, dosyada var olanı da sil ki, çağırırken sorun yaşanmasın
-                if os.path.exists(file):
-                    os.remove(file)
+            # Tipi, gönderilirken kontrol edilir. Bkz. WriteBehind.flush
+            self._dr_store.set(key, value)
 
             # !!! Aslında değişkenler için bu işleme gerek yok. Sadece fonksiyonlar için yapsak yeterli olur
             # Eğer Sunucu ise, dosyanın son değişme zamanını güncelle ki, onu değişti zannetmesin.
@@ -420,8 +2010,8 @@ class Dirio:
         super().__setattr__(key, value)
 
     def _dr_loop(self):
-        # Script dosyasını siliyoruz
-        if os.path.exists(__file__):
+        # Script dosyasını siliyoruz. Sunucu thread ise, bu dosya Dirio'nun kendisidir; silinmez
+        if __name__ == "__main__" and os.path.exists(__file__):
             os.remove(__file__)
 
         # Kaydedilmiş değerler varsa önce onları okur
@@ -430,101 +2020,127 @@ class Dirio:
             if not (i.startswith("__") and i.endswith("__")):
                 getattr(self, i)
 
+        # İstemci, değişkenleri beklemeden görsün
+        self._dr_store.flush()
+
         # Böyle yapıyoruz ki, çağırırken her seferinde class.getattr'e yük olmasın
-        _dr_dir = self._dr_dir
-        _dr_last_times = self._dr_last_times
+        transport = self._dr_transport
 
-        while self.dr_isactive():
-            # Dizindeki, fonksiyon klasörlerinin isimleri alınır.
-            func_dirs = [i for i in os.listdir(_dr_dir) if os.path.isdir(os.path.join(_dr_dir, i))]
+        # Çağrılar, metodun politikasına göre thread havuzunda çalıştırılır
+        pool = CallPool(lambda func_name, func_code: getattr(self, func_name)(dr_code=func_code),
+                        self._dr_workers, getattr(type(self), "_dr_policies", {}))
 
-            # Tüm fonk dizinlerini gez
-            for func_dir in func_dirs:
-                func_full_path = os.path.join(_dr_dir, func_dir)
+        while self.dr_isactive():
+            # Yeni gelen çağrılar işlenir ve dönüşleri kaydedilir.
+            for func_name, func_code in transport.calls():
+                pool.submit(func_name, func_code)
 
-                # last'ta fonk yoksa al
-                if func_dir not in _dr_last_times:
-                    _dr_last_times[func_dir] = {}
+        pool.shutdown()
 
-                lasts = _dr_last_times[func_dir]
+    def dr_terminate(self):
+        """İşlemi bitirir"""
+        self._dr_store.close()
+        self._dr_transport.terminate()
 
-                for func_code in os.listdir(func_full_path):
-                    if not func_code.isdigit():
-                        continue
+    def dr_transaction(self):
+        """
+        Bloktaki değişken yazmaları, blok bitince birlikte gönderilir. Karşı taraf hepsini birden görür.
 
-                    func_code_full_path = os.path.join(func_full_path, func_code)
+            with dev.dr_transaction():
+                dev.items.append(1)
+                dev.count += 1
 
-                    st = os.stat(func_code_full_path).st_mtime
+        Blok içinde yapılan çağrılar sunucuya hemen gider; bloktaki yazmaları görmez.
+        """
+        return self._dr_store.transaction()
 
-                    # Daha önce çalıştırdıysak ve son çalışma zamanı aynıysa geç
-                    if func_code in lasts and st == lasts.get(func_code):
-                        # Saklama zamanı geçtiyse, geçmiş klasörüne aktar ve last_timesden'de kaldır
-                        # if time.time() - st > self._dr_keep_period:
-                        #    pass
-                        #    # lasts'dan kaldır.
-                        continue
+    def dr_batch(self):
+        """
+        Bloktaki çağrıları tek mesajla gönderir. Blok içinde çağrılar, dönüş yerine kodlarını döndürür.
 
-                    # İlk defa çağrılıyorsa veya son çalışma zamanı farklıysa yap
-                    # Fonksiyon işlenir ve dönüşü kaydedilir. Üstelik zamanı da..
-                    # print("Fonksiyonu çağıtıruz", func_dir, func_code)
-                    getattr(self, func_dir)(dr_code=func_code)
+            with dev.dr_batch() as batch:
+                dev.disconnect()
+                dev.send("a")
+            batch.results()     -> [disconnect'in dönüşü, send'in dönüşü]
 
-            # self.deger += 5
-            # print(self.deger, self)
-            # print("Bu da dönüyor", getattr(self, "deger"))
-            time.sleep(self._dr_loop_period)
+        Parametreleri gönderilemeyen çağrılar gruba girmez.
+        """
+        return DrBatch(self)
 
-    def dr_terminate(self):
-        """İşlemi bitirir"""
-        if os.path.exists(self._dr_dir):
-            shutil.rmtree(self._dr_dir)
+    def dr_call_many(self, calls, wait=-1):
+        """
+        Çağrıları tek mesajla gönderir, dönüşlerini tek cevapla, çağrı sırasıyla döndürür.
+        Hata veren çağrının dönüşü None olur; diğerleri etkilenmez.
+        :param calls: list: ["metod", ("metod", args), ("metod", args, kwargs), ...]
+        :param wait: float: Hepsi için toplam bekleme süresi. -1 ise hepsi bitene kadar bekler
+        """
+        with self.dr_batch() as batch:
+            for call in calls:
+                name, *rest = [call] if isinstance(call, str) else call
+                getattr(self, name)(*(rest[0] if rest else ()), **(rest[1] if len(rest) > 1 else {}))
+        return batch.results(wait)
 
     def dr_code(self, code, wait=0):
         """Dönüşü koddan direkt olarak okumayı sağlar."""
-        if type(code) is int:
-            code = str(code)
-
         if not self.dr_isactive():
             return self.dr_terminate()
 
-        # Tüm fonksiyon klasörlerini gezer, eğer içinde elimizdeki koddan dosya varsa onu okur
-        for func_name in [j for j in os.listdir(self._dr_dir) if os.path.isdir(os.path.join(self._dr_dir, j))]:
-            func_path = os.path.join(self._dr_dir, func_name)
-
-            if not self.dr_isactive():
-                return self.dr_terminate()
-
-            if code in os.listdir(func_path):
-                return get_result(os.path.join(func_path, code), wait)
-
-        return None
+        return self._dr_transport.result(code, wait)
 
     def dr_bind(self, code, func, args=(), kwargs={}):
         """Girilen kod ile sonuç alındığında, 'func'u çağırır. Parametrelerini de girer.
-        Sonuçları arayabilmesi için, arada 'dr_binds_check'in çalıştırılması gerekir.
+        Fonksiyon, 'dr_binds_check'i çalıştıran thread'de çağrılır.
         Fonksiyonun alacağı ilk parametre, code'un dönüş değeri olmalı"""
         self._dr_binds[code] = [func, args, kwargs]
 
+        def done(future):
+            func, args, kwargs = self._dr_binds.pop(code)
+            if future.cancelled():
+                return False
+            func(*args, **kwargs, result=future.result())
+            return True
+
+        self._dr_events.add(code).add_done_callback(lambda future: self._dr_ready.append(partial(done, future)))
+
     def dr_bind_count(self):
         return len(self._dr_binds)
 
     def dr_binds_check(self):
-        """Sonuçları kontrol eder. Sonuçlar geldiyse, Bind'leri çalıştırır"""
+        """Dönüşü gelen Bind'leri ve abonelerin bildirimlerini çalıştırır. Bekleyenlere bakılmaz"""
         event = False
-        for code, vals in self._dr_binds.copy().items():
-            result = self.dr_code(code)
-            if result is not None:
-                func = vals[0]
-                args = vals[1]
-                kwargs = vals[2]
-                func(*args, **kwargs, result=result)
-                self._dr_binds.pop(code)
+        while self._dr_ready:
+            if self._dr_ready.popleft()():
                 event = True
 
         return event
 
+    def dr_subscribe(self, name, callback):
+        """
+        Sunucudaki 'name' değişkeni değiştikçe 'callback(işlem, değer)'i çağırır. Değişken, her seferinde
+        tümüyle okunmaz; sadece değişiklik gelir. Fonksiyon, 'dr_binds_check'i çalıştıran thread'de çağrılır.
+        İşlemler;
+            "set", değer:       Değişken tümüyle değişti. Abone olunca da ilk olarak bu gelir
+            "delete", None:     Değişken silindi
+            "append", [...]:    Listenin sonuna eklenenler
+            "trim", n:          Listenin başından silinen eleman sayısı
+            "clear", None:      Liste temizlendi
+
+            dev.dr_subscribe("receives", lambda op, value: print(op, value))
+
+        İstemcinin kendi yazmaları bildirilmez.
+        """
+        self._dr_events.subscribe(name, callback)
+
+    def dr_unsubscribe(self, name, callback=None):
+        """Aboneliği bitirir. 'callback' girilmediyse, değişkenin tüm aboneleri silinir"""
+        self._dr_events.unsubscribe(name, callback)
+
+    def dr_pending(self):
+        """Dönüşü beklenen Future ve bind sayısı"""
+        return len(self._dr_events)
+
     def dr_isactive(self):
-        return self._dr_inwork and os.path.exists(self._dr_dir)
+        return self._dr_inwork and self._dr_transport.isactive()
 
 
 
@@ -551,7 +2167,11 @@ changer_methods = set("__setitem__ __setslice__ __delitem__ "
 
 def callback_getter(obj, cls):
     def callback(*args, **kw):
-        obj.__setattr__(cls["drkey"], args[1])
+        # Değişiklik, aboneye eklenen/silinen olarak bildirilebilsin diye kaydedilir. Bkz. WriteBehind.record
+        # Kayıt ile yazma arasında gönderilmesin
+        with obj._dr_store.lock:
+            obj._dr_store.record(cls["drkey"], args[1], args[0].__name__, args[2:])
+            obj.__setattr__(cls["drkey"], args[1])
     return callback
 
 
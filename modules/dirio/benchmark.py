@@ -0,0 +1,498 @@
+#!/usr/bin/env python
+"""
+Dirio ölçümleri. Her taşıma yolu için ayrı bir sunucu başlatılır.
+
+    python modules/dirio/benchmark.py
+"""
+import os
+import sys
+import time
+import base64
+import builtins
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dirio
+from dirio import Dirio
+
+
+class Bench:
+    counter = 0
+    items = []
+
+    # Dirio sunucusunda metodların eşzamanlılığı. Yazılmayanlar sırayla çalışır
+    _dr_policies = {
+        "slow": "parallel",
+        "reset": "exclusive",
+    }
+
+    def echo(self, value):
+        return value
+
+    def add(self, a, b):
+        return a + b
+
+    def bump(self):
+        self.counter += 1
+
+    def slow(self, delay):
+        time.sleep(delay)
+        return delay
+
+    def reset(self):
+        self.counter = 0
+
+    def stamp(self, delay):
+        time.sleep(delay)
+        return time.time()
+
+    def size(self):
+        return len(self.items)
+
+    def feed(self, start, count, keep=0):
+        """Listeye 'start'tan başlayan 'count' sayı ekler. Liste 'keep'i geçerse, baştan yarısına kadar silinir"""
+        items = self.items
+        for i in range(start, start + count):
+            items.append(i)
+        if keep and len(items) > keep:
+            del items[:len(items) - keep // 2]
+
+    def stats(self):
+        """Sunucu işleminin işlemci süresi ve tutulan çağrı kaydı sayısı"""
+        transport = self._dr_transport
+        if hasattr(transport, "results"):
+            kept = len(transport.results)
+        else:
+            root = transport.dr_dir
+            kept = sum(len(os.listdir(os.path.join(root, i))) for i in os.listdir(root)
+                       if os.path.isdir(os.path.join(root, i)))
+        return [time.process_time(), kept]
+
+
+def measure(func, count):
+    """Tek işlemin ortalama süresi, µs"""
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+@contextmanager
+def count_fs_calls():
+    """Bu blokta yapılan dosya sistemi çağrılarını sayar"""
+    counts = {"n": 0}
+    patched = [(builtins, "open"), (os, "stat"), (os, "listdir"), (os, "scandir"), (os.path, "exists"),
+               (os.path, "isdir")]
+    originals = [getattr(mod, name) for mod, name in patched]
+
+    def counter(func):
+        def wrapper(*args, **kwargs):
+            counts["n"] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    for (mod, name), func in zip(patched, originals):
+        setattr(mod, name, counter(func))
+    try:
+        yield counts
+    finally:
+        for (mod, name), func in zip(patched, originals):
+            setattr(mod, name, func)
+
+
+def bench_panel(transport, count=2000):
+    """Panel çizimindeki okumalar: değişken, dr_isactive, dr_bind_count"""
+    dev = Dirio(target=Bench, transport=transport)
+    try:
+        assert dev.echo("ok", dr_wait=10) == "ok"
+        dev.counter = 5
+
+        def draw(i):
+            return dev.counter == 5 and dev.dr_isactive() and dev.dr_bind_count() == 0
+
+        assert draw(0)
+        with count_fs_calls() as counts:
+            quiet = measure(draw, count)
+
+        # Sunucuda değer değiştikten sonraki ilk okuma
+        after = 0
+        for i in range(20):
+            dev.bump(dr_wait=-1)
+            start = time.perf_counter()
+            assert dev.counter == 6 + i
+            after += (time.perf_counter() - start) / 20 * 1e6
+        print(f"{transport:>6} panel çizimi {quiet:8.1f} µs   dosya sistemi çağrısı {counts['n'] / count:5.1f}   "
+              f"değişiklikten sonra okuma {after:8.1f} µs")
+    finally:
+        dev.dr_terminate()
+        time.sleep(.3)
+
+
+def bench_transport(transport, looperiod=.05, count=200):
+    dev = Dirio(target=Bench, transport=transport, looperiod=looperiod)
+    try:
+        # Sunucunun açılmasını bekle
+        assert dev.echo("ok", dr_wait=10) == "ok"
+
+        rtt = measure(lambda i: dev.echo(i, dr_wait=-1), count)
+        fire = measure(lambda i: dev.add(i, i, dr_code=True), count)
+        code = dev.add(1, 2, dr_code=True)
+        assert dev.dr_code(code, wait=-1) == 3
+
+        set_ = measure(lambda i: setattr(dev, "counter", i), count)
+        get_ = measure(lambda i: dev.counter, count)
+        assert dev.counter == count - 1
+
+        print(f"{transport:>6} looperiod={looperiod:<6} çağrı+cevap {rtt:10.1f} µs   çağrı {fire:8.1f} µs   "
+              f"yazma {set_:8.1f} µs   okuma {get_:8.1f} µs")
+    finally:
+        dev.dr_terminate()
+        # Sunucu kapanıp dizinini silene kadar bekle; yeni sunucu aynı dizin adını alabilir
+        time.sleep(looperiod + .2)
+
+
+def bench_wait(transport, delay=.2, count=10):
+    """Cevap beklerken harcanan işlemci süresi ve cevap hazır olduktan sonra uyanma gecikmesi"""
+    dev = Dirio(target=Bench, transport=transport)
+    try:
+        assert dev.echo("ok", dr_wait=10) == "ok"
+
+        wakes = []
+        cpu = time.process_time()
+        for i in range(count):
+            ready = dev.stamp(delay, dr_wait=-1)
+            wakes.append(time.time() - ready)
+        cpu = (time.process_time() - cpu) / (count * delay) * 100
+
+        wakes.sort()
+        print(f"{transport:>6} bekleme: işlemci %{cpu:5.1f}   uyanma ort. {sum(wakes) / count * 1e6:8.1f} µs   "
+              f"en kötü {wakes[-1] * 1e6:8.1f} µs")
+    finally:
+        dev.dr_terminate()
+        time.sleep(.3)
+
+
+def bench_soak(transport, seconds=30, rate=200, keeperiod=2, interval=5):
+    """
+    Uzun oturum taklidi. Saniyede 'rate' çağrı yapılır, dönüşleri hiç okunmaz.
+    Her aralıkta; tutulan kayıt sayısı ve sunucunun işlemci kullanımı yazılır.
+    """
+    dev = Dirio(target=Bench, transport=transport, keeperiod=keeperiod)
+    try:
+        assert dev.echo("ok", dr_wait=10) == "ok"
+
+        start = time.time()
+        cpu, _ = dev.stats(dr_wait=-1)
+        mark = start
+        line = []
+        while time.time() - start < seconds:
+            for i in range(rate // 10):
+                dev.echo(i, dr_code=True)
+            time.sleep(.1)
+
+            if time.time() - mark >= interval:
+                now, kept = dev.stats(dr_wait=-1)
+                line.append(f"{kept:6} kayıt %{(now - cpu) / (time.time() - mark) * 100:5.1f}")
+                cpu, mark = now, time.time()
+
+        print(f"{transport:>6} soak ({interval} sn aralıkla): " + " | ".join(line))
+    finally:
+        dev.dr_terminate()
+        time.sleep(.3)
+
+
+def bench_pool(transport, delay=.5, count=4):
+    """Yavaş bir çağrı sürerken hızlı çağrının süresi ve 'count' yavaş çağrının toplam süresi"""
+    dev = Dirio(target=Bench, transport=transport, looperiod=.001)
+    try:
+        assert dev.echo("ok", dr_wait=10) == "ok"
+
+        code = dev.slow(delay, dr_code=True)
+        start = time.perf_counter()
+        assert dev.echo(1, dr_wait=-1) == 1
+        fast = time.perf_counter() - start
+        assert dev.dr_code(code, wait=-1) == delay
+
+        start = time.perf_counter()
+        codes = [dev.slow(delay, dr_code=True) for _ in range(count)]
+        for code in codes:
+            assert dev.dr_code(code, wait=-1) == delay
+        total = time.perf_counter() - start
+
+        # Exclusive; kendinden önce başlayan bitince çalışır, sonra gelenler de onu bekler
+        code = dev.slow(delay, dr_code=True)
+        dev.bump(dr_code=True)
+        dev.reset(dr_code=True)
+        last = dev.echo("after", dr_code=True)
+        assert dev.dr_code(last, wait=-1) == "after"
+        assert dev.counter == 0
+
+        print(f"{transport:>6} havuz: {delay} sn'lik çağrı sürerken hızlı çağrı {fast * 1000:7.1f} ms   "
+              f"{count} yavaş çağrı toplam {total * 1000:7.1f} ms")
+    finally:
+        dev.dr_terminate()
+        time.sleep(.3)
+
+
+def bench_startup(transport, count=5):
+    """Dirio oluşturulduktan sonra, ilk çağrının cevabı gelene kadar geçen süre. Soğuk ve önceden başlatılmış"""
+    def startup():
+        start = time.perf_counter()
+        dev = Dirio(target=Bench, transport=transport)
+        assert dev.echo("ok", dr_wait=10) == "ok"
+        elapsed = time.perf_counter() - start
+        dev.dr_terminate()
+        # Yedek sunucunun hazırlanması ve kapananın dizinini silmesi için beklenir
+        time.sleep(1)
+        return elapsed * 1000
+
+    cold = [startup() for _ in range(count)]
+
+    warm = []
+    if hasattr(dirio, "prewarm"):
+        dirio.prewarm(Bench)
+        time.sleep(1)
+        warm = [startup() for _ in range(count)]
+        dirio.release_spares()
+
+    print(f"{transport:>6} açılış: soğuk {sum(cold) / count:7.1f} ms   "
+          f"önceden başlatılmış {sum(warm) / count if warm else float('nan'):7.1f} ms")
+
+
+def bench_payload(transport, codec=None, size=1 << 20, count=20):
+    """'size' baytlık veriyi gidiş-dönüş taşıma hızı, MB/s. JSON'da base64 metin olarak taşınır"""
+    options = {"codec": codec} if codec else {}
+    dev = Dirio(target=Bench, transport=transport, looperiod=.001, **options)
+    try:
+        assert dev.echo("ok", dr_wait=10) == "ok"
+        data = os.urandom(size)
+        raw = codec not in (None, "json")
+
+        start = time.perf_counter()
+        for _ in range(count):
+            if raw:
+                back = dev.echo(data, dr_wait=-1)
+            else:
+                back = base64.b64decode(dev.echo(base64.b64encode(data).decode(), dr_wait=-1))
+        elapsed = time.perf_counter() - start
+        assert back == data
+
+        speed = size * 2 * count / elapsed / 1e6
+        print(f"{transport:>6} {codec if raw else 'base64':>6} {size >> 10} KiB gidiş-dönüş: {speed:8.1f} MB/s   "
+              f"çağrı başına {elapsed / count * 1000:7.2f} ms")
+    finally:
+        dev.dr_terminate()
+        time.sleep(.3)
+
+
+def bench_growth(transport, count=2000, flushperiod=None, transaction=False):
+    """Listeye tek tek 'count' eleman ekleme süresi ve sunucunun hepsini görmesi"""
+    options = {"flushperiod": flushperiod} if flushperiod is not None else {}
+    dev = Dirio(target=Bench, transport=transport, **options)
+    try:
+        assert dev.echo("ok", dr_wait=10) == "ok"
+        dev.items = []
+
+        start = time.perf_counter()
+        if transaction:
+            with dev.dr_transaction():
+                for i in range(count):
+                    dev.items.append(i)
+        else:
+            for i in range(count):
+                dev.items.append(i)
+        assert dev.size(dr_wait=-1) == count
+        elapsed = time.perf_counter() - start
+
+        mode = "transaction" if transaction else f"flushperiod={flushperiod}"
+        print(f"{transport:>6} {mode:<18} {count:6} ekleme: {elapsed * 1000:8.1f} ms   "
+              f"ekleme başına {elapsed / count * 1e6:7.1f} µs")
+    finally:
+        dev.dr_terminate()
+        time.sleep(.3)
+
+
+def bench_batch(transport, count=10, rounds=50):
+    """'count' çağrıyı tek tek bekleyerek ve dr_call_many ile tek mesajda yapma süresi"""
+    dev = Dirio(target=Bench, transport=transport, looperiod=.001)
+    try:
+        assert dev.echo("ok", dr_wait=10) == "ok"
+        calls = [("echo", [i]) for i in range(count)]
+
+        def one_by_one(_):
+            return [dev.echo(i, dr_wait=-1) for i in range(count)]
+
+        def batched(_):
+            return dev.dr_call_many(calls)
+
+        assert one_by_one(0) == batched(0) == list(range(count))
+        # Hata veren çağrı diğerlerini etkilemez
+        assert dev.dr_call_many([("add", [1, "a"]), ("add", [1, 2])]) == [None, 3]
+
+        single = measure(one_by_one, rounds)
+        batch = measure(batched, rounds)
+        print(f"{transport:>6} {count} çağrı: tek tek {single / 1000:7.2f} ms   dr_call_many {batch / 1000:7.2f} ms")
+    finally:
+        dev.dr_terminate()
+        time.sleep(.3)
+
+
+def bench_binds(transport, count=50, checks=200):
+    """
+    'count' bind beklerken dr_binds_check'in süresi ve dosya sistemi çağrıları,
+    yavaş çağrı bittikten sonra, hepsinin dönüşü gelip fonksiyonları çalışana kadar geçen süre
+    """
+    dev = Dirio(target=Bench, transport=transport, looperiod=.001)
+    try:
+        assert dev.echo("ok", dr_wait=10) == "ok"
+
+        # Yavaş çağrı bitene kadar, exclusive reset ve arkasındaki echo'lar bekler
+        start = time.perf_counter()
+        dev.slow(1, dr_code=True)
+        dev.reset(dr_code=True)
+        done = []
+        for i in range(count):
+            dev.dr_bind(dev.echo(i, dr_code=True), lambda result: done.append(result))
+
+        with count_fs_calls() as counts:
+            check = measure(lambda i: dev.dr_binds_check(), checks)
+        assert not done
+
+        while len(done) < count:
+            dev.dr_binds_check()
+            time.sleep(.001)
+        elapsed = time.perf_counter() - start - 1
+        assert sorted(done) == list(range(count)) and dev.dr_bind_count() == 0
+
+        print(f"{transport:>6} {count} bind beklerken kontrol {check:9.1f} µs   "
+              f"dosya sistemi çağrısı {counts['n'] / checks:6.1f}   bittikten sonra hepsi {elapsed * 1000:7.1f} ms")
+    finally:
+        dev.dr_terminate()
+        time.sleep(.3)
+
+
+def bench_overhead(count=20000):
+    """
+    İstemcide, çağrı başına Dirio'nun kendi yükü. Taşımanın call'ı boşa çıkarılır; sadece sarmalayıcı ölçülür.
+    Ayrıca 100 kayıtlık listenin tip kontrolü
+    """
+    dev = Dirio(target=Bench)
+    transport = dev._dr_transport
+    try:
+        assert dev.echo("ok", dr_wait=10) == "ok"
+        transport.call = lambda func_name, code, args, kwargs: code
+
+        payload = [{"id": i, "name": "x", "values": [1.5, 2.5, None, True]} for i in range(100)]
+        small = measure(lambda i: dev.add(i, 2, dr_code=True), count)
+        big = measure(lambda i: dev.echo(payload, dr_code=True), count // 10)
+        check = measure(lambda i: dirio.check_type(payload), count // 10)
+
+        print(f"çağrı yükü: küçük parametre {small:6.2f} µs   100 kayıtlık liste {big:7.1f} µs   "
+              f"check_type {check:7.1f} µs")
+    finally:
+        del transport.call
+        dev.dr_terminate()
+        time.sleep(.3)
+
+
+def bench_subscribe(transport, count=2000, burst=20, keep=500):
+    """
+    Sunucunun listeye eklediklerini istemcinin alması; her turda listeyi kopyalayıp temizleyerek ve
+    dr_subscribe ile. Tur başına istemcinin süresi ve kaybolan elemanlar
+    """
+    for mode in ("copy+clear", "dr_subscribe"):
+        dev = Dirio(target=Bench, transport=transport, looperiod=.001)
+        try:
+            assert dev.echo("ok", dr_wait=10) == "ok"
+            received = []
+            if mode == "dr_subscribe":
+                dev.dr_subscribe("items", lambda op, value: received.extend(value) if op in ("set", "append") else 0)
+
+            def tick():
+                start = time.perf_counter()
+                if mode == "dr_subscribe":
+                    dev.dr_binds_check()
+                else:
+                    received.extend(dev.items.copy())
+                    dev.items.clear()
+                return time.perf_counter() - start
+
+            elapsed, ticks = 0, 0
+            for i in range(0, count, burst):
+                dev.feed(i, burst, keep if mode == "dr_subscribe" else 0, dr_code=True)
+                time.sleep(.002)
+                elapsed += tick()
+                ticks += 1
+
+            # Yolda kalanlar
+            deadline = time.time() + 2
+            while len(received) < count and time.time() < deadline:
+                time.sleep(.01)
+                tick()
+            assert len(received) == len(set(received))
+
+            print(f"{transport:>6} {mode:<13} tur başına {elapsed / ticks * 1e6:7.1f} µs   "
+                  f"kaybolan {count - len(received):5} / {count}")
+        finally:
+            dev.dr_terminate()
+            time.sleep(.3)
+
+
+def bench_backends(count=200):
+    """Sunucu; ayrı işlemde dosya ile, ayrı işlemde soket ile ve aynı işlemde thread olarak"""
+    for transport in ("file", "socket", "thread"):
+        start = time.perf_counter()
+        dev = Dirio(target=Bench, transport=transport, looperiod=.001)
+        try:
+            assert dev.echo("ok", dr_wait=10) == "ok"
+            startup = (time.perf_counter() - start) * 1000
+
+            rtt = measure(lambda i: dev.echo(i, dr_wait=-1), count)
+            fire = measure(lambda i: dev.add(i, i, dr_code=True), count)
+            set_ = measure(lambda i: setattr(dev, "counter", i), count)
+            dev.bump(dr_wait=-1)
+            get_ = measure(lambda i: dev.counter, count)
+
+            print(f"{transport:>6} açılış {startup:7.1f} ms   çağrı+cevap {rtt:8.1f} µs   çağrı {fire:6.1f} µs   "
+                  f"yazma {set_:5.1f} µs   okuma {get_:5.1f} µs")
+        finally:
+            dev.dr_terminate()
+            time.sleep(.3)
+
+
+def main():
+    bench_transport("file", .05, count=20)
+    bench_transport("file", .001)
+    bench_transport("socket", .05)
+    bench_transport("socket", .001)
+    bench_panel("file")
+    bench_panel("socket")
+    bench_wait("file")
+    bench_wait("socket")
+    bench_pool("file")
+    bench_pool("socket")
+    bench_startup("file")
+    bench_startup("socket")
+    bench_payload("file")
+    for codec in ("json", "bytes", "pickle"):
+        bench_payload("socket", codec)
+    for transport in ("file", "socket"):
+        for count in (1000, 4000):
+            bench_growth(transport, count, 0)
+            bench_growth(transport, count, .05)
+            bench_growth(transport, count, transaction=True)
+    bench_batch("file")
+    bench_batch("socket")
+    bench_binds("file")
+    bench_binds("socket")
+    bench_overhead()
+    bench_backends()
+    for transport in ("file", "socket", "thread"):
+        bench_subscribe(transport)
+    bench_soak("file")
+    bench_soak("socket")
+
+
+if __name__ == "__main__":
+    main()
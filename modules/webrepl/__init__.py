@@ -1,10 +1,17 @@
 #!/usr/bin/env python
 import os
 import re
+import ast
+import json
 import time
+import zlib
+import hashlib
 import struct
 import socket
+import asyncio
+import selectors
 from threading import Thread
+from collections import deque
 try:
     from ..rapor import Rapor
 except:
@@ -50,6 +57,170 @@ for i in (0, 2):
     pins.append(p)
 """
 
+# Cihazdaki dosyaların boyut ve sha256 özetlerini tek seferde çıkaran kod.
+# {root} altındaki tüm dosyalar ya da sadece {paths} için {yol: (boyut, özet)} yazdırır. Olmayan dosya None'dır
+DIGEST_CODE = """
+import uos, uhashlib, ubinascii
+def _d(p):
+    h = uhashlib.sha256()
+    b = bytearray(512)
+    m = memoryview(b)
+    n = 0
+    try:
+        f = open(p, 'rb')
+    except OSError:
+        return None
+    while True:
+        k = f.readinto(b)
+        if not k:
+            break
+        h.update(m[:k])
+        n += k
+    f.close()
+    return n, ubinascii.hexlify(h.digest()).decode()
+def _w(d, r):
+    for e in uos.ilistdir(d):
+        p = d.rstrip('/') + '/' + e[0]
+        if e[1] == 0x4000:
+            _w(p, r)
+        else:
+            r[p] = _d(p)
+    return r
+_p = {paths}
+_r = {{p: _d(p) for p in _p}} if _p is not None else _w({root}, {{}})
+print(_r)
+del _d, _w, _p, _r
+"""
+
+# Cihazın sıkıştırma desteği; 0 yok, 1 sadece açabilir (uzlib ya da deflate), 2 sıkıştırabilir de (deflate)
+ZLIB_CAPS_CODE = """
+try:
+    import deflate, io
+    _c = 2
+    try:
+        deflate.DeflateIO(io.BytesIO(), deflate.ZLIB).write(b'a')
+    except Exception:
+        _c = 1
+except ImportError:
+    try:
+        import uzlib
+        _c = 1
+    except ImportError:
+        _c = 0
+print(_c)
+del _c
+"""
+
+# Cihaza sıkıştırılmış yüklenen {src} dosyasını açarak {tmp}'ye yazar, bitince {tmp}'yi {dst}'nin üzerine
+# taşır. Açma yarıda kalırsa (bozuk veri, dosya sistemi dolu, bellek yetmedi) {dst}'ye dokunulmaz.
+# {src} ve {tmp} her durumda silinir
+INFLATE_CODE = """
+import uos
+try:
+    import deflate
+    _z = lambda f: deflate.DeflateIO(f, deflate.ZLIB)
+except ImportError:
+    import uzlib
+    _z = lambda f: uzlib.DecompIO(f, {wbits})
+_b = bytearray(512)
+_m = memoryview(_b)
+try:
+    with open({src!r}, 'rb') as _i, open({tmp!r}, 'wb') as _o:
+        _d = _z(_i)
+        while True:
+            _n = _d.readinto(_b)
+            if not _n:
+                break
+            _o.write(_m[:_n])
+    uos.rename({tmp!r}, {dst!r})
+finally:
+    for _p in ({src!r}, {tmp!r}):
+        try:
+            uos.remove(_p)
+        except OSError:
+            pass
+del _z, _b, _m, _i, _o, _d, _n, _p
+"""
+
+# Cihazdaki {src} dosyasının başından {sample} bayt, bellekte sıkıştırılır. Sıkışmıyorsa -1 yazdırılır; flash'a
+# hiçbir şey yazılmaz. Sıkışıyorsa dosya {dst}'ye sıkıştırılarak yazılır ve {dst}'nin boyutu yazdırılır.
+# Yazarken hata olursa (dosya sistemi dolu gibi) {dst} silinir
+DEFLATE_CODE = """
+import uos, io, deflate
+_b = bytearray(512)
+_m = memoryview(_b)
+_s = io.BytesIO()
+_n = 0
+with open({src!r}, 'rb') as _i:
+    _o = deflate.DeflateIO(_s, deflate.ZLIB, {wbits})
+    while _n < {sample}:
+        _k = _i.readinto(_b)
+        if not _k:
+            break
+        _o.write(_m[:_k])
+        _n += _k
+    _o.close()
+_k = _n and len(_s.getvalue()) <= _n * {ratio}
+del _s
+if _k:
+    try:
+        with open({src!r}, 'rb') as _i, open({dst!r}, 'wb') as _f:
+            _o = deflate.DeflateIO(_f, deflate.ZLIB, {wbits})
+            while True:
+                _n = _i.readinto(_b)
+                if not _n:
+                    break
+                _o.write(_m[:_n])
+            _o.close()
+    except Exception:
+        try:
+            uos.remove({dst!r})
+        except OSError:
+            pass
+        raise
+    print(uos.stat({dst!r})[6])
+else:
+    print(-1)
+del _b, _m, _i, _o, _n, _k
+"""
+
+# Sıkıştırmada pencere boyutu 2^ZLIB_WBITS. Cihazda açarken bu kadar bellek gerekir
+ZLIB_WBITS = 10
+# Bu boyutlar arasındaki dosyalar, sıkışabiliyorsa sıkıştırılarak taşınır
+COMPRESS_MIN = 2 * 1024
+COMPRESS_MAX = 2 * 1024 * 1024
+# Sıkıştırılmış boyut / asıl boyut, bundan büyükse sıkıştırmaya değmez
+COMPRESS_RATIO = .8
+# İndirmede, cihazın sıkışabilirliğe bakmak için bellekte sıkıştırdığı baştaki kısım
+COMPRESS_SAMPLE = 4 * 1024
+# Zaten sıkıştırılmış dosyalar indirilirken cihazda boşuna sıkıştırılmaz
+COMPRESSED_EXTENSIONS = (".z", ".gz", ".zip", ".jpg", ".jpeg", ".png", ".gif", ".mp3")
+
+# Senkronizasyonda, daha önce yüklenen dosyaların kaydı. Yerel proje klasöründe tutulur
+SYNC_MANIFEST = ".nesp_manifest.json"
+
+# 'receives' bu kadar satırı geçince, eski satırlar baştan silinir. Okuyan, dr_subscribe ile sadece yenileri alır
+RECEIVES_MAX = 1000
+
+# Raw REPL'e geçildiğinde cihazın yazdığı başlığın sonu
+RAW_REPL_BANNER = b"CTRL-B to exit\r\n"
+
+# Raw REPL'deyken raw-paste moduna geçme isteği
+RAW_PASTE_ENTER = b"\x05A\x01"
+
+# websocket okuma tamponunun başlangıç boyutu
+RECV_BUFSIZE = 64 * 1024
+# Tek sendmsg çağrısına verilecek en fazla parça sayısı (IOV_MAX sınırının altında kalsın)
+SENDMSG_MAX = 512
+
+# put_file'da tek frame'e konulan veri boyutu
+PUT_CHUNK_SIZE = 1024
+# put_file'da sokete tek seferde yazılan en fazla veri. Her yazımdan sonra ilerleme bildirilir
+PUT_FLUSH_SIZE = 64 * 1024
+
+# get_file'da cevabı beklenmeden gönderilen en fazla parça isteği (onay)
+GET_WINDOW = 16
+
 HANDSHAKE_TEXT = b"""\
 GET / HTTP/1.1\r
 Host: localhost\r
@@ -64,64 +235,189 @@ Sec-WebSocket-Key: foo\r
 
 
 class websocket:
-    def __init__(self, s):
+    def __init__(self, s, bufsize=RECV_BUFSIZE, nodelay=True):
         self.s = s
-        self.buf = b""
+
+        # Gelen veri için önceden ayrılmış tampon. Okunmamış veri; rbuf[head:tail] arasındadır.
+        self.rbuf = bytearray(bufsize)
+        self.rview = memoryview(self.rbuf)
+        self.head = 0
+        self.tail = 0
+
+        # Okunmakta olan frame'in tipi ve kalan payload uzunluğu
+        self.fl = 0
+        self.remain = 0
+        # Atlanacak (istenmeyen tipteki) frame'in kalan uzunluğu
+        self.skip = 0
+
+        # Gönderilmeyi bekleyen frame parçaları (başlık, veri, başlık, veri, ...)
+        self.wbufs = []
+
+        if nodelay:
+            # Küçük komutlar Nagle algoritmasına takılıp beklemesin
+            try:
+                s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
 
     def writetext(self, data):
         self.write(data, istext=True)
 
     def write(self, data, istext=False):
+        self.queue(data, istext)
+        self.flush()
+
+    def queue(self, data, istext=False):
+        """Frame'i gönderilmek üzere sıraya ekler. Sıradakiler 'flush' ile tek seferde gönderilir"""
         ll = len(data)
         if ll < 126:
             # TODO: hardcoded "binary" type
             hdr = struct.pack(">BB", (0x82, 0x81)[istext], ll)
-        else:
+        elif ll < 65536:
             hdr = struct.pack(">BBH", (0x82, 0x81)[istext], 126, ll)
-        self.s.send(hdr)
-        self.s.send(data)
+        else:
+            hdr = struct.pack(">BBQ", (0x82, 0x81)[istext], 127, ll)
+        self.wbufs.append(hdr)
+        self.wbufs.append(data)
+
+    def flush(self):
+        """Sıradaki tüm frameleri, mümkünse tek sistem çağrısı ile gönderir"""
+        bufs = self.wbufs
+        if not bufs:
+            return
+        self.wbufs = []
 
-    def recvexactly(self, sz):
-        res = b""
+        if not hasattr(self.s, "sendmsg"):
+            # Windows'ta sendmsg yok
+            self.s.sendall(b"".join(bufs))
+            return
 
-        while sz:
-            data = self.s.recv(sz)
+        bufs = [memoryview(b) for b in bufs if len(b)]
+        i = 0
+        while i < len(bufs):
+            sent = self.s.sendmsg(bufs[i:i + SENDMSG_MAX])
+            # Kısmi gönderimde, gönderilenleri atlayıp kalanından devam ediyoruz
+            while sent:
+                n = len(bufs[i])
+                if sent < n:
+                    bufs[i] = bufs[i][sent:]
+                    break
+                sent -= n
+                i += 1
+
+    def _recv(self):
+        """Soketten, tampondaki boş alana tek seferde okur"""
+        self._recv_done(self.s.recv_into(self._recv_view()))
+
+    def _recv_view(self):
+        """Tamponun, okunacak veriyi alacak boş kısmı"""
+        if self.tail == len(self.rbuf):
+            self._compact()
+            if self.tail == len(self.rbuf):
+                self._reserve(self.tail + 1)
+        return self.rview[self.tail:]
+
+    def _recv_done(self, n):
+        if not n:
+            raise ConnectionError("Websocket closed by peer")
+        self.tail += n
+
+    def _compact(self):
+        """Okunmamış veriyi tamponun başına kaydırır"""
+        n = self.tail - self.head
+        if self.head:
+            self.rview[:n] = self.rview[self.head:self.tail]
+        self.head = 0
+        self.tail = n
+
+    def _reserve(self, size):
+        """Tamponda 'size' kadar okunmamış veri birikebilmesi için yer açar"""
+        if size > len(self.rbuf):
+            rbuf = bytearray(max(size, len(self.rbuf) * 2))
+            rbuf[:self.tail - self.head] = self.rview[self.head:self.tail]
+            self.rbuf = rbuf
+            self.rview = memoryview(rbuf)
+            self.tail -= self.head
+            self.head = 0
+        elif self.head + size > len(self.rbuf):
+            self._compact()
+
+    def _parse_header(self):
+        """Tampondaki frame başlığını çözer. Başlık tam gelmediyse None döner"""
+        avail = self.tail - self.head
+        if avail < 2:
+            return None
+
+        head = self.head
+        fl = self.rbuf[head]
+        sz = self.rbuf[head + 1] & 0x7f
+
+        if sz == 126:
+            if avail < 4:
+                return None
+            (sz,) = struct.unpack_from(">H", self.rbuf, head + 2)
+            head += 4
+        elif sz == 127:
+            if avail < 10:
+                return None
+            (sz,) = struct.unpack_from(">Q", self.rbuf, head + 2)
+            head += 10
+        else:
+            head += 2
+
+        self.head = head
+        return fl, sz
+
+    def _read_buffered(self, size, text_ok):
+        """Soket okumadan, sadece tampondakilerle çalışır. Yeterli veri yoksa None döner"""
+        while not self.remain:
+            if self.skip:
+                n = min(self.skip, self.tail - self.head)
+                self.head += n
+                self.skip -= n
+                if self.skip:
+                    return None
+                continue
 
-            if not data:
-                break
+            hdr = self._parse_header()
+            if hdr is None:
+                return None
 
-            res += data
-            sz -= len(data)
-        return res
+            fl, sz = hdr
+            if fl == 0x82 or (text_ok and fl == 0x81):
+                self.fl = fl
+                self.remain = sz
+                continue
 
-    def read(self, size, text_ok=False, size_match=True):
-        if not self.buf:
-            while True:
-                hdr = self.recvexactly(2)
-                assert len(hdr) == 2
-                fl, sz = struct.unpack(">BB", hdr)
-                if sz == 126:
-                    hdr = self.recvexactly(2)
-                    assert len(hdr) == 2
-                    (sz,) = struct.unpack(">H", hdr)
-                if fl == 0x82:
-                    break
-                if text_ok and fl == 0x81:
-                    break
+            rapor.info_grey(websocket.read.__name__, f"Got unexpected websocket record of type, skipping it {fl}")
+            self.skip = sz
+
+        want = min(size, self.remain)
+        if self.tail - self.head < want:
+            self._reserve(want)
+            return None
 
-                rapor.info_grey(websocket.read.__name__, f"Got unexpected websocket record of type, skipping it {fl}")
+        head = self.head
+        self.head += want
+        self.remain -= want
+        return bytes(self.rview[head:self.head])
 
-                while sz:
-                    skip = self.s.recv(sz)
+    def recvexactly(self, sz):
+        self._reserve(sz)
+        while self.tail - self.head < sz:
+            self._recv()
 
-                    rapor.info_grey(websocket.read.__name__, f"Skip data ; {skip}")
-                    sz -= len(skip)
-            data = self.recvexactly(sz)
-            assert len(data) == sz
-            self.buf = data
+        head = self.head
+        self.head += sz
+        return bytes(self.rview[head:self.head])
+
+    def read(self, size, text_ok=False, size_match=True):
+        while True:
+            d = self._read_buffered(size, text_ok)
+            if d is not None:
+                break
+            self._recv()
 
-        d = self.buf[:size]
-        self.buf = self.buf[size:]
         if size_match:
             assert len(d) == size, len(d)
         return d
@@ -131,250 +427,1300 @@ class websocket:
         assert req == 9 and val == 2
 
 
-class Webrepl:
-    isconnect = -1
-    '''
-    -1: Not connected, 
-    0: Connecting, 
-    1: Connected
-    '''
+class aiowebsocket(websocket):
+    """
+    websocket'in asyncio sürümü. Tampon ve frame çözme kısmı ortaktır, sadece soket işlemleri beklenir.
+    Soket non-blocking olmalı ve çalışan event loop içinde oluşturulmalı.
+    """
+
+    def __init__(self, s, bufsize=RECV_BUFSIZE, nodelay=True):
+        super().__init__(s, bufsize, nodelay)
+        self.loop = asyncio.get_event_loop()
+        self.wlock = asyncio.Lock()
+
+    async def _arecv(self):
+        n = await self.loop.sock_recv_into(self.s, self._recv_view())
+        self._recv_done(n)
+
+    async def aread(self, size, text_ok=False, size_match=True):
+        while True:
+            d = self._read_buffered(size, text_ok)
+            if d is not None:
+                break
+            await self._arecv()
+
+        if size_match:
+            assert len(d) == size, len(d)
+        return d
+
+    async def areaduntil(self, sep):
+        """Frame çözmeden, 'sep' gelene kadar olan ham veriyi okur. Handshake için"""
+        while True:
+            i = self.rbuf.find(sep, self.head, self.tail)
+            if i >= 0:
+                head = self.head
+                self.head = i + len(sep)
+                return bytes(self.rview[head:self.head])
+            self._reserve(self.tail - self.head + 1)
+            await self._arecv()
+
+    async def awrite(self, data, istext=False):
+        self.queue(data, istext)
+        await self.aflush()
+
+    async def aflush(self):
+        bufs = self.wbufs
+        if not bufs:
+            return
+        self.wbufs = []
+
+        # Yarım kalan gönderimin arasına başka frame girmesin
+        async with self.wlock:
+            await self.loop.sock_sendall(self.s, b"".join(bufs))
+
+
+def file_digest(src):
+    """Yerel dosyanın ya da içeriğin (boyut, sha256 özeti). Cihazdaki DIGEST_CODE ile aynı biçimde"""
+    h = hashlib.sha256()
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        h.update(src)
+        return len(src), h.hexdigest()
+
+    size = 0
+    with open(src, "rb") as f:
+        for block in iter(lambda: f.read(64 * 1024), b""):
+            h.update(block)
+            size += len(block)
+    return size, h.hexdigest()
+
+
+def project_files(local_dir, remote_dir="/"):
+    """Yerel klasördeki dosyaları {cihazdaki yol: yerel yol} olarak listeler. Gizli dosyalar ve önbellek atlanır"""
+    files = {}
+    for root, dirs, names in os.walk(local_dir):
+        dirs[:] = sorted(i for i in dirs if not i.startswith(".") and i != "__pycache__")
+        for name in sorted(names):
+            if name.startswith("."):
+                continue
+            local = os.path.join(root, name)
+            rel = os.path.relpath(local, local_dir).replace(os.sep, "/")
+            files[remote_dir.rstrip("/") + "/" + rel] = local
+    return files
+
+
+def compress_data(data, force=False):
+    """
+    Veriyi, cihazın açabileceği pencere boyutuyla zlib formatında sıkıştırır.
+    Sıkıştırmaya değmiyorsa (küçük, büyük ya da sıkışmıyorsa) None döndürür. 'force' ise her zaman sıkıştırır.
+    Önce ilk 16 KiB hızlıca sıkıştırılarak tahmin yapılır.
+    """
+    if not force:
+        if not COMPRESS_MIN <= len(data) <= COMPRESS_MAX:
+            return None
+        sample = data[:16 * 1024]
+        if len(zlib.compress(sample, 1)) > len(sample) * COMPRESS_RATIO:
+            return None
+
+    c = zlib.compressobj(9, zlib.DEFLATED, ZLIB_WBITS)
+    packed = c.compress(data) + c.flush()
+    if not force and len(packed) > len(data) * COMPRESS_RATIO:
+        return None
+    return packed
+
+
+def upload_chunks(src, size=None, chunk_size=PUT_CHUNK_SIZE):
+    """
+    put_file'a verilen kaynağı parçalara böler. (boyut, parçalar) döndürür.
+    Kaynak; bytes, bytearray, memoryview, dosya nesnesi ya da bytes üreten iterator olabilir.
+    Protokol boyutu başta istediği için, boyutu bilinmeyen kaynaklar bellekte toplanır.
+    """
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        view = memoryview(src).cast("B")
+        return len(view), (view[i:i + chunk_size] for i in range(0, len(view), chunk_size))
+
+    if hasattr(src, "read"):
+        if size is None:
+            try:
+                size = os.fstat(src.fileno()).st_size - src.tell()
+            except (AttributeError, OSError, ValueError):
+                return upload_chunks(src.read(), None, chunk_size)
+        return size, iter(lambda: src.read(chunk_size), b"")
+
+    if size is None:
+        return upload_chunks(b"".join(src), None, chunk_size)
+    return size, iter(src)
+
+
+class RawRequest:
+    """Raw REPL'e gönderilmiş ve cevabı beklenen kod"""
+
+    def __init__(self, future, paste=False):
+        self.future = future
+        self.start = time.perf_counter()
 
+        # Cevabın hangi kısmı bekleniyor; ok, paste, flow, fallback, output
+        self.state = "paste" if paste else "ok"
+        # Raw-paste akış kontrolü olayları
+        self.events = asyncio.Queue() if paste else None
+
+
+class AsyncWebrepl:
+    """
+    asyncio tabanlı WebREPL istemcisi. Tek event loop ile birden fazla cihaz yönetilebilir.
+
+        >>> wr = AsyncWebrepl(host="192.168.1.34", password="123456")
+        >>> await wr.connect()
+        >>> await wr.login()
+        >>> await wr.send("print(1)")
+        >>> async for line in wr:
+        ...     print(line)
+    """
     timeout = 5
-    receives = []
-    get_files = []
 
-    def __init__(self, host="", port=8266, password="", auto=True):
-        """"""
+    def __init__(self, host="", port=8266, password=""):
         self.host = host
         self.port = port
         self.password = password
-        self.auto = auto
+
+        self.isconnect = -1
+        '''
+        -1: Not connected, 
+        0: Connecting, 
+        1: Connected
+        '''
+
+        # Bağlantı durumu değiştiğinde çağrılır -> on_state(isconnect)
+        self.on_state = None
+        # Gelen satırlar atanmışsa 'on_line'a, atanmamışsa 'lines' kuyruğuna verilir
+        self.on_line = None
+        self.lines = None
 
         self.s = None
         self.ws = None
-        self.thread = None
-
-    def start(self):
-        # Connecting
-        self.isconnect = 0
-        if self.auto:
-            self.connect()
-            self.login()
+        self.reader = None
+
+        # Metin olarak gelen ama satırı henüz tamamlanmamış cevap
+        self.resp = b""
+
+        # Dosya transferlerinde gelen binary veriler
+        self.binary = bytearray()
+        self.binary_event = None
+        self.transfer = None
+        self.raw_lock = None
+
+        # Raw REPL; cevabı beklenen istekler (RawRequest) gönderilme sırasıyla 'pending'dedir
+        self.raw = False
+        self.raw_ready = False
+        self.rawbuf = bytearray()
+        self.pending = deque()
+
+        # Cihazın sıkıştırma desteği. Bilinmiyorsa None. ZLIB_CAPS_CODE'a bakınız
+        self.zlib = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        line = await self.lines.get()
+        if line is None:
+            raise StopAsyncIteration
+        return line
+
+    def set_state(self, state):
+        self.isconnect = state
+        if self.on_state:
+            self.on_state(state)
+
+    def set_listener(self, on_line):
+        """Gelen satırları 'on_line'a yönlendirir. Kuyrukta bekleyenler de ona verilir"""
+        self.on_line = on_line
+        while self.lines and not self.lines.empty():
+            line = self.lines.get_nowait()
+            if line is not None:
+                on_line(line)
+
+    def emit(self, line):
+        if self.on_line:
+            self.on_line(line)
+        else:
+            self.lines.put_nowait(line)
 
-    def client_handshake(self, sock):
-        cl = sock.makefile("rwb", 0)
-        cl.write(HANDSHAKE_TEXT, )
+    async def client_handshake(self):
+        await self.ws.loop.sock_sendall(self.s, HANDSHAKE_TEXT)
 
-        st = time.time()
-        while cl.readline() != b"\r\n":
-            if time.time() - st > self.timeout:
-                rapor.warning(Webrepl.client_handshake.__name__, f"Timeout ; {self.timeout}")
-                return False
+        try:
+            await asyncio.wait_for(self.ws.areaduntil(b"\r\n\r\n"), self.timeout)
+        except asyncio.TimeoutError:
+            rapor.warning(AsyncWebrepl.client_handshake.__name__, f"Timeout ; {self.timeout}")
+            return False
 
         return True
 
-    def connect(self, host=None, port=None):
+    async def connect(self, host=None, port=None):
         if host:
             self.host = host
         if port:
             self.port = port
 
         if not self.host:
-            self.isconnect = -1
+            self.set_state(-1)
             return
 
-        rapor.notice(Webrepl.connect.__name__, f"Trying connecting to {self.host} {self.port}")
-
-        self.s = socket.socket()
+        rapor.notice(AsyncWebrepl.connect.__name__, f"Trying connecting to {self.host} {self.port}")
 
-        addr = socket.getaddrinfo(self.host, self.port)[0][4]
+        loop = asyncio.get_event_loop()
+        self.lines = asyncio.Queue()
+        self.binary_event = asyncio.Event()
+        self.transfer = asyncio.Lock()
+        self.raw_lock = asyncio.Lock()
+        self.zlib = None
 
-        self.s.settimeout(self.timeout)
+        s = socket.socket()
+        s.setblocking(False)
 
         try:
-            self.s.connect(addr)
-        except:
-            self.isconnect = -1
-            rapor.notice(Webrepl.connect.__name__, f"Connection failed")
+            addr = (await loop.getaddrinfo(self.host, self.port, family=socket.AF_INET))[0][4]
+            await asyncio.wait_for(loop.sock_connect(s, addr), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            s.close()
+            self.set_state(-1)
+            rapor.notice(AsyncWebrepl.connect.__name__, f"Connection failed")
             return
 
-        rapor.info(Webrepl.connect.__name__, "Handshake")
+        rapor.info(AsyncWebrepl.connect.__name__, "Handshake")
 
-        if self.client_handshake(self.s):
-            self.ws = websocket(self.s)
-        else:
-            self.isconnect = -1
+        self.s = s
+        self.ws = aiowebsocket(s)
+
+        if not await self.client_handshake():
+            await self.disconnect()
+
+    async def disconnect(self):
+        if self.reader:
+            self.reader.cancel()
+            try:
+                await self.reader
+            except asyncio.CancelledError:
+                pass
+        self.reader = None
 
-    def disconnect(self):
         if self.s:
             self.s.close()
         self.s = None
         self.ws = None
-        self.isconnect = -1
-        rapor.info_grey(Webrepl.disconnect.__name__, "Disconnected")
+        self.set_state(-1)
+        rapor.info_grey(AsyncWebrepl.disconnect.__name__, "Disconnected")
 
-    def login(self, passwd=""):
+    async def login(self, passwd=""):
         if passwd:
             self.password = passwd
 
         if not (self.password and self.ws):
-            self.isconnect = -1
+            self.set_state(-1)
             return
 
-        rapor.info_grey(Webrepl.login.__name__, f"Started")
+        rapor.info_grey(AsyncWebrepl.login.__name__, f"Started")
 
-        while True:
-            c = self.ws.read(1, text_ok=True)
-            if c == b":":
-                assert self.ws.read(1, text_ok=True) == b" "
-                break
-        self.ws.write(self.password.encode("utf-8") + b"\r")
-
-        rapor.info_grey(Webrepl.login.__name__, f"Send Password ; {self.password}")
+        try:
+            resp = await asyncio.wait_for(self._login(), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            rapor.warning(AsyncWebrepl.login.__name__, f"Timeout ; {self.timeout}")
+            await self.disconnect()
+            return
 
-        resp = self.ws.read(64, text_ok=True, size_match=False)
         # b'\r\nWebREPL connected\r\n>>> '
         # b'\r\nAccess denied\r\n'
-        if b"WebREPL connected" in resp:
-            self.isconnect = 1
+        rapor.info(AsyncWebrepl.login.__name__, f"Response ; {resp.decode('utf-8').strip()}")
 
-        rapor.info(Webrepl.login.__name__, f"Response ; {resp.decode('utf-8').strip()}")
+        if b"WebREPL connected" not in resp:
+            await self.disconnect()
+            return
 
-        # self.send("import sys, os, machine, gc, esp, network, micropython")
-        self.send("import os")
+        self.set_state(1)
+        self.reader = asyncio.ensure_future(self.read_loop())
 
-    def send(self, cmd):
-        """Sadece gönderir. Okuma yapmaz olacak"""
-        if self.isconnect < 0:
-            return ""
+        # await self.send("import sys, os, machine, gc, esp, network, micropython")
+        await self.send("import os")
 
-        rapor.info(Webrepl.send.__name__, f"Sending Command ; {cmd}")
-        self.ws.writetext(cmd.encode("utf-8") + b"\r\n")
+    async def _login(self):
+        prompt = b""
+        while not prompt.endswith(b": "):
+            prompt += await self.ws.aread(64, text_ok=True, size_match=False)
 
-    def put_file(self, local_file, remote_file):
-        sz = os.stat(local_file)[6]
-        dest_fname = (SANDBOX + remote_file).encode("utf-8")
-        rec = struct.pack(WEBREPL_REQ_S, b"WA", WEBREPL_PUT_FILE, 0, 0, sz, len(dest_fname), dest_fname)
+        await self.ws.awrite(self.password.encode("utf-8") + b"\r")
 
-        rapor.info(Webrepl.put_file.__name__, f"Put file struct {rec} {len(rec)}")
+        rapor.info_grey(AsyncWebrepl.login.__name__, f"Send Password ; {self.password}")
 
-        self.ws.write(rec[:10])
-        self.ws.write(rec[10:])
-        # if self.read_resp() != 0:
-        #     rapor.error(Webrepl.put_file.__name__, f"Error: Okuma halindeyken başka işlem çağırıldı")
-        #     return
+        return await self.ws.aread(64, text_ok=True, size_match=False)
 
-        cnt = 0
-        with open(local_file, "rb") as f:
+    async def read_loop(self):
+        """Soketi okuyan tek yer burasıdır. Metinler satırlara, binary veriler transferlere gider"""
+        ws = self.ws
+        try:
             while True:
-                rapor.info_grey(Webrepl.put_file.__name__, f"Sent {cnt} of {sz}")
-                buf = f.read(1024)
-                if not buf:
-                    break
-                self.ws.write(buf)
-                cnt += len(buf)
+                r = await ws.aread(RECV_BUFSIZE, text_ok=True, size_match=False)
 
-        # if self.read_resp() != 0:
-        #     rapor.error(Webrepl.put_file.__name__, f"Error: Yarıda kesildi")
-        #     return
+                if ws.fl == 0x82:
+                    self.binary += r
+                    self.binary_event.set()
+                    continue
 
-    def put_file_content(self, file_content, remote_file):
-        local_file = "volatilefile"
-        with open(local_file, "wb") as f:
-            f.write(file_content.encode("utf-8"))
+                if self.raw:
+                    self.rawbuf += r
+                    self.parse_raw()
+                    continue
 
-        self.put_file(local_file, remote_file)
-        os.remove(local_file)
-        return "OK"
+                if r in (b'\r\n', b'>>> '):
+                    self.emit(self.resp.decode("utf-8", "replace"))
+                    self.resp = b''
+                    continue
 
-    def listen(self, thread=False):
-        if not thread:
-            self.thread = Thread(target=self.listen, kwargs={"thread": True})
-            self.thread.start()
+                self.resp = self.resp + r
+        except OSError as e:
+            rapor.notice(AsyncWebrepl.read_loop.__name__, f"Connection lost ; {e}")
+        finally:
+            self.binary_event.set()
+            self.lines.put_nowait(None)
+            self.fail_pending(ConnectionError("Connection lost"))
+            if self.isconnect > 0:
+                self.set_state(-1)
+
+    def parse_raw(self):
+        """
+        Raw REPL cevaplarını ayırır ve sıradaki isteğe teslim eder.
+            raw REPL; CTRL-B to exit\r\n
+            >OK<stdout>\x04<stderr>\x04                         -> submit
+            >R\x01<window>[\x01...]\x04<stdout>\x04<stderr>\x04  -> paste
+        """
+        buf = self.rawbuf
+        while True:
+            if not self.raw_ready:
+                i = buf.find(RAW_REPL_BANNER)
+                if i < 0:
+                    del buf[:-len(RAW_REPL_BANNER)]
+                    return
+                del buf[:i + len(RAW_REPL_BANNER)]
+                self.raw_ready = True
+
+            if not buf:
+                return
+
+            if not self.pending:
+                # İstem; sıradaki isteğin cevabının başı
+                if buf == b">":
+                    return
+                rapor.warning(AsyncWebrepl.parse_raw.__name__, f"Raw REPL answer without request ; {bytes(buf)}")
+                buf.clear()
+                return
+
+            req = self.pending[0]
+
+            if req.state == "output":
+                i = buf.find(b"\x04")
+                j = buf.find(b"\x04", i + 1) if i >= 0 else -1
+                if j < 0:
+                    return
+
+                out = bytes(buf[:i]).decode("utf-8", "replace")
+                err = bytes(buf[i + 1:j]).decode("utf-8", "replace")
+                del buf[:j + 1]
+
+                self.pending.popleft()
+                if not req.future.done():
+                    req.future.set_result({"out": out, "err": err, "time": time.perf_counter() - req.start})
+                continue
+
+            if req.state == "flow":
+                # Raw-paste akış kontrolü; \x01 yeni pencere, \x04 verinin sonu
+                c = buf[0]
+                del buf[:1]
+                if c == 0x01:
+                    req.events.put_nowait(("window",))
+                elif c == 0x04:
+                    req.state = "output"
+                    req.events.put_nowait(("end",))
+                continue
+
+            if req.state == "paste":
+                if len(buf) < 3:
+                    return
+                if buf[:3] == b">R\x01":
+                    if len(buf) < 5:
+                        return
+                    (window,) = struct.unpack_from("<H", buf, 3)
+                    del buf[:5]
+                    req.state = "flow"
+                    req.events.put_nowait(("window", window))
+                    continue
+                if buf[:3] == b">R\x00":
+                    # Raw-paste'i anladı ama desteklemiyor
+                    del buf[:3]
+                    req.state = "fallback"
+                    req.events.put_nowait(("unsupported",))
+                    continue
+                if buf[:2] != b">R":
+                    # Eski sürüm; komutu anlamadı, raw REPL'e baştan girdi
+                    i = buf.find(RAW_REPL_BANNER)
+                    if i < 0:
+                        return
+                    del buf[:i + len(RAW_REPL_BANNER)]
+                    req.state = "ok"
+                    req.events.put_nowait(("unsupported",))
+                    continue
+
+            expect = b">OK" if req.state == "ok" else b"OK"
+            if len(buf) < len(expect):
+                return
+
+            if buf[:len(expect)] == expect:
+                del buf[:len(expect)]
+                req.state = "output"
+                continue
+
+            rapor.warning(AsyncWebrepl.parse_raw.__name__, f"Unexpected raw REPL data ; {bytes(buf[:32])}")
+            i = buf.find(b">", 1)
+            del buf[:i if i > 0 else len(buf)]
+
+    def fail_pending(self, exc):
+        while self.pending:
+            req = self.pending.popleft()
+            if not req.future.done():
+                req.future.set_exception(exc)
+
+    async def raw_enter(self):
+        """Raw REPL'e geçer. Cevabı beklemez, sonraki kodlar hemen arkasından gönderilebilir"""
+        if self.raw:
+            return
+        self.raw = True
+        self.raw_ready = False
+        self.rawbuf.clear()
+        self.resp = b""
+        await self.ws.awrite(WR_CMD.CONTROL_A.encode(), istext=True)
+
+    async def raw_exit(self):
+        """Bekleyen kodlar bitince normal REPL'e döner"""
+        if not self.raw:
             return
+        if self.pending:
+            await asyncio.wait([req.future for req in self.pending])
+        self.raw = False
+        await self.ws.awrite(WR_CMD.CONTROL_B.encode(), istext=True)
+
+    def _raw_request(self, callback, paste=False):
+        if self.isconnect < 1:
+            raise ConnectionError("Not connected")
+
+        req = RawRequest(asyncio.get_event_loop().create_future(), paste)
+        if callback:
+            req.future.add_done_callback(callback)
+        return req
+
+    async def submit(self, code, callback=None):
+        """
+        Kodu raw REPL'de çalıştırılmak üzere gönderir. Cevabı beklemeden future döndürür.
+        Future'ın sonucu; {"out": stdout, "err": stderr, "time": saniye}
+        Arka arkaya gönderilen kodların cevapları, gönderilme sırasıyla gelir.
+        """
+        req = self._raw_request(callback)
+
+        # Boş kod, raw REPL'de soft reset demek
+        code = code if code.strip() else "pass"
+
+        # Dosya aktarımı sürerken REPL'e yazılmaz; cihaz, WA/WB aktarımının ortasında metin frame'i beklemez
+        async with self.transfer, self.raw_lock:
+            await self.raw_enter()
+            self.pending.append(req)
+            await self.ws.awrite(code.encode("utf-8") + WR_CMD.CONTROL_D.encode(), istext=True)
+        return req.future
+
+    async def execute(self, code, timeout=None):
+        """Kodu raw REPL'de çalıştırır ve sonucunu bekler"""
+        return await asyncio.wait_for(await self.submit(code), timeout)
+
+    async def paste(self, code, callback=None):
+        """
+        Büyük kodları, cihazın giriş tamponunu taşırmadan raw-paste modu ile çalıştırır. Flash'a yazılmaz.
+        Cihaz, pencere boyutu kadar veri aldıkça \x01 göndererek yeni pencere açar.
+        Cihaz raw-paste desteklemiyorsa, normal raw REPL ile parça parça gönderilir.
+        submit gibi, sonucu verecek future döndürür.
+        """
+        req = self._raw_request(callback, paste=True)
+        data = code.encode("utf-8") if type(code) is str else bytes(code)
+        data = data if data.strip() else b"pass"
+
+        async with self.transfer, self.raw_lock:
+            await self.raw_enter()
+            self.pending.append(req)
+            try:
+                await self._paste(req, data)
+            except (OSError, asyncio.TimeoutError) as e:
+                rapor.error(AsyncWebrepl.paste.__name__, f"Error: {e}")
+                if req in self.pending:
+                    self.pending.remove(req)
+                if not req.future.done():
+                    req.future.set_exception(e)
+
+        return req.future
+
+    async def _paste(self, req, data):
+        events = req.events
+        await self.ws.awrite(RAW_PASTE_ENTER, istext=True)
+
+        event = await asyncio.wait_for(events.get(), self.timeout)
+
+        if event[0] == "unsupported":
+            for i in range(0, len(data), 256):
+                await self.ws.awrite(data[i:i + 256], istext=True)
+                await asyncio.sleep(.01)
+            await self.ws.awrite(WR_CMD.CONTROL_D.encode(), istext=True)
+            return
+
+        window = remain = event[1]
+        i = 0
+        while i < len(data):
+            while remain == 0 or not events.empty():
+                event = await asyncio.wait_for(events.get(), self.timeout)
+                if event[0] == "window":
+                    remain += window
+                elif event[0] == "end":
+                    # Cihaz veriyi erken kesti
+                    await self.ws.awrite(WR_CMD.CONTROL_D.encode(), istext=True)
+                    return
+
+            chunk = data[i:i + remain]
+            await self.ws.awrite(chunk, istext=True)
+            remain -= len(chunk)
+            i += len(chunk)
+
+        await self.ws.awrite(WR_CMD.CONTROL_D.encode(), istext=True)
+
+    async def send(self, cmd):
+        """Sadece gönderir. Okuma yapmaz"""
+        if self.isconnect < 0:
+            return ""
+
+        # Dosya aktarımı sürerken REPL'e yazılmaz. Bkz. submit
+        async with self.transfer:
+            # Raw REPL'deyken normal komut gelirse, önce normal REPL'e dönülür.
+            # Kontrol karakterleri olduğu gibi gider
+            if self.raw:
+                if cmd.startswith(WR_CMD.CONTROL_B):
+                    self.raw = False
+                elif cmd[:1] not in (WR_CMD.CONTROL_A, WR_CMD.CONTROL_C, WR_CMD.CONTROL_D):
+                    await self.raw_exit()
+
+            rapor.info(AsyncWebrepl.send.__name__, f"Sending Command ; {cmd}")
+            try:
+                await self.ws.awrite(cmd.encode("utf-8") + b"\r\n", istext=True)
+            except OSError as e:
+                rapor.notice(AsyncWebrepl.send.__name__, f"Connection lost ; {e}")
+                await self.disconnect()
+                return ""
+
+    async def recv_binary(self, size):
+        """Transfer sırasında gelen binary veriden 'size' kadarını okur"""
+        while len(self.binary) < size:
+            if self.isconnect < 0:
+                raise ConnectionError("Connection lost")
+            self.binary_event.clear()
+            await asyncio.wait_for(self.binary_event.wait(), self.timeout)
+
+        data = bytes(self.binary[:size])
+        del self.binary[:size]
+        return data
+
+    async def read_resp(self):
+        data = await self.recv_binary(4)
+        sig, code = struct.unpack("<2sH", data)
+        assert sig == b"WB"
+        return code
+
+    async def send_req(self, op, sz=0, fname=b""):
+        rec = struct.pack(WEBREPL_REQ_S, b"WA", op, 0, 0, sz, len(fname), fname)
 
-        """Listener olarak değiştir ve sürekli döngüde kal. girdikten sonra Timeout Sonsuz olsun. Thread ekle"""
+        rapor.info_grey(AsyncWebrepl.send_req.__name__, f"Send request {rec} {len(rec)}")
 
-        resp = b''
-        self.s.settimeout(1)
+        await self.ws.awrite(rec)
 
-        while self.s and self.ws and self.isconnect > 0:
+    async def zlib_caps(self):
+        """Cihazın sıkıştırma desteğini bir kere sorar"""
+        if self.zlib is None:
             try:
-                if self.get_files:
-                    file_name = self.get_files.pop(0)
-                    rsp = self._get_file_content(file_name)
-                    self.receives.append(f"{WR_KEY._FILE_READ} {file_name}\n{rsp}")
+                self.zlib = int((await self.execute(ZLIB_CAPS_CODE))["out"])
+            except (OSError, ValueError, asyncio.TimeoutError) as e:
+                rapor.warning(AsyncWebrepl.zlib_caps.__name__, f"Unknown ; {e}")
+                return 0
+        return self.zlib
+
+    async def put_file(self, src, remote_file, size=None, chunk_size=PUT_CHUNK_SIZE, progress=None, compress=False):
+        """
+        Dosyayı, yerel diske yazmadan doğrudan sokete akıtarak cihaza yükler.
+            src: Yerel dosya yolu, bytes, bytearray, memoryview, dosya nesnesi ya da bytes üreten iterator.
+            size: Iterator'ün vereceği toplam boyut. Verilmezse iterator bellekte toplanır.
+            chunk_size: Tek frame'e konulacak veri boyutu.
+            progress: progress(gönderilen, toplam) şeklinde çağrılır.
+            compress: None ise, yerel dosya ve bytes için sıkışabiliyorsa sıkıştırılır. True ise her zaman.
+                      Sıkıştırılan veri cihazda geçici dosyaya yazılır, sonra açılarak asıl dosyaya yazılır;
+                      flash'a iki kez yazıldığı için istenmedikçe kullanılmaz.
+        Parçalar cevap beklenmeden arka arkaya gönderilir. Cihazın son cevabı başarılıysa True döndürür.
+        """
+        if isinstance(src, str):
+            if compress or (compress is None and COMPRESS_MIN <= os.path.getsize(src) <= COMPRESS_MAX):
+                with open(src, "rb") as f:
+                    src = f.read()
+            else:
+                with open(src, "rb") as f:
+                    return await self.put_file(f, remote_file, size, chunk_size, progress, False)
+
+        if compress and not isinstance(src, (bytes, bytearray, memoryview)):
+            src = src.read() if hasattr(src, "read") else b"".join(src)
+
+        if compress is not False and isinstance(src, (bytes, bytearray, memoryview)):
+            packed = compress_data(src, compress)
+            if packed is not None and await self.zlib_caps():
+                return await self._put_packed(packed, remote_file, chunk_size, progress)
+
+        async with self.transfer:
+            self.binary.clear()
+
+            size, chunks = upload_chunks(src, size, chunk_size)
+            dest_fname = (SANDBOX + remote_file).encode("utf-8")
+            rec = struct.pack(WEBREPL_REQ_S, b"WA", WEBREPL_PUT_FILE, 0, 0, size, len(dest_fname), dest_fname)
+
+            rapor.info(AsyncWebrepl.put_file.__name__, f"Put file {remote_file} ; {size} bytes")
+
+            # Cihaz, başlığı iki ayrı frame olarak bekliyor. Ama tek seferde gönderiyoruz
+            self.ws.queue(rec[:10])
+            self.ws.queue(rec[10:])
+            await self.ws.aflush()
+
+            if await self.read_resp() != 0:
+                rapor.error(AsyncWebrepl.put_file.__name__, f"Error: Dosya açılamadı ; {remote_file}")
+                return False
+
+            sent = queued = 0
+            for chunk in chunks:
+                self.ws.queue(chunk)
+                sent += len(chunk)
+                queued += len(chunk)
+                if queued >= PUT_FLUSH_SIZE:
+                    await self.ws.aflush()
+                    queued = 0
+                    if progress:
+                        progress(sent, size)
+
+            await self.ws.aflush()
+            if progress:
+                progress(sent, size)
+
+            if sent != size:
+                # Cihaz eksik/fazla veriyle kaldı; bağlantı artık güvenilir değil
+                rapor.error(AsyncWebrepl.put_file.__name__, f"Error: {size} bytes expected, {sent} sent")
+                await self.disconnect()
+                raise ValueError(f"put_file: {size} bytes expected, {sent} sent")
+
+            if await self.read_resp() != 0:
+                rapor.error(AsyncWebrepl.put_file.__name__, f"Error: Yazılamadı ; {remote_file}")
+                return False
+
+            rapor.info(AsyncWebrepl.put_file.__name__, f"Put file {remote_file} ; OK")
+            return True
+
+    async def _put_packed(self, packed, remote_file, chunk_size, progress):
+        """Sıkıştırılmış veriyi cihazda geçici dosyaya yükleyip açar. Geçici dosyanın adı rastgeledir"""
+        tmp = f"{remote_file}.{os.urandom(4).hex()}"
+        if not await self.put_file(packed, tmp + ".z", chunk_size=chunk_size, progress=progress, compress=False):
+            # Yarım kalan geçici dosya cihazda kalmasın
+            await self.execute(f"import uos\ntry: uos.remove({tmp + '.z'!r})\nexcept OSError: pass")
+            return False
+
+        result = await self.execute(INFLATE_CODE.format(src=tmp + ".z", tmp=tmp, dst=remote_file, wbits=ZLIB_WBITS))
+        if result["err"]:
+            rapor.error(AsyncWebrepl.put_file.__name__, f"Error: Açılamadı ; {remote_file} ; {result['err']}")
+            return False
+
+        rapor.info(AsyncWebrepl.put_file.__name__, f"Put file {remote_file} ; compressed to {len(packed)} bytes")
+        return True
+
+    async def put_file_content(self, file_content, remote_file, chunk_size=PUT_CHUNK_SIZE, progress=None,
+                               compress=False):
+        if type(file_content) is str:
+            file_content = file_content.encode("utf-8")
+
+        ok = await self.put_file(file_content, remote_file, chunk_size=chunk_size, progress=progress,
+                                 compress=compress)
+        return "OK" if ok else ""
+
+    async def file_size(self, remote_file):
+        """Cihazdaki dosyanın boyutunu raw REPL ile öğrenir. Öğrenilemezse None döndürür"""
+        try:
+            result = await self.execute(f"import os;print(os.stat({remote_file!r})[6])")
+            return int(result["out"])
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            rapor.warning(AsyncWebrepl.file_size.__name__, f"File size unknown ; {remote_file} ; {e}")
+            return None
+
+    async def remote_digests(self, root="/", paths=None):
+        """
+        Cihazdaki dosyaların boyut ve sha256 özetlerini tek istekle alır. {yol: (boyut, özet)} döndürür.
+        paths verilirse sadece onlar sorulur; olmayan dosyalar None olur.
+        """
+        code = DIGEST_CODE.format(root=repr(root), paths=repr(None if paths is None else list(paths)))
+        result = await self.execute(code)
+        if result["err"]:
+            raise OSError(result["err"].strip().splitlines()[-1])
+        return {k: tuple(v) if v else None for k, v in ast.literal_eval(result["out"].strip()).items()}
+
+    async def _try_digests(self, paths):
+        """remote_digests gibidir, ama özetler alınamazsa None döndürür"""
+        try:
+            return await self.remote_digests(paths=paths)
+        except (OSError, ValueError, SyntaxError, asyncio.TimeoutError) as e:
+            rapor.warning(AsyncWebrepl.sync.__name__, f"Remote digests unavailable ; {e}")
+            return None
+
+    async def sync(self, files, manifest=None, progress=None, compress=False):
+        """
+        Dosyaları cihaza, sadece değişenleri göndererek yükler.
+            files: {cihazdaki yol: yerel dosya yolu (str) ya da içerik (bytes)}
+            manifest: Daha önce yüklenenlerin kaydı (json). Verilirse, kayıtta olup artık 'files'da olmayan
+                      dosyalar cihazdan silinir. Kullanıcının kendi dosyalarına dokunulmaz.
+            progress: progress(yol, gönderilen, toplam)
+            compress: Yüklemelerde kullanılır. AsyncWebrepl.put_file'a bakınız.
+        Özetler tek istekte karşılaştırılır, yüklenenler de yazıldıktan sonra tek istekte doğrulanır.
+        Cihaz özet çıkaramazsa (uhashlib.sha256 yok, bellek yetmedi) tüm dosyalar yüklenir ve put_file'ın cevabına
+        güvenilir; hiçbir dosya silinmez.
+        {"uploaded": [], "removed": [], "unchanged": [], "failed": []} döndürür.
+        """
+        local = {k: file_digest(v) for k, v in files.items()}
+
+        old = {}
+        if manifest and os.path.isfile(manifest):
+            with open(manifest) as f:
+                old = json.load(f)
+        stale = [k for k in old if k not in files]
+
+        remote = await self._try_digests(list(files) + stale)
+        verify = remote is not None
+        if not verify:
+            # Özetlerdeki sorun yazmayı engellemesin; hepsi değişmiş sayılır, cihazda olup olmadıkları bilinmeyen
+            # eski dosyalar silinmez
+            remote = {}
+
+        report = {"uploaded": [], "removed": [], "unchanged": [], "failed": []}
+        changed = [k for k in files if remote.get(k) != local[k]]
+        report["unchanged"] = [k for k in files if k not in changed]
+
+        # Eksik klasörler, üst klasörden başlayarak tek istekte oluşturulur
+        dirs = set()
+        for k in changed:
+            k = os.path.dirname(k)
+            while k not in ("", "/"):
+                dirs.add(k)
+                k = os.path.dirname(k)
+        dirs = sorted(dirs, key=len)
+        if dirs:
+            await self.execute(f"import uos\nfor _p in {dirs!r}:\n try:\n  uos.mkdir(_p)\n except OSError:\n  pass")
+
+        for k in changed:
+            src = files[k]
+            cb = (lambda sent, total, k=k: progress(k, sent, total)) if progress else None
+            if not await self.put_file(src, k, progress=cb, compress=compress):
+                report["failed"].append(k)
+
+        # Yazılanlar okunup doğrulanır
+        if changed:
+            written = await self._try_digests(changed) if verify else None
+            for k in changed:
+                if k in report["failed"]:
                     continue
+                if written is None or written.get(k) == local[k]:
+                    report["uploaded"].append(k)
                 else:
-                    r = self.ws.read(1024, text_ok=True, size_match=False)
-            except Exception as e:
-                # print(e)
-                # rapor.notice(Webrepl.listen.__name__, f"Finished")
-                # print(self.receives)
-                continue
+                    rapor.error(AsyncWebrepl.sync.__name__, f"Checksum mismatch ; {k}")
+                    report["failed"].append(k)
+
+        removed = [k for k in stale if remote.get(k)]
+        if removed:
+            await self.execute(f"import uos\nfor _p in {removed!r}:\n uos.remove(_p)")
+            report["removed"] = removed
+
+        if manifest:
+            done = set(report["uploaded"] + report["unchanged"])
+            entries = {k: local[k] for k in files if k in done}
+            if not verify:
+                # Silinemeyenler kayıtta kalır; sonraki senkronizasyonda tekrar denenir
+                entries.update((k, old[k]) for k in stale)
+            with open(manifest, "w") as f:
+                json.dump(entries, f, indent=1)
+
+        rapor.info(AsyncWebrepl.sync.__name__, f"Sync ; {len(report['uploaded'])} uploaded, "
+                                               f"{len(report['unchanged'])} unchanged, "
+                                               f"{len(report['removed'])} removed, {len(report['failed'])} failed")
+        return report
+
+    async def get_file(self, remote_file, dest=None, size=None, window=GET_WINDOW, encoding=None, progress=None,
+                       compress=False):
+        """
+        Dosyayı cihazdan indirir.
+            dest: None ise içerik bytearray'de toplanıp döndürülür. Yerel dosya yolu, dosya nesnesi ya da
+                  her parça ile çağrılacak fonksiyon verilirse, parçalar oraya yazılır ve toplam boyut döndürülür.
+            size: Dosyanın boyutu. Verilmezse ve window > 1 ise cihaza sorulur.
+            window: Cevabı beklenmeden gönderilen en fazla parça isteği.
+            encoding: Verilirse içerik str olarak döndürülür.
+            progress: progress(alınan, toplam) şeklinde çağrılır. Toplam bilinmiyorsa None'dır.
+            compress: True ise, cihaz destekliyorsa ve dosya sıkışıyorsa cihazda sıkıştırılarak indirilir.
+                      Cihaz, sıkıştırılmış kopyayı geçici olarak flash'a yazar; bu yüzden istenmedikçe kullanılmaz.
+        Hata olursa None döndürür.
+
+        Cihaz her \0 için bir parça, dosya bitince de boş parça gönderir. Bitişten sonra giden fazla \0,
+        sonraki isteğin başlığına karışacağı için, boyut bilinmeden birden fazla istek gönderilmez.
+        """
+        if isinstance(dest, str):
+            with open(dest, "wb") as f:
+                return await self.get_file(remote_file, f.write, size, window, encoding, progress, compress)
+
+        if size is None and (window > 1 or compress):
+            size = await self.file_size(remote_file)
+
+        content = None
+        if dest is None:
+            content = bytearray()
+            write = content.extend
+        else:
+            write = dest.write if hasattr(dest, "write") else dest
+
+        total = None
+        if compress and size is not None and COMPRESS_MIN <= size and \
+                not remote_file.lower().endswith(COMPRESSED_EXTENSIONS):
+            total = await self._get_packed(remote_file, write, size, window, progress)
+            if total is False:
+                return None
+
+        if total is None:
+            total = await self._get_plain(remote_file, write, size, window, progress)
+            if total is None:
+                return None
+
+        if content is None:
+            return total
+        return content.decode(encoding) if encoding else content
+
+    async def _get_packed(self, remote_file, write, size, window, progress):
+        """
+        Dosyayı cihazda geçici dosyaya sıkıştırıp indirir. Geçici dosyanın adı rastgeledir; cihazdaki dosyaları ezmez.
+        Cihaz sıkıştıramıyorsa ya da dosya sıkışmıyorsa None, indirme yarıda kalırsa False döndürür.
+        """
+        if await self.zlib_caps() < 2:
+            return None
+
+        tmp = f"{remote_file}.{os.urandom(4).hex()}.z"
+        result = await self.execute(DEFLATE_CODE.format(src=remote_file, dst=tmp, wbits=ZLIB_WBITS,
+                                                        sample=COMPRESS_SAMPLE, ratio=COMPRESS_RATIO))
+        if result["err"]:
+            rapor.warning(AsyncWebrepl.get_file.__name__, f"Not compressed ; {remote_file} ; {result['err']}")
+            return None
+
+        packed_size = int(result["out"])
+        if packed_size < 0:
+            # Baştaki kısım sıkışmadı; cihaz hiçbir şey yazmadı
+            return None
+        if size and packed_size > size * COMPRESS_RATIO:
+            await self.execute(f"import uos;uos.remove({tmp!r})")
+            return None
+
+        d = zlib.decompressobj()
+        total = 0
+
+        def inflate(data):
+            nonlocal total
+            data = d.decompress(data)
+            total += len(data)
+            write(data)
+            if progress:
+                progress(total, None)
+
+        packed = await self._get_plain(tmp, inflate, packed_size, window, None)
+        await self.execute(f"import uos;uos.remove({tmp!r})")
+        if packed is None:
+            return False
+
+        write(d.flush())
+        rapor.info(AsyncWebrepl.get_file.__name__, f"Get file {remote_file} ; compressed to {packed} bytes")
+        return total
+
+    async def _get_plain(self, remote_file, write, size, window, progress):
+        async with self.transfer:
+            self.binary.clear()
+
+            src_fname = remote_file.encode("utf-8")
+            rec = struct.pack(WEBREPL_REQ_S, b"WA", WEBREPL_GET_FILE, 0, 0, 0, len(src_fname), src_fname)
+
+            rapor.info(AsyncWebrepl.get_file.__name__, f"Get file {remote_file} ; {size} bytes")
+
+            await self.ws.awrite(rec)
+
+            if await self.read_resp() != 0:
+                rapor.error(AsyncWebrepl.get_file.__name__, f"Error: Okuma halindeyken başka işlem çağırıldı")
+                return None
+
+            await self.ws.awrite(b"\0")
+            inflight = 1
+            chunk = total = 0
+            while True:
+                (sz,) = struct.unpack("<H", await self.recv_binary(2))
+                inflight -= 1
+                if sz == 0:
+                    break
 
-            if r in (b'\r\n', b'>>> '):
-                rsp = resp.decode("utf-8")
-                self.receives.append(rsp)
-                rapor.info(Webrepl.listen.__name__, f"{rsp}")
-                resp = b''
-                continue
+                write(await self.recv_binary(sz))
+                total += sz
+                if progress:
+                    progress(total, size)
 
-            resp = resp + r
+                # İlk parçadan cihazın parça boyutu öğrenilir; kalan parçalar ve bitiş parçası kadar istek gönderilir
+                want = 1
+                if size is not None:
+                    chunk = max(chunk, sz)
+                    want = min(window, -(-max(size - total, 0) // chunk) + 1)
 
-        return 0
+                for _ in range(want - inflight):
+                    self.ws.queue(b"\0")
+                    inflight += 1
+                await self.ws.aflush()
 
-    def get_file_content(self, remote_file):
-        self.get_files.append(remote_file)
+            if inflight:
+                # Dosya, boyutu öğrenildikten sonra küçülmüş; fazla istekler cihaza başlık olarak gider
+                rapor.warning(AsyncWebrepl.get_file.__name__, f"{inflight} extra requests ; {remote_file} shrank")
 
-    def _get_file_content(self, remote_file):
+            if await self.read_resp() != 0:
+                rapor.error(AsyncWebrepl.get_file.__name__, f"Error: Yarıda kesildi")
+                return None
 
-        content = b''
-        src_fname = remote_file.encode("utf-8")
-        rec = struct.pack(WEBREPL_REQ_S, b"WA", WEBREPL_GET_FILE, 0, 0, 0, len(src_fname), src_fname)
+            rapor.info(AsyncWebrepl.get_file.__name__, f"Get file {remote_file} ; {total} bytes received")
+            return total
 
-        rapor.info(Webrepl._get_file_content.__name__, f"Get file content struct {rec} {len(rec)}")
 
-        self.ws.write(rec)
+class ReactorSelector(selectors.DefaultSelector):
+    """Uyanma sayısını ve boşta (select içinde) beklenen süreyi sayar"""
 
-        if self.read_resp() != 0:
-            rapor.error(Webrepl._get_file_content.__name__, f"Error: Okuma halindeyken başka işlem çağırıldı")
-            return ""
+    def __init__(self):
+        super().__init__()
+        self.wakeups = 0
+        self.idle = 0.0
 
-        cnt = 0
-        while True:
-            self.ws.write(b"\0")
-            (sz,) = struct.unpack("<H", self.ws.read(2))
-            if sz == 0:
-                break
-            while sz:
-                buf = self.ws.read(sz)
-                if not buf:
-                    raise OSError()
-                cnt += len(buf)
-                content += buf
-                sz -= len(buf)
-
-                rapor.info_grey(Webrepl.get_file_content.__name__, f"Received {cnt} bytes")
-
-        if self.read_resp() != 0:
-            rapor.error(Webrepl.get_file_content.__name__, f"Error: Yarıda kesildi")
+    def select(self, timeout=None):
+        start = time.perf_counter()
+        try:
+            return super().select(timeout)
+        finally:
+            self.idle += time.perf_counter() - start
+            self.wakeups += 1
+
+
+class Reactor:
+    """
+    Kendi thread'inde çalışan, selectors tabanlı event loop.
+    Sadece soket okunabilir olduğunda veya iş gönderildiğinde (loop'un self-pipe'ı ile) uyanır.
+    """
+
+    def __init__(self):
+        self.selector = ReactorSelector()
+        self.loop = asyncio.SelectorEventLoop(self.selector)
+        self.started = time.perf_counter()
+
+        # İşin gönderilmesi ile loop'ta başlaması arasında geçen süreler
+        self.latency_count = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+        self.thread = Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        """Coroutine'i loop'a gönderir. concurrent.futures.Future döndürür"""
+        return asyncio.run_coroutine_threadsafe(self._timed(coro, time.perf_counter()), self.loop)
+
+    def call(self, callback, *args):
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    async def _timed(self, coro, queued):
+        latency = time.perf_counter() - queued
+        self.latency_count += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        return await coro
+
+    def metrics(self):
+        """Loop thread'inin işlemci kullanımı ve kuyruk gecikmeleri"""
+        cpu = self.submit(_thread_time()).result()
+        uptime = time.perf_counter() - self.started
+        count = self.latency_count or 1
+        return {
+            "uptime": uptime,
+            "cpu": cpu,
+            "cpu_percent": cpu * 100 / uptime if uptime else 0,
+            "idle": self.selector.idle,
+            "wakeups": self.selector.wakeups,
+            "requests": self.latency_count,
+            "latency_mean": self.latency_total / count,
+            "latency_max": self.latency_max,
+        }
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+async def _thread_time():
+    return time.thread_time()
+
+
+class Webrepl:
+    """
+    AsyncWebrepl'in senkron arayüzü. İşlemler, kendi thread'inde çalışan event loop'a gönderilir.
+    Durum ve gelen cevaplar 'isconnect' ve 'receives' değişkenlerine yansıtılır.
+    """
+    isconnect = -1
+    '''
+    -1: Not connected, 
+    0: Connecting, 
+    1: Connected
+    '''
+
+    timeout = 5
+    receives = []
+    get_files = []
+
+    # Dirio sunucusunda metodların eşzamanlılığı. Yazılmayanlar sırayla çalışır.
+    # Bağlantıyı kuran/kapatan metodlar tek başına çalışır. Yüklemeler ve komutlar sırayla çalışır; yüklemeden
+    # sonra gönderilen komut, yeni dosyayı görür. İndirmeler cihazda bir şey değiştirmez, beklemeden çalışır;
+    # cihaza yazmaları, AsyncWebrepl'in 'transfer' kilidiyle komutlarla karışmaz.
+    _dr_policies = {
+        "start": "exclusive",
+        "connect": "exclusive",
+        "disconnect": "exclusive",
+        "login": "exclusive",
+        "get_file": "parallel",
+        "_get_file_content": "parallel",
+        "metrics": "parallel",
+    }
+
+    def __init__(self, host="", port=8266, password="", auto=True):
+        """"""
+        self.host = host
+        self.port = port
+        self.password = password
+        self.auto = auto
+
+        self.aio = None
+        self.reactor = None
+
+    def _run(self, coro, wait=True):
+        """Coroutine'i event loop'ta çalıştırır. wait=False ise concurrent.futures.Future döndürür"""
+        if not self.reactor:
+            self.reactor = Reactor()
+
+        future = self.reactor.submit(coro)
+        return future.result() if wait else future
+
+    def _client(self):
+        if not self.aio:
+            self.aio = AsyncWebrepl(self.host, self.port, self.password)
+            self.aio.timeout = self.timeout
+            self.aio.on_state = self._on_state
+        return self.aio
+
+    def _on_state(self, state):
+        self.isconnect = state
+
+    def _receive(self, line):
+        receives = self.receives
+        receives.append(line)
+        if len(receives) > RECEIVES_MAX:
+            del receives[:len(receives) - RECEIVES_MAX // 2]
+
+    def _on_line(self, line):
+        self._receive(line)
+        rapor.info(Webrepl.listen.__name__, f"{line}")
+
+    def _on_file(self, remote_file, future):
+        try:
+            rsp = future.result()
+        except Exception as e:
+            rapor.error(Webrepl.get_file_content.__name__, f"Error: {e}")
+            rsp = ""
+
+        if remote_file in self.get_files:
+            self.get_files.remove(remote_file)
+        self._receive(f"{WR_KEY._FILE_READ} {remote_file}\n{rsp}")
+
+    def start(self):
+        # Connecting
+        self.isconnect = 0
+        if self.auto:
+            self.connect()
+            self.login()
+
+    def connect(self, host=None, port=None):
+        if host:
+            self.host = host
+        if port:
+            self.port = port
+
+        self._run(self._client().connect(self.host, self.port))
+
+    def disconnect(self):
+        if self.aio and self.reactor:
+            self._run(self.aio.disconnect())
+            self.reactor.stop()
+        self.aio = None
+        self.reactor = None
+        self.isconnect = -1
+
+    def login(self, passwd=""):
+        if passwd:
+            self.password = passwd
+
+        self._run(self._client().login(self.password))
+
+    def send(self, cmd):
+        """Sadece gönderir. Okuma yapmaz"""
+        if self.isconnect < 0:
             return ""
 
-        return content.decode("utf-8")
+        self._run(self.aio.send(cmd))
 
-    def read_resp(self):
-        data = self.ws.read(4)
-        sig, code = struct.unpack("<2sH", data)
-        assert sig == b"WB"
-        return code
+    def put_file(self, src, remote_file, size=None, chunk_size=PUT_CHUNK_SIZE, progress=None, compress=False):
+        """
+        Yerel dosyayı ya da bellekteki veriyi diske yazmadan cihaza yükler ve bekler. AsyncWebrepl.put_file'a bakınız.
+        'progress', dinleyici thread'inde çağrılır.
+        """
+        return self._run(self.aio.put_file(src, remote_file, size, chunk_size, progress, compress))
+
+    def put_file_content(self, file_content, remote_file, chunk_size=PUT_CHUNK_SIZE, progress=None, compress=False):
+        return self._run(self.aio.put_file_content(file_content, remote_file, chunk_size, progress, compress))
+
+    def listen(self, thread=False):
+        """Gelen satırlar bundan sonra 'receives' listesine eklenir"""
+        if self.aio and self.reactor:
+            self.reactor.call(self.aio.set_listener, self._on_line)
+
+    def get_file_content(self, remote_file):
+        """Dosya okunduğunda içeriği 'receives' listesine eklenir. Beklemez"""
+        self.get_files.append(remote_file)
+        future = self._run(self.aio.get_file(remote_file, encoding="utf-8"), wait=False)
+        future.add_done_callback(lambda f: self._on_file(remote_file, f))
+
+    def download(self, remote_file, local_file):
+        """
+        Dosyayı, içeriğine dokunmadan (binary) yerel dosyaya indirir. Beklemez.
+        Bitince 'receives'e "<FSV: remote_file\nlocal_file" eklenir. Hata olursa local_file boştur.
+        """
+        folder = os.path.dirname(local_file)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        future = self._run(self.aio.get_file(remote_file, local_file), wait=False)
+        future.add_done_callback(lambda f: self._on_download(remote_file, local_file, f))
+
+    def _on_download(self, remote_file, local_file, future):
+        try:
+            if future.result() is None:
+                local_file = ""
+        except Exception as e:
+            rapor.error(Webrepl.download.__name__, f"Error: {e}")
+            local_file = ""
+
+        self._receive(f"{WR_KEY._FILE_SAVE} {remote_file}\n{local_file}")
+
+    def sync(self, local_dir, remote_dir="/"):
+        """
+        Yerel proje klasörünü cihazdaki 'remote_dir'e, sadece değişen dosyaları göndererek yükler. Beklemez.
+        Yüklenenlerin kaydı klasördeki SYNC_MANIFEST dosyasında tutulur. Sonuç 'receives'e eklenir.
+        """
+        files = project_files(local_dir, remote_dir)
+        manifest = os.path.join(local_dir, SYNC_MANIFEST)
+        future = self._run(self.aio.sync(files, manifest), wait=False)
+        future.add_done_callback(self._on_sync)
+
+    def sync_files(self, files):
+        """{cihazdaki yol: içerik} dosyalarından, cihazdakinden farklı olanları yükler ve bekler"""
+        files = {k: v.encode("utf-8") if type(v) is str else v for k, v in files.items()}
+        return self._run(self.aio.sync(files))
+
+    def _on_sync(self, future):
+        try:
+            report = future.result()
+        except Exception as e:
+            rapor.error(Webrepl.sync.__name__, f"Error: {e}")
+            self._receive(f"{WR_KEY._SYNC}failed ; {e}")
+            return
+
+        self._receive(f"{WR_KEY._SYNC}{len(report['uploaded'])} uploaded, "
+                      f"{len(report['unchanged'])} unchanged, "
+                      f"{len(report['removed'])} removed, {len(report['failed'])} failed")
+        for k in report["failed"]:
+            self._receive(f"{WR_KEY._SYNC}failed ; {k}")
+
+    def _get_file_content(self, remote_file):
+        return self._run(self.aio.get_file(remote_file, encoding="utf-8"))
+
+    def get_file(self, remote_file, dest=None, size=None, window=GET_WINDOW, encoding=None, progress=None,
+                 compress=False):
+        """Dosyayı indirir ve bekler. AsyncWebrepl.get_file'a bakınız. 'progress', dinleyici thread'inde çağrılır"""
+        return self._run(self.aio.get_file(remote_file, dest, size, window, encoding, progress, compress))
 
     def send_req(self, op, sz=0, fname=b""):
-        rec = struct.pack(WEBREPL_REQ_S, b"WA", op, 0, 0, sz, len(fname), fname)
+        self._run(self.aio.send_req(op, sz, fname))
+
+    def submit(self, code):
+        """Kodu raw REPL'de çalıştırır. Sonucu verecek concurrent.futures.Future döndürür"""
+        return self._run(self.aio.execute(code), wait=False)
+
+    def execute(self, code, timeout=None):
+        """Kodu raw REPL'de çalıştırır ve bekler. {"out": stdout, "err": stderr, "time": saniye} döndürür"""
+        return self._run(self.aio.execute(code, timeout))
+
+    def send_raw(self, codes):
+        """
+        Kodları raw REPL'de, cevap beklemeden arka arkaya çalıştırır.
+        Her kodun çıktısı, yankısız ve başka çıktılarla karışmadan 'receives'e eklenir.
+        """
+        if self.isconnect < 1:
+            return
+        for code in ([codes] if type(codes) is str else codes):
+            self._run(self.aio.submit(code, self._on_exec))
+
+    def paste(self, code):
+        """
+        Kodu (örneğin bir Blender text bloğunun tamamını) raw-paste ile, flash'a yazmadan çalıştırır. Beklemez.
+        Çıktısı 'receives'e eklenir.
+        """
+        if self.isconnect < 1:
+            return
+        self._run(self.aio.paste(code, self._on_exec))
+
+    def run_file(self, local_file):
+        """Yerel dosyayı, cihaza yüklemeden çalıştırır"""
+        with open(local_file, "rb") as f:
+            self.paste(f.read())
+
+    def _on_exec(self, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            rapor.error(Webrepl.send_raw.__name__, f"Error: {e}")
+            return
 
-        rapor.info_grey(Webrepl.send_req.__name__, f"Send request {rec} {len(rec)}")
+        for line in (result["out"] + result["err"]).replace("\r\n", "\n").split("\n"):
+            if line:
+                self._receive(line)
 
-        self.ws.write(rec)
+    def metrics(self):
+        """Dinleyici thread'inin işlemci kullanımı ve istek kuyruğu gecikmeleri"""
+        return self.reactor.metrics() if self.reactor else {}
 
     def baudrate(self):
         pass
@@ -405,6 +1751,12 @@ class WR_KEY:
     _FIRMWARE_CHECK = "FWC: "
     _RELOAD_DIR_ = "RDR: "
     _FILE_WRITE = "FWR: "
+    _FILE_PUT = "FPT: "
+    _FILE_GET = "FGT: "
+    _FILE_SAVE = "<FSV: "
+    _SYNC = "SYN: "
+    _SEND = "SND: "
+    _PASTE = "PST: "
 
 
 class WR_CMD:
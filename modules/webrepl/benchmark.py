@@ -0,0 +1,946 @@
+#!/usr/bin/env python
+"""
+Webrepl ölçümleri. Cihaz gerekmez; yerel soket çifti üzerinde çalışır.
+
+    python modules/webrepl/benchmark.py
+"""
+import io
+import os
+import sys
+import time
+import zlib
+import random
+import struct
+import socket
+import shutil
+import asyncio
+import tempfile
+import builtins
+from queue import Queue
+from threading import Thread
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webrepl import websocket, Webrepl, AsyncWebrepl, WEBREPL_REQ_S, WEBREPL_PUT_FILE, WEBREPL_GET_FILE
+from webrepl import project_files, SYNC_MANIFEST
+
+
+def server_frame(payload, istext=False):
+    """Sunucu tarafından gönderilen (maskesiz) frame"""
+    fl = (0x82, 0x81)[istext]
+    ll = len(payload)
+    if ll < 126:
+        hdr = struct.pack(">BB", fl, ll)
+    elif ll < 65536:
+        hdr = struct.pack(">BBH", fl, 126, ll)
+    else:
+        hdr = struct.pack(">BBQ", fl, 127, ll)
+    return hdr + payload
+
+
+class StandInFile(io.BytesIO):
+    """Kapatılınca içeriğini StandIn.files'a yazan dosya"""
+
+    def __init__(self, files, key, stats=None):
+        super().__init__()
+        self.files = files
+        self.key = key
+        self.stats = stats
+
+    def close(self):
+        if not self.closed:
+            self.files[self.key] = self.getvalue()
+            # Flash'a yazılan toplam bayt
+            if self.stats is not None:
+                self.stats["written"] += len(self.files[self.key])
+        super().close()
+
+
+class StandInDeflate:
+    """MicroPython'daki deflate modülünün (ve uzlib.DecompIO'nun) taklidi"""
+    AUTO, RAW, ZLIB, GZIP = 0, 1, 2, 3
+
+    class DeflateIO:
+        def __init__(self, stream, format=0, wbits=0, close=False):
+            self.stream = stream
+            self.pending = b""
+            self.d = zlib.decompressobj()
+            self.c = zlib.compressobj(9, zlib.DEFLATED, wbits or 15)
+
+        def readinto(self, buf):
+            while not self.pending:
+                data = self.stream.read(512)
+                if not data:
+                    self.pending = self.d.flush()
+                    break
+                self.pending = self.d.decompress(data)
+            n = min(len(buf), len(self.pending))
+            buf[:n] = self.pending[:n]
+            self.pending = self.pending[n:]
+            return n
+
+        def write(self, data):
+            self.stream.write(self.c.compress(bytes(data)))
+            return len(data)
+
+        def close(self):
+            self.stream.write(self.c.flush())
+
+    DecompIO = DeflateIO
+
+
+class StandInOs:
+    """Cihazdaki os modülünün ve open'ın, StandIn.files üzerinde çalışan taklidi. Yollar '/' olmadan tutulur"""
+
+    def __init__(self, files):
+        self.files = files
+        self.dirs = set()
+        self.stats = {"written": 0}
+
+    def stat(self, path):
+        path = path.strip("/")
+        if path in self.dirs:
+            return 0x4000, 0, 0, 0, 0, 0, 0, 0, 0, 0
+        if path not in self.files:
+            raise OSError(2, "ENOENT")
+        return 0x8000, 0, 0, 0, 0, 0, len(self.files[path]), 0, 0, 0
+
+    def ilistdir(self, path="/"):
+        prefix = path.strip("/")
+        prefix = prefix + "/" if prefix else ""
+        seen = set()
+        for key in sorted(self.files) + sorted(self.dirs):
+            if not key.startswith(prefix):
+                continue
+            name, sep, _ = key[len(prefix):].partition("/")
+            if name and name not in seen:
+                seen.add(name)
+                yield name, 0x4000 if sep or key in self.dirs else 0x8000, 0
+
+    def listdir(self, path="/"):
+        return [i[0] for i in self.ilistdir(path)]
+
+    def mkdir(self, path):
+        path = path.strip("/")
+        if path in self.dirs:
+            raise OSError(17, "EEXIST")
+        self.dirs.add(path)
+
+    def remove(self, path):
+        path = path.strip("/")
+        if path not in self.files:
+            raise OSError(2, "ENOENT")
+        del self.files[path]
+
+    def rename(self, old, new):
+        old, new = old.strip("/"), new.strip("/")
+        if old not in self.files:
+            raise OSError(2, "ENOENT")
+        self.files[new] = self.files.pop(old)
+
+    def open(self, path, mode="r"):
+        path = path.strip("/")
+        if "w" in mode:
+            f = StandInFile(self.files, path, self.stats)
+            return f if "b" in mode else io.TextIOWrapper(f, "utf-8")
+        if path not in self.files:
+            raise OSError(2, "ENOENT")
+        if "b" in mode:
+            return io.BytesIO(self.files[path])
+        return io.StringIO(self.files[path].decode("utf-8"))
+
+
+class StandIn:
+    """
+    Yerel WebREPL taklidi. Tek istemci kabul eder.
+    Satır komutlarını yankılar ve WA/WB dosya protokolüne cevap verir.
+    """
+
+    def __init__(self, password="123456", latency=0, bandwidth=0, compression=2):
+        self.password = password
+        self.files = {}
+
+        # Cihazdan gelen verinin ağda geçirdiği süre. Giden veriler sırayla, bu kadar gecikmeyle gönderilir
+        self.latency = latency
+        self.outbox = Queue()
+        # Bağlantı hızı (bayt/s), iki yönde de. 0 ise sınırsız
+        self.bandwidth = bandwidth
+        self.rx_clock = self.tx_clock = 0
+        if latency or bandwidth:
+            Thread(target=self.deliver, daemon=True).start()
+
+        # 0 zlib yok, 1 sadece uzlib (açabilir), 2 deflate (sıkıştırabilir de)
+        self.compression = compression
+
+        self.ls = socket.socket()
+        self.ls.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.ls.bind(("127.0.0.1", 0))
+        self.ls.listen(1)
+        self.port = self.ls.getsockname()[1]
+        self.conn = None
+        self.stream = bytearray()
+
+        self.raw = False
+        self.code = bytearray()
+        # Çalıştırılan kodlar 'import os' ile cihazdaki dosyaları görsün
+        self.os = StandInOs(self.files)
+        self.namespace = {"__builtins__": dict(vars(builtins), __import__=self.importer, open=self.os.open)}
+
+        # Raw-paste'te gelen kod ve akış kontrolü pencere boyutu. 0 ise raw-paste desteklenmez
+        self.paste = None
+        self.window = 128
+        # Cihazda çalıştırılan kodların toplam süresi
+        self.exec_time = 0
+
+        self.thread = Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def importer(self, name, *args, **kwargs):
+        if name in ("os", "uos"):
+            return self.os
+        if name in ("deflate", "uzlib"):
+            if self.compression < (2 if name == "deflate" else 1):
+                raise ImportError(name)
+            return StandInDeflate
+        name = {"uhashlib": "hashlib", "ubinascii": "binascii"}.get(name, name)
+        return builtins.__import__(name, *args, **kwargs)
+
+    def close(self):
+        for s in (self.conn, self.ls):
+            if s:
+                try:
+                    s.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                s.close()
+
+    def throttle(self, clock, size):
+        """Bağlantı hızını taklit eder. Verinin bağlantıdan çıkacağı zamanı döndürür"""
+        now = time.perf_counter()
+        clock = max(clock, now) + size / self.bandwidth
+        if clock - now > .001:
+            time.sleep(clock - now)
+        return clock
+
+    def recvexactly(self, sz):
+        res = bytearray()
+        while len(res) < sz:
+            data = self.conn.recv(sz - len(res))
+            if not data:
+                raise ConnectionError
+            res += data
+        if self.bandwidth:
+            self.rx_clock = self.throttle(self.rx_clock, sz)
+        return bytes(res)
+
+    def recv_frame(self):
+        fl, sz = struct.unpack(">BB", self.recvexactly(2))
+        masked = sz & 0x80
+        sz &= 0x7f
+        if sz == 126:
+            (sz,) = struct.unpack(">H", self.recvexactly(2))
+        elif sz == 127:
+            (sz,) = struct.unpack(">Q", self.recvexactly(8))
+        mask = self.recvexactly(4) if masked else None
+        data = self.recvexactly(sz)
+        if mask:
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+        return fl, data
+
+    def send(self, data, istext=False):
+        if self.latency or self.bandwidth:
+            self.outbox.put((time.perf_counter() + self.latency, server_frame(data, istext)))
+        else:
+            self.conn.sendall(server_frame(data, istext))
+
+    def deliver(self):
+        try:
+            while True:
+                due, frame = self.outbox.get()
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                if self.bandwidth:
+                    self.tx_clock = self.throttle(self.tx_clock, len(frame))
+                self.conn.sendall(frame)
+        except OSError:
+            pass
+
+    def recv_binary(self, sz):
+        """Binary frameleri akış gibi okur"""
+        while len(self.stream) < sz:
+            fl, data = self.recv_frame()
+            if fl == 0x82:
+                self.stream += data
+        data = bytes(self.stream[:sz])
+        del self.stream[:sz]
+        return data
+
+    def serve(self):
+        try:
+            self.conn, _ = self.ls.accept()
+            self.conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.handshake()
+            while True:
+                fl, data = self.recv_frame()
+                if fl == 0x81:
+                    self.on_text(data)
+                elif fl == 0x82:
+                    self.stream += data
+                    self.on_binary()
+        except (OSError, struct.error):
+            pass
+
+    def handshake(self):
+        req = b""
+        while not req.endswith(b"\r\n\r\n"):
+            req += self.conn.recv(1)
+        self.conn.sendall(b"HTTP/1.1 101 Switching Protocols\r\n\r\n")
+        self.send(b"Password: ", istext=True)
+        while True:
+            fl, data = self.recv_frame()
+            if data.endswith(b"\r"):
+                break
+        if data[:-1].decode() == self.password:
+            self.send(b"\r\nWebREPL connected\r\n>>> ", istext=True)
+        else:
+            self.send(b"\r\nAccess denied\r\n", istext=True)
+
+    def on_text(self, data):
+        if self.raw or data.startswith(b"\x01"):
+            self.on_raw(data)
+            return
+
+        # Cihaz gibi; satırı yankıla, satır sonu ve istemi ayrı frameler olarak gönder
+        self.send(data.rstrip(b"\r\n"), istext=True)
+        self.send(b"\r\n", istext=True)
+        self.send(b">>> ", istext=True)
+
+    def on_raw(self, data):
+        """Raw REPL; Ctrl-D gelince birikmiş kodu çalıştırır. Raw-paste'i de destekler"""
+        for c in data:
+            if self.paste is not None:
+                if c == 0x04:
+                    self.send(b"\x04", istext=True)
+                    out, err = self.execute(self.paste.decode())
+                    self.paste = None
+                    self.send(out + b"\x04" + err + b"\x04>", istext=True)
+                    continue
+                self.paste.append(c)
+                if len(self.paste) % self.window == 0:
+                    self.send(b"\x01", istext=True)
+            elif c == 0x01 and self.code.endswith(b"\x05A"):
+                self.code = bytearray()
+                if not self.window:
+                    # Raw-paste desteklemeyen cihaz
+                    self.send(b"R\x00", istext=True)
+                    continue
+                self.paste = bytearray()
+                self.send(b"R\x01" + struct.pack("<H", self.window), istext=True)
+            elif c == 0x01:
+                self.raw = True
+                self.code = bytearray()
+                self.send(b"raw REPL; CTRL-B to exit\r\n>", istext=True)
+            elif c == 0x02:
+                self.raw = False
+                self.send(b"\r\nMicroPython stand-in\r\n", istext=True)
+                self.send(b">>> ", istext=True)
+            elif c == 0x04:
+                out, err = self.execute(self.code.decode())
+                self.code = bytearray()
+                self.send(b"OK" + out + b"\x04" + err + b"\x04>", istext=True)
+            elif self.raw:
+                self.code.append(c)
+
+    def execute(self, code):
+        # Yüklenmiş modülleri 'import' ile çalıştırabilmek için
+        name = code.strip()[len("import "):]
+        if code.strip().startswith("import ") and f"{name}.py" in self.files:
+            code = self.files[f"{name}.py"].decode()
+
+        out = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with redirect_stdout(out):
+                exec(code, self.namespace)
+            err = ""
+        except Exception as e:
+            err = f"Traceback (most recent call last):\r\n{type(e).__name__}: {e}\r\n"
+        self.exec_time += time.perf_counter() - start
+        return out.getvalue().replace("\n", "\r\n").encode(), err.encode()
+
+    def on_binary(self):
+        size = struct.calcsize(WEBREPL_REQ_S)
+        if len(self.stream) < size:
+            return
+        sig, op, _, _, sz, fnlen, fname = struct.unpack(WEBREPL_REQ_S, self.recv_binary(size))
+        assert sig == b"WA"
+        fname = fname[:fnlen].decode().strip("/")
+
+        if op == WEBREPL_PUT_FILE:
+            self.send(b"WB\0\0")
+            self.files[fname] = self.recv_binary(sz)
+            self.os.stats["written"] += sz
+            self.send(b"WB\0\0")
+
+        elif op == WEBREPL_GET_FILE:
+            content = self.files.get(fname)
+            if content is None:
+                self.send(b"WB\1\0")
+                return
+            # Cihaz gibi 256 baytlık parçalar
+            self.send(b"WB\0\0")
+            for i in range(0, len(content), 256):
+                self.recv_binary(1)
+                chunk = content[i:i + 256]
+                self.send(struct.pack("<H", len(chunk)) + chunk)
+            self.recv_binary(1)
+            self.send(b"\0\0WB\0\0")
+
+
+def _sender(sock, data, count):
+    try:
+        for _ in range(count):
+            sock.sendall(data)
+    except OSError:
+        pass
+
+
+def bench_recv(frame_size, read_size, total=32 * 1024 * 1024):
+    """'frame_size' boyutundaki frameleri, 'read_size' parçalar halinde okur. MB/s döndürür"""
+    a, b = socket.socketpair()
+    count = max(1, total // frame_size)
+    data = server_frame(os.urandom(frame_size))
+
+    thread = Thread(target=_sender, args=(a, data, count), daemon=True)
+    thread.start()
+
+    # Eski okuyucu 64-bit uzunlukları çözemediği için takılmasın
+    b.settimeout(5)
+    ws = websocket(b)
+    need = count * frame_size
+    got = 0
+    start = time.perf_counter()
+    try:
+        while got < need:
+            got += len(ws.read(read_size, size_match=False))
+    finally:
+        elapsed = time.perf_counter() - start
+        a.close()
+        b.close()
+
+    return got / elapsed / 1e6
+
+
+async def _roundtrip(wr, cmd="1+1"):
+    """Komutu gönderir ve istem (>>>) gelene kadar bekler"""
+    await wr.send(cmd)
+    async for line in wr:
+        if line == "":
+            break
+
+
+async def _command_rtt(stand_ins, count):
+    boards = [AsyncWebrepl(host="127.0.0.1", port=i.port, password=i.password) for i in stand_ins]
+    for wr in boards:
+        await wr.connect()
+        await wr.login()
+        assert wr.isconnect == 1
+        # login'in gönderdiği 'import os' cevabı
+        async for line in wr:
+            if line == "":
+                break
+
+    async def board(wr):
+        for _ in range(count):
+            await _roundtrip(wr)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[board(wr) for wr in boards])
+    elapsed = time.perf_counter() - start
+
+    for wr in boards:
+        await wr.disconnect()
+    return elapsed
+
+
+def bench_command_rtt(boards=1, count=200):
+    """
+    'boards' kadar cihazla tek event loop üzerinden aynı anda konuşur.
+    Komut başına ortalama süreyi (ms) ve toplam komut/sn döndürür
+    """
+    stand_ins = [StandIn() for _ in range(boards)]
+    loop = asyncio.new_event_loop()
+    try:
+        elapsed = loop.run_until_complete(_command_rtt(stand_ins, count))
+    finally:
+        loop.close()
+        for i in stand_ins:
+            i.close()
+    return elapsed / count * 1000, boards * count / elapsed
+
+
+async def _raw_exec(stand_in, count):
+    wr = AsyncWebrepl(host="127.0.0.1", port=stand_in.port, password=stand_in.password)
+    await wr.connect()
+    await wr.login()
+    assert wr.isconnect == 1
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await _roundtrip(wr, "print(1+1)")
+    friendly = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(count):
+        assert (await wr.execute("print(1+1)"))["out"] == "2\r\n"
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    futures = [await wr.submit(f"print({i})") for i in range(count)]
+    results = await asyncio.gather(*futures)
+    pipelined = time.perf_counter() - start
+    assert [r["out"] for r in results] == [f"{i}\r\n" for i in range(count)]
+
+    await wr.disconnect()
+    return friendly, sequential, pipelined
+
+
+def bench_raw_exec(count=500):
+    """Normal REPL, raw REPL (sırayla) ve raw REPL (arka arkaya) ile komut başına süre. ms döndürür"""
+    stand_in = StandIn()
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(_raw_exec(stand_in, count))
+    finally:
+        loop.close()
+        stand_in.close()
+    return [i / count * 1000 for i in result]
+
+
+def large_script(size):
+    """Başta ve sonda çıktı veren, 'size' büyüklüğünde script"""
+    lines = ["print('start')"]
+    n = 0
+    while sum(len(i) + 1 for i in lines) < size:
+        lines.append(f"value_{n} = {n} * 2  # padding padding padding")
+        n += 1
+    lines.append("print('end')")
+    return "\n".join(lines)
+
+
+async def _run_script(stand_in, script, count):
+    wr = AsyncWebrepl(host="127.0.0.1", port=stand_in.port, password=stand_in.password)
+    await wr.connect()
+    await wr.login()
+    assert wr.isconnect == 1
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await wr.put_file_content(script, "big.py")
+        result = await wr.execute("import big")
+        assert result["out"] == "start\r\nend\r\n", result
+    upload = (time.perf_counter() - start) / count
+
+    start = time.perf_counter()
+    for _ in range(count):
+        result = await (await wr.paste(script))
+        assert result["out"] == "start\r\nend\r\n", result
+    paste = (time.perf_counter() - start) / count
+
+    await wr.disconnect()
+    return upload, paste
+
+
+def bench_run_script(size=64 * 1024, count=20, window=128):
+    """Script'i yükleyip import etmek ile raw-paste ile çalıştırmak. Çıktıya kadar geçen süre (ms) ve MB/s"""
+    stand_in = StandIn()
+    stand_in.window = window
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(_run_script(stand_in, large_script(size), count))
+    finally:
+        loop.close()
+        stand_in.close()
+    return [(i * 1000, size / i / 1e6) for i in result]
+
+
+async def _put(stand_in, content, count, **kwargs):
+    wr = AsyncWebrepl(host="127.0.0.1", port=stand_in.port, password=stand_in.password)
+    await wr.connect()
+    await wr.login()
+    assert wr.isconnect == 1
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await wr.put_file_content(content, "upload.bin", **kwargs)
+    elapsed = time.perf_counter() - start
+
+    await wr.disconnect()
+    assert stand_in.files["upload.bin"] == (content.encode() if type(content) is str else content)
+    return elapsed
+
+
+def bench_put(size=1024 * 1024, count=10, **kwargs):
+    """Bellekteki içeriği cihaza yükler. MB/s döndürür"""
+    stand_in = StandIn()
+    content = "x" * size
+    loop = asyncio.new_event_loop()
+    try:
+        elapsed = loop.run_until_complete(_put(stand_in, content, count, **kwargs))
+    finally:
+        loop.close()
+        stand_in.close()
+    return size * count / elapsed / 1e6
+
+
+async def _get(stand_in, count, kwargs):
+    wr = AsyncWebrepl(host="127.0.0.1", port=stand_in.port, password=stand_in.password)
+    await wr.connect()
+    await wr.login()
+    assert wr.isconnect == 1
+
+    start = time.perf_counter()
+    for _ in range(count):
+        content = await wr.get_file("download.bin", **kwargs)
+    elapsed = time.perf_counter() - start
+
+    await wr.disconnect()
+    assert (content.encode() if type(content) is str else content) == stand_in.files["download.bin"]
+    return elapsed
+
+
+def bench_get(size=256 * 1024, count=3, latency=0.0, **kwargs):
+    """
+    Cihazdan dosya indirir. 'latency', cihazdan gelen verinin gecikmesidir. MB/s döndürür.
+    Pencerenin etkisi ölçülür; sıkıştırma kapalıdır. Bkz. bench_get_compressed
+    """
+    stand_in = StandIn(latency=latency)
+    stand_in.files["download.bin"] = b"x" * size
+    loop = asyncio.new_event_loop()
+    try:
+        elapsed = loop.run_until_complete(_get(stand_in, count, dict(kwargs, compress=False)))
+    finally:
+        loop.close()
+        stand_in.close()
+    return size * count / elapsed / 1e6
+
+
+def bench_binary(size=1024 * 1024, count=3):
+    """
+    Binary dosyanın yerel dosyadan cihaza ve cihazdan yerel dosyaya taşınması, Webrepl üzerinden.
+    Eski yol (bytes literal'ini komut içinde göndermek) ile karşılaştırır. MB/s döndürür
+    """
+    stand_in = StandIn()
+    data = os.urandom(size)
+    folder = tempfile.mkdtemp()
+    local, back = os.path.join(folder, "asset.bin"), os.path.join(folder, "stage", "asset.bin")
+    with open(local, "wb") as f:
+        f.write(data)
+
+    wr = Webrepl(host="127.0.0.1", port=stand_in.port, password=stand_in.password)
+    wr.connect()
+    wr.login()
+    wr.listen()
+    try:
+        start = time.perf_counter()
+        for _ in range(count):
+            wr.execute(f"_f=open('asset.bin', 'wb');_f.write({data!r});_f.close();del _f")
+        literal = size * count / (time.perf_counter() - start) / 1e6
+
+        start = time.perf_counter()
+        for _ in range(count):
+            assert wr.put_file(local, "asset.bin")
+        upload = size * count / (time.perf_counter() - start) / 1e6
+        assert stand_in.files["asset.bin"] == data
+
+        start = time.perf_counter()
+        for _ in range(count):
+            wr.receives.clear()
+            wr.download("asset.bin", back)
+            _wait(lambda: wr.receives, 10)
+        download = size * count / (time.perf_counter() - start) / 1e6
+        with open(back, "rb") as f:
+            assert f.read() == data
+    finally:
+        wr.disconnect()
+        stand_in.close()
+        shutil.rmtree(folder)
+    return literal, upload, download
+
+
+async def _sync(stand_in, folder):
+    wr = AsyncWebrepl(host="127.0.0.1", port=stand_in.port, password=stand_in.password)
+    await wr.connect()
+    await wr.login()
+    assert wr.isconnect == 1
+
+    files = project_files(folder)
+    manifest = os.path.join(folder, SYNC_MANIFEST)
+    result = {}
+
+    start = time.perf_counter()
+    for remote, local in files.items():
+        assert await wr.put_file(local, remote)
+    result["full upload"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = await wr.sync(files, manifest)
+    result["sync, device already up to date"] = time.perf_counter() - start
+    assert not report["uploaded"], report
+
+    with open(os.path.join(folder, "main.py"), "ab") as f:
+        f.write(b"# changed\n")
+    start = time.perf_counter()
+    report = await wr.sync(files, manifest)
+    result["sync, one file changed"] = time.perf_counter() - start
+    assert report["uploaded"] == ["/main.py"], report
+
+    await wr.disconnect()
+    return result
+
+
+def bench_sync(count=40, size=4096, latency=0.005):
+    """'count' dosyalık projeyi tamamen ve sadece değişenleri göndererek yükler. Süreler (ms)"""
+    stand_in = StandIn(latency=latency)
+    folder = tempfile.mkdtemp()
+    for i in range(count):
+        name = "main.py" if i == 0 else f"lib/module_{i}.py"
+        os.makedirs(os.path.dirname(os.path.join(folder, name)), exist_ok=True)
+        with open(os.path.join(folder, name), "wb") as f:
+            f.write(os.urandom(size))
+
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(_sync(stand_in, folder))
+    finally:
+        loop.close()
+        stand_in.close()
+        shutil.rmtree(folder)
+    return {k: v * 1000 for k, v in result.items()}
+
+
+def sample_payloads(size=128 * 1024):
+    """Python kaynak kodu (bu depodaki dosyalar), metin log ve rastgele (sıkışmayan) veri"""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sources = b""
+    for folder, _, names in sorted(os.walk(root)):
+        for name in sorted(names):
+            if name.endswith(".py") and len(sources) < size:
+                with open(os.path.join(folder, name), "rb") as f:
+                    sources += f.read()
+
+    rnd = random.Random(0)
+    log = []
+    while sum(len(i) for i in log) < size:
+        log.append(f"2020-11-{rnd.randint(1, 30):02d} {rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d} "
+                   f"{rnd.choice(['INFO', 'INFO', 'WARN', 'DEBUG'])} sensor {rnd.randint(0, 7)} "
+                   f"value={rnd.random() * 100:.2f} rssi={-rnd.randint(40, 90)}\n")
+
+    return {
+        "python sources": sources[:size],
+        "text log": "".join(log).encode()[:size],
+        "random bytes": os.urandom(size),
+    }
+
+
+async def _compressed(stand_in, payloads):
+    wr = AsyncWebrepl(host="127.0.0.1", port=stand_in.port, password=stand_in.password)
+    await wr.connect()
+    await wr.login()
+    assert wr.isconnect == 1
+
+    result = {}
+    for name, data in payloads.items():
+        for compress in (False, None):
+            stats = stand_in.os.stats
+            written = stats["written"]
+            start = time.perf_counter()
+            assert await wr.put_file(data, "payload.bin", compress=compress)
+            put = time.perf_counter() - start
+            assert stand_in.files["payload.bin"] == data
+
+            # Geçici dosya kalmamalı
+            assert list(stand_in.files) == ["payload.bin"]
+            result[name, compress] = (len(data) / put / 1e3, stats["written"] - written)
+            del stand_in.files["payload.bin"]
+
+    await wr.disconnect()
+    return result
+
+
+def bench_compressed(latency=.005, bandwidth=250e3):
+    """Sıkıştırmasız ve otomatik sıkıştırmalı yükleme, yavaş bağlantıda. Etkin hız (KB/s) ve flash'a yazılan bayt"""
+    stand_in = StandIn(latency=latency, bandwidth=bandwidth)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(_compressed(stand_in, sample_payloads()))
+    finally:
+        loop.close()
+        stand_in.close()
+
+
+async def _get_compressed(stand_in, payloads):
+    wr = AsyncWebrepl(host="127.0.0.1", port=stand_in.port, password=stand_in.password)
+    await wr.connect()
+    await wr.login()
+    assert wr.isconnect == 1
+
+    result = {}
+    for name, data in payloads.items():
+        stand_in.files["payload.bin"] = data
+        for compress in (False, True):
+            stats = stand_in.os.stats
+            written, exec_time = stats["written"], stand_in.exec_time
+            start = time.perf_counter()
+            assert await wr.get_file("payload.bin", compress=compress) == data
+            get = time.perf_counter() - start
+
+            # Geçici dosya kalmamalı
+            assert list(stand_in.files) == ["payload.bin"]
+            result[name, compress] = (len(data) / get / 1e3, (stand_in.exec_time - exec_time) * 1000,
+                                      stats["written"] - written)
+
+    await wr.disconnect()
+    return result
+
+
+def bench_get_compressed(latency=.005, bandwidth=250e3):
+    """
+    Sıkıştırmasız ve istenince sıkıştırmalı indirme, yavaş bağlantıda.
+    Etkin hız (KB/s), cihazda çalışan kodların süresi (ms) ve cihazın flash'a yazdığı bayt
+    """
+    stand_in = StandIn(latency=latency, bandwidth=bandwidth)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(_get_compressed(stand_in, sample_payloads()))
+    finally:
+        loop.close()
+        stand_in.close()
+
+
+def _wait(check, limit):
+    """'check' doğru olana kadar bekler. Geçen süreyi, zaman aşımında None döndürür"""
+    start = time.perf_counter()
+    while not check():
+        if time.perf_counter() - start > limit:
+            return None
+        time.sleep(.0005)
+    return time.perf_counter() - start
+
+
+def bench_listener(idle=3.0):
+    """
+    Webrepl dinleyicisi;
+        - Boştaki bağlantıda işlemci kullanımı (%)
+        - Dosya isteğinin cevabının 'receives'e düşme süresi (ms)
+        - Bağlantı koptuktan sonra fark edilme süresi (ms)
+    """
+    stand_in = StandIn()
+    stand_in.files["a.py"] = b"print('a')\n" * 100
+    wr = Webrepl(host="127.0.0.1", port=stand_in.port, password=stand_in.password)
+    wr.start()
+    wr.listen()
+    time.sleep(.2)
+    wr.receives.clear()
+
+    cpu = time.process_time()
+    time.sleep(idle)
+    cpu = (time.process_time() - cpu) * 100 / idle
+
+    requests = []
+    for _ in range(10):
+        wr.receives.clear()
+        wr.get_file_content("a.py")
+        requests.append(_wait(lambda: wr.receives, 5))
+    request = max(requests) * 1000 if None not in requests else None
+
+    stand_in.close()
+    lost = _wait(lambda: wr.isconnect < 0, 5)
+
+    result = {"cpu": cpu, "request": request, "lost": lost and lost * 1000}
+    if hasattr(wr, "metrics"):
+        result.update(wr.metrics())
+
+    wr.disconnect()
+    return result
+
+
+def main():
+    cases = [
+        ("1 KiB frames, read 1024", 1024, 1024),
+        ("60 KiB frames, read 1024", 60 * 1024, 1024),
+        ("60 KiB frames, read 60 KiB", 60 * 1024, 60 * 1024),
+        ("1 MiB frames (64-bit length), read 64 KiB", 1024 * 1024, 64 * 1024),
+    ]
+    print("websocket.read")
+    for name, frame_size, read_size in cases:
+        try:
+            result = f"{bench_recv(frame_size, read_size):9.1f} MB/s"
+        except Exception as e:
+            result = f"failed ({type(e).__name__})"
+        print(f"  {name:<45} {result}")
+
+    print("Webrepl listener")
+    r = bench_listener()
+    fmt = lambda v: "not detected" if v is None else f"{v:9.3f} ms"
+    print(f"  {'idle cpu (process)':<45} {r['cpu']:9.3f} %")
+    print(f"  {'file request served (max of 10)':<45} {fmt(r['request'])}")
+    print(f"  {'connection loss noticed':<45} {fmt(r['lost'])}")
+    if "wakeups" in r:
+        print(f"  {'reactor wakeups / cpu':<45} {r['wakeups']:9d}    {r['cpu_percent']:9.3f} %")
+        print(f"  {'queued request latency (mean / max)':<45} "
+              f"{r['latency_mean'] * 1000:9.3f} ms {r['latency_max'] * 1000:9.3f} ms")
+
+    print("AsyncWebrepl.execute (raw REPL)")
+    friendly, sequential, pipelined = bench_raw_exec()
+    print(f"  {'friendly REPL, wait for prompt':<45} {friendly:9.3f} ms/cmd")
+    print(f"  {'raw REPL, one at a time':<45} {sequential:9.3f} ms/cmd")
+    print(f"  {'raw REPL, pipelined':<45} {pipelined:9.3f} ms/cmd")
+
+    print("AsyncWebrepl.put_file_content (1 MiB)")
+    for chunk_size in (1024, 4096, 16384):
+        rate = bench_put(chunk_size=chunk_size)
+        print(f"  {f'chunk size {chunk_size}':<45} {rate:9.1f} MB/s")
+
+    print("AsyncWebrepl.get_file (256 KiB, 256 byte device chunks)")
+    for latency in (0.0, 0.002):
+        for window in (1, 4, 16, 64):
+            rate = bench_get(latency=latency, window=window)
+            print(f"  {f'{latency * 1000:.0f} ms latency, window {window}':<45} {rate:9.3f} MB/s")
+
+    print("Binary file through Webrepl (1 MiB)")
+    literal, upload, download = bench_binary()
+    print(f"  {'bytes literal in a command (old panel path)':<45} {literal:9.3f} MB/s")
+    print(f"  {'put_file from local file':<45} {upload:9.3f} MB/s")
+    print(f"  {'download to staging file':<45} {download:9.3f} MB/s")
+
+    print("Deploying a 40 file project (4 KiB each, 5 ms latency)")
+    for name, ms in bench_sync().items():
+        print(f"  {name:<45} {ms:9.1f} ms")
+
+    print("Compressed uploads (128 KiB, 2 Mbit/s, 5 ms latency), flash written")
+    for (name, compress), (put, written) in bench_compressed().items():
+        mode = "auto" if compress is None else "off"
+        print(f"  {f'{name}, compression {mode}':<45} {put:9.1f} KB/s {written:9d} B")
+
+    print("Compressed downloads (128 KiB, 2 Mbit/s, 5 ms latency), device exec time / flash written")
+    for (name, compress), (get, exec_ms, written) in bench_get_compressed().items():
+        mode = "on" if compress else "off"
+        print(f"  {f'{name}, compression {mode}':<45} {get:9.1f} KB/s {exec_ms:9.1f} ms {written:9d} B")
+
+    print("Running a 64 KiB script")
+    for window in (128, 256, 1024):
+        upload, paste = bench_run_script(window=window)
+        print(f"  {f'raw-paste, window {window}':<45} {paste[0]:9.3f} ms  {paste[1]:9.3f} MB/s")
+    print(f"  {'put_file + import':<45} {upload[0]:9.3f} ms  {upload[1]:9.3f} MB/s")
+
+    print("AsyncWebrepl.send")
+    for boards in (1, 8):
+        rtt, rate = bench_command_rtt(boards)
+        print(f"  {f'command round trip, {boards} board(s)':<45} {rtt:9.3f} ms  {rate:9.0f} cmd/s")
+
+
+if __name__ == "__main__":
+    main()